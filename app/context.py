@@ -1,10 +1,20 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Optional
 
+from app.core.cache import ProbeCache
 from app.core.config import Config
+from app.core.procfs import HostCollector
 from app.core.targets import Target
+from app.storage.alert_state import AlertStateStore
+from app.storage.journal_cursors import JournalCursorStore
+from app.storage.metrics_history import MetricsHistory
 from app.storage.selection import SelectionStore
+from app.storage.spill import SpillStore
+
+if TYPE_CHECKING:
+    from app.services.journal_follower import JournalFollower
+    from app.services.outbox import Outbox
 
 
 @dataclass
@@ -13,6 +23,19 @@ class Context:
     targets: Dict[str, Target]
     selection: SelectionStore
     repo_root: Path
+    spill: SpillStore
+    journal_cursors: JournalCursorStore
+    alert_state: AlertStateStore
+    host: HostCollector
+    probes: ProbeCache = field(default_factory=ProbeCache)
+    # service -> фонова підписка на журнал (якщо ADMIN_BOT_JOURNAL_FOLLOW увімкнено)
+    journal_followers: Dict[str, "JournalFollower"] = field(default_factory=dict)
+    # target key -> джерело логів, перемкнуте в меню (інакше Target.log_source)
+    log_sources: Dict[str, str] = field(default_factory=dict)
+    # Черга вихідних повідомлень; створюється в main разом з Bot
+    outbox: Optional["Outbox"] = None
+    # Історія метрик; None, якщо ADMIN_BOT_METRICS_INTERVAL=0
+    metrics: Optional[MetricsHistory] = None
 
     def get_active_target(self, chat_id: int) -> Target:
         key = self.selection.get(chat_id)
@@ -26,3 +49,11 @@ class Context:
         if key not in self.targets:
             raise KeyError(key)
         self.selection.set(chat_id, key)
+
+    def get_log_source(self, target: Target) -> str:
+        return self.log_sources.get(target.key, target.log_source)
+
+    def toggle_log_source(self, target: Target) -> str:
+        source = "file" if self.get_log_source(target) == "journal" else "journal"
+        self.log_sources[target.key] = source
+        return source
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+
+T = TypeVar("T")
+CacheKey = Tuple[str, ...]
+
+_PRUNE_THRESHOLD = 256
+
+
+class ProbeCache:
+    """TTL-кеш для read-only перевірок з об'єднанням одночасних запитів.
+
+    Одночасні виклики з однаковим ключем чекають на один і той самий запуск
+    (single-flight); результат кешується на ``ttl`` секунд. Ключі — кортежі,
+    тож ``invalidate("systemd", service)`` скидає всі перевірки сервісу.
+    """
+
+    def __init__(self) -> None:
+        self._values: Dict[CacheKey, Tuple[float, Any]] = {}
+        self._inflight: Dict[CacheKey, "asyncio.Task[Any]"] = {}
+
+    async def get(self, key: CacheKey, ttl: float, factory: Callable[[], Awaitable[T]]) -> T:
+        hit = self._values.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            return hit[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, ttl, factory))
+            self._inflight[key] = task
+        # shield: скасування одного з очікувачів не зупиняє спільний запуск
+        return await asyncio.shield(task)
+
+    async def _run(self, key: CacheKey, ttl: float, factory: Callable[[], Awaitable[T]]) -> T:
+        me = asyncio.current_task()
+        try:
+            value = await factory()
+        finally:
+            owner = self._inflight.get(key) is me
+            if owner:
+                del self._inflight[key]
+        # Якщо ключ інвалідовано під час виконання — результат не кешуємо
+        if owner and ttl > 0:
+            self._store(key, ttl, value)
+        return value
+
+    def _store(self, key: CacheKey, ttl: float, value: Any) -> None:
+        now = time.monotonic()
+        if len(self._values) >= _PRUNE_THRESHOLD:
+            for k in [k for k, (exp, _) in self._values.items() if exp <= now]:
+                del self._values[k]
+        self._values[key] = (now + ttl, value)
+
+    def invalidate(self, *prefix: str) -> None:
+        """Скинути кешовані значення та незавершені запуски з ключами, що починаються з ``prefix``."""
+        n = len(prefix)
+        for k in [k for k in self._values if k[:n] == prefix]:
+            del self._values[k]
+        for k in [k for k in self._inflight if k[:n] == prefix]:
+            del self._inflight[k]
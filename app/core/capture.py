@@ -0,0 +1,107 @@
+import codecs
+
+
+CHUNK_SIZE = 64 * 1024
+# Довжина маркера "... (пропущено N байт) ..." з запасом на число
+_MARKER_RESERVE = 40
+
+
+class HeadTailCapture:
+    """Обмежене захоплення потоку байтів: перші ``head_bytes`` та останні ``tail_bytes``.
+
+    Пам'ять — O(head_bytes + tail_bytes) незалежно від обсягу виводу; хвіст
+    зберігається в кільцевому буфері, декодуються лише збережені байти.
+    """
+
+    def __init__(self, head_bytes: int, tail_bytes: int) -> None:
+        self._head_cap = max(0, head_bytes)
+        self._tail_cap = max(1, tail_bytes)
+        self._head = bytearray()
+        self._ring = bytearray(self._tail_cap)
+        self._ring_pos = 0
+        self._ring_len = 0
+        self.total = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self._head_cap - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data:
+            self._ring_write(data)
+
+    def _ring_write(self, data: bytes) -> None:
+        cap = self._tail_cap
+        if len(data) >= cap:
+            self._ring[:] = data[-cap:]
+            self._ring_pos = 0
+            self._ring_len = cap
+            return
+        end = self._ring_pos + len(data)
+        if end <= cap:
+            self._ring[self._ring_pos:end] = data
+        else:
+            split = cap - self._ring_pos
+            self._ring[self._ring_pos:] = data[:split]
+            self._ring[: end - cap] = data[split:]
+        self._ring_pos = end % cap
+        self._ring_len = min(cap, self._ring_len + len(data))
+
+    def _tail(self) -> bytes:
+        if self._ring_len < self._tail_cap:
+            return bytes(self._ring[: self._ring_len])
+        return bytes(self._ring[self._ring_pos:] + self._ring[: self._ring_pos])
+
+    @property
+    def capacity(self) -> int:
+        return self._head_cap + self._tail_cap
+
+    def retained(self) -> bytes:
+        """Усі збережені байти (повний вивід, якщо ще нічого не відкинуто)."""
+        return bytes(self._head) + self._tail()
+
+    @property
+    def dropped(self) -> int:
+        """Кількість байтів, що не потрапили ні в голову, ні в хвіст."""
+        return self.total - len(self._head) - self._ring_len
+
+    def fits(self, *, max_chars: int) -> bool:
+        """Чи ``render`` поверне весь вивід без пропуску."""
+        if self.dropped:
+            return False
+        if self.total <= max_chars:
+            return True
+        return len(self.retained().decode("utf-8", errors="replace")) <= max_chars
+
+    def render(self, *, max_chars: int) -> str:
+        """Декодувати збережене у текст до ``max_chars`` символів з маркером пропуску."""
+        # Маркер пропуску теж входить у ліміт, щоб повторне обрізання не з'їло хвіст
+        budget = max(0, max_chars - _MARKER_RESERVE)
+        head_chars = budget // 2
+        tail_chars = budget - head_chars
+
+        if self.dropped == 0:
+            text = self.retained().decode("utf-8", errors="replace")
+            if len(text) <= max_chars:
+                return text
+            head_text, tail_text = text[:head_chars], text[-tail_chars:] if tail_chars else ""
+        else:
+            # Неповний символ на межі голови відкидається інкрементальним декодером,
+            # а байти-продовження на початку хвоста — вручну.
+            head_text = codecs.getincrementaldecoder("utf-8")("replace").decode(bytes(self._head))
+            tail = self._tail()
+            skip = 0
+            while skip < min(3, len(tail)) and 0x80 <= tail[skip] <= 0xBF:
+                skip += 1
+            head_text = head_text[:head_chars]
+            tail_text = tail[skip:].decode("utf-8", errors="replace")[-tail_chars:] if tail_chars else ""
+
+        omitted = self.total - len(head_text.encode("utf-8")) - len(tail_text.encode("utf-8"))
+        return f"{head_text}\n\n... (пропущено {omitted} байт) ...\n\n{tail_text}"
+
+
+def capture_for_chars(max_chars: int) -> HeadTailCapture:
+    """Буфер, достатній для ``max_chars`` символів UTF-8 (до 4 байтів на символ)."""
+    half = max(1, max_chars // 2)
+    return HeadTailCapture(head_bytes=half * 4, tail_bytes=(max_chars - half) * 4 or 4)
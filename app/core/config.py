@@ -18,6 +18,36 @@ class Config:
     alerts_enabled: bool = False
     alert_interval: int = 300  # секунд (за замовчуванням 5 хв)
     alert_on_critical_errors: bool = True
+    # Сповіщати про недоступні PostgreSQL/Redis цілей
+    alert_on_dependencies: bool = True
+    watchdog_concurrency: int = 4
+    watchdog_check_timeout: int = 60  # секунд на перевірку однієї цілі
+    # Стан сповіщень (cooldown, "в роботі"): скільки тримати і максимум записів
+    alert_state_ttl_hours: int = 168
+    alert_state_max: int = 1000
+    # Дайджест: сповіщення за вікно (секунди; 0 — за групу перевірок) — одним повідомленням
+    alert_digest: bool = False
+    alert_digest_window: int = 30
+    # Цикл перезапусків: стільки перезапусків за вікно (секунди) — сповіщення "flapping"
+    flap_threshold: int = 3
+    flap_window: int = 900
+    # Прогноз вичерпання пам'яті/диска: вікно тренду і поріг сповіщення (години, 0 — вимкнено)
+    trend_window_hours: float = 6
+    trend_alert_hours: float = 24
+    # Фонова підписка на журнал цілей (journalctl -f) з буфером записів
+    journal_follow: bool = False
+    journal_buffer_lines: int = 5000
+    # Ліміти паралельних дочірніх процесів
+    max_concurrent_commands: int = 8
+    max_concurrent_per_target: int = 2
+    # Сховище повних виводів команд
+    spill_max_mb: int = 200
+    spill_max_age_hours: int = 72
+    # Корені /proc і cgroup v2 для нативного збору метрик
+    proc_root: str = "/proc"
+    cgroup_root: str = "/sys/fs/cgroup"
+    # Історія метрик (metrics.bin): інтервал вибірки в секундах, 0 — вимкнено
+    metrics_interval: int = 10
 
 
 def load_config() -> Config:
@@ -40,6 +70,27 @@ def load_config() -> Config:
         "yes",
     )
 
+    alert_on_dependencies = os.getenv("ADMIN_BOT_ALERT_ON_DEPENDENCIES", "true").lower() in ("true", "1", "yes")
+    watchdog_concurrency = max(1, int(os.getenv("ADMIN_BOT_WATCHDOG_CONCURRENCY", "4")))
+    watchdog_check_timeout = int(os.getenv("ADMIN_BOT_WATCHDOG_CHECK_TIMEOUT", "60"))
+    alert_state_ttl_hours = int(os.getenv("ADMIN_BOT_ALERT_STATE_TTL_HOURS", "168"))
+    alert_state_max = max(1, int(os.getenv("ADMIN_BOT_ALERT_STATE_MAX", "1000")))
+    alert_digest = os.getenv("ADMIN_BOT_ALERT_DIGEST", "false").lower() in ("true", "1", "yes")
+    alert_digest_window = max(0, int(os.getenv("ADMIN_BOT_ALERT_DIGEST_WINDOW", "30")))
+    flap_threshold = max(1, int(os.getenv("ADMIN_BOT_FLAP_THRESHOLD", "3")))
+    flap_window = max(60, int(os.getenv("ADMIN_BOT_FLAP_WINDOW", "900")))
+    trend_window_hours = max(0.5, float(os.getenv("ADMIN_BOT_TREND_WINDOW_HOURS", "6")))
+    trend_alert_hours = max(0.0, float(os.getenv("ADMIN_BOT_TREND_ALERT_HOURS", "24")))
+    journal_follow = os.getenv("ADMIN_BOT_JOURNAL_FOLLOW", "false").lower() in ("true", "1", "yes")
+    journal_buffer_lines = int(os.getenv("ADMIN_BOT_JOURNAL_BUFFER", "5000"))
+    max_concurrent_commands = int(os.getenv("ADMIN_BOT_MAX_COMMANDS", "8"))
+    max_concurrent_per_target = int(os.getenv("ADMIN_BOT_MAX_COMMANDS_PER_TARGET", "2"))
+    spill_max_mb = int(os.getenv("ADMIN_BOT_SPILL_MAX_MB", "200"))
+    spill_max_age_hours = int(os.getenv("ADMIN_BOT_SPILL_MAX_AGE_HOURS", "72"))
+    proc_root = (os.getenv("ADMIN_BOT_PROC_ROOT", "/proc") or "/proc").strip()
+    cgroup_root = (os.getenv("ADMIN_BOT_CGROUP_ROOT", "/sys/fs/cgroup") or "/sys/fs/cgroup").strip()
+    metrics_interval = max(0, int(os.getenv("ADMIN_BOT_METRICS_INTERVAL", "10")))
+
     if not token:
         raise RuntimeError("ADMIN_BOT_TOKEN is not set in environment")
     if not admin_id_str:
@@ -68,4 +119,24 @@ def load_config() -> Config:
         alerts_enabled=alerts_enabled,
         alert_interval=alert_interval,
         alert_on_critical_errors=alert_on_critical_errors,
+        alert_on_dependencies=alert_on_dependencies,
+        watchdog_concurrency=watchdog_concurrency,
+        watchdog_check_timeout=watchdog_check_timeout,
+        alert_state_ttl_hours=alert_state_ttl_hours,
+        alert_state_max=alert_state_max,
+        alert_digest=alert_digest,
+        alert_digest_window=alert_digest_window,
+        flap_threshold=flap_threshold,
+        flap_window=flap_window,
+        trend_window_hours=trend_window_hours,
+        trend_alert_hours=trend_alert_hours,
+        journal_follow=journal_follow,
+        journal_buffer_lines=journal_buffer_lines,
+        max_concurrent_commands=max_concurrent_commands,
+        max_concurrent_per_target=max_concurrent_per_target,
+        spill_max_mb=spill_max_mb,
+        spill_max_age_hours=spill_max_age_hours,
+        proc_root=proc_root,
+        cgroup_root=cgroup_root,
+        metrics_interval=metrics_interval,
     )
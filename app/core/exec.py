@@ -1,12 +1,163 @@
+import asyncio
+import contextlib
 import html
 import logging
-import subprocess
+import os
+import signal
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.capture import CHUNK_SIZE, HeadTailCapture, capture_for_chars
+from app.storage.spill import SpillStore, SpillWriter
 
 
 logger = logging.getLogger("admin_bot")
 
+# Обмеження кількості одночасних дочірніх процесів (глобально та на ціль).
+_MAX_GLOBAL = 8
+_MAX_PER_KEY = 2
+_global_sem: Optional[asyncio.Semaphore] = None
+_key_sems: Dict[str, asyncio.Semaphore] = {}
+
+# Максимальна довжина рядка для потокового читання (journald обмежує ~48 КБ)
+_STREAM_LINE_LIMIT = 1024 * 1024
+
+
+def configure_limits(*, global_limit: int, per_key_limit: int) -> None:
+    """Задати ліміти паралельних команд (викликати до першого запуску команди)."""
+    global _MAX_GLOBAL, _MAX_PER_KEY, _global_sem
+    _MAX_GLOBAL = max(1, global_limit)
+    _MAX_PER_KEY = max(1, per_key_limit)
+    _global_sem = None
+    _key_sems.clear()
+
+
+@contextlib.asynccontextmanager
+async def _limited(limit_key: Optional[str], *, enabled: bool = True) -> AsyncIterator[None]:
+    global _global_sem
+    if not enabled:
+        yield
+        return
+    if _global_sem is None:
+        _global_sem = asyncio.Semaphore(_MAX_GLOBAL)
+    key_sem = None
+    if limit_key:
+        key_sem = _key_sems.get(limit_key)
+        if key_sem is None:
+            key_sem = _key_sems[limit_key] = asyncio.Semaphore(_MAX_PER_KEY)
+
+    async with contextlib.AsyncExitStack() as stack:
+        if key_sem is not None:
+            await stack.enter_async_context(key_sem)
+        await stack.enter_async_context(_global_sem)
+        yield
+
+
+async def _kill_process_group(proc: asyncio.subprocess.Process) -> None:
+    """Вбити всю групу процесів (дочірні процеси npm/pip теж) і дочекатися завершення."""
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+    with contextlib.suppress(Exception):
+        await proc.wait()
+
+
+class CommandStream:
+    """Потоковий доступ до stdout дочірнього процесу (див. ``stream_command``)."""
+
+    def __init__(self, proc: asyncio.subprocess.Process) -> None:
+        self.proc = proc
+        self.timed_out = False
+        self._stderr = HeadTailCapture(head_bytes=2048, tail_bytes=2048)
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        assert self.proc.stdout is not None
+        while True:
+            chunk = await self.proc.stdout.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    async def lines(self) -> AsyncIterator[bytes]:
+        assert self.proc.stdout is not None
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                return
+            yield line
+
+    @property
+    def at_eof(self) -> bool:
+        return self.proc.stdout is None or self.proc.stdout.at_eof()
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.proc.returncode
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr.render(max_chars=2000).strip()
+
+    async def _drain_stderr(self) -> None:
+        assert self.proc.stderr is not None
+        while True:
+            chunk = await self.proc.stderr.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            self._stderr.feed(chunk)
+
+    def _expire(self) -> None:
+        self.timed_out = True
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(self.proc.pid, signal.SIGKILL)
+
+
+@contextlib.asynccontextmanager
+async def stream_command(
+    args: List[str],
+    *,
+    cwd: Optional[Path] = None,
+    timeout: int = 30,
+    env: Optional[Dict[str, str]] = None,
+    limit_key: Optional[str] = None,
+    limited: bool = True,
+) -> AsyncIterator[CommandStream]:
+    """Запустити команду і читати її stdout потоково, без буферизації всього виводу.
+
+    Після ``timeout`` секунд група процесів вбивається (``stream.timed_out``),
+    і читання просто завершується. Якщо споживач вийшов раніше EOF, процес
+    теж вбивається. Винятки запуску (команда не знайдена тощо) пробрасуються.
+    ``limited=False`` — для довгоживучих процесів, що не повинні займати
+    слоти обмежувача паралельності.
+    """
+    async with _limited(limit_key, enabled=limited):
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=str(cwd) if cwd else None,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            limit=_STREAM_LINE_LIMIT,
+        )
+        stream = CommandStream(proc)
+        stderr_task = asyncio.create_task(stream._drain_stderr())
+        timer = asyncio.get_running_loop().call_later(timeout, stream._expire)
+        try:
+            yield stream
+            if stream.at_eof:
+                await proc.wait()
+        finally:
+            timer.cancel()
+            await _kill_process_group(proc)
+            with contextlib.suppress(Exception):
+                await stderr_task
+
 
 def safe_html(text: str, *, max_len: int) -> str:
     if text is None:
@@ -31,32 +182,144 @@ def split_text_chunks(text: str, *, max_chunk: int = 3800) -> List[str]:
     return chunks or [""]
 
 
-def run_command(
+async def run_command(
     args: List[str],
     *,
     cwd: Optional[Path] = None,
     timeout: int = 30,
     env: Optional[Dict[str, str]] = None,
     max_output_size: int = 4000,
+    limit_key: Optional[str] = None,
 ) -> str:
-    """Безпечний запуск команди (без shell), захоплення stdout+stderr."""
-    try:
-        res = subprocess.run(
-            args,
-            cwd=str(cwd) if cwd else None,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            timeout=timeout,
-            text=True,
-        )
-        out = (res.stdout or "").strip()
-        if len(out) > max_output_size:
-            out = out[:max_output_size] + "\n\n... (обрізано, занадто довгий вивід)"
-        if res.returncode != 0:
-            return f"❌ Помилка (код виходу {res.returncode}):\n{out}"
-        return out
-    except subprocess.TimeoutExpired:
-        return f"⏱ Таймаут ({timeout}с)"
-    except Exception as e:
-        return f"❌ Виняток: {e}"
+    """Безпечний асинхронний запуск команди (без shell), захоплення stdout+stderr.
+
+    Вивід читається потоково в обмежений буфер «голова + хвіст»
+    (див. ``HeadTailCapture``), тож пам'ять не залежить від обсягу виводу.
+    Команда виконується в окремій групі процесів; при таймауті або скасуванні
+    вбивається вся група. ``limit_key`` (зазвичай ключ цілі) обмежує кількість
+    одночасних команд для однієї цілі.
+    """
+    out, _ = await run_command_spilled(
+        args, cwd=cwd, timeout=timeout, env=env, max_output_size=max_output_size, limit_key=limit_key
+    )
+    return out
+
+
+async def run_command_spilled(
+    args: List[str],
+    *,
+    cwd: Optional[Path] = None,
+    timeout: int = 30,
+    env: Optional[Dict[str, str]] = None,
+    max_output_size: int = 4000,
+    limit_key: Optional[str] = None,
+    spill: Optional[SpillStore] = None,
+) -> Tuple[str, Optional[str]]:
+    """Те саме, що ``run_command``, але повертає (вивід, spill_id).
+
+    Якщо вивід буде обрізано при показі і передано ``spill``, повний вивід
+    потоково стискається у сховище, а його ID повертається другим елементом.
+    """
+    async with _limited(limit_key):
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                cwd=str(cwd) if cwd else None,
+                env=env,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,
+            )
+        except Exception as e:
+            return f"❌ Виняток: {e}", None
+
+        capture = capture_for_chars(max_output_size)
+        writer: Optional[SpillWriter] = None
+        spill_pending = spill is not None
+
+        async def _pump() -> None:
+            nonlocal writer, spill_pending
+            assert proc.stdout is not None
+            while True:
+                chunk = await proc.stdout.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                # Сховище відкривається, щойно вивід (разом з можливим префіксом помилки) може
+                # не вміститися в max_output_size символів (символ — щонайменше байт);
+                # якщо зрештою вмістився — файл відкидається
+                if spill_pending and capture.total + len(chunk) > max_output_size - _ERROR_PREFIX_RESERVE:
+                    spill_pending = False
+                    writer = spill.open_writer()
+                    if writer is not None:
+                        writer.write(capture.retained())
+                if writer is not None:
+                    writer.write(chunk)
+                capture.feed(chunk)
+            await proc.wait()
+
+        try:
+            try:
+                await asyncio.wait_for(_pump(), timeout=timeout)
+            finally:
+                if writer is not None:
+                    if capture.fits(max_chars=max_output_size - len(_error_prefix(proc.returncode))):
+                        writer.discard()
+                    else:
+                        writer.close()
+        except asyncio.TimeoutError:
+            await _kill_process_group(proc)
+            return f"⏱ Таймаут ({timeout}с)", writer.spill_id if writer and writer.saved else None
+        except asyncio.CancelledError:
+            await _kill_process_group(proc)
+            raise
+        except Exception as e:
+            await _kill_process_group(proc)
+            return f"❌ Виняток: {e}", None
+
+    # Префікс помилки входить у max_output_size, щоб виклики, які ще раз
+    # обрізають результат до того ж ліміту, не відкидали кінець виводу
+    prefix = _error_prefix(proc.returncode)
+    out = capture.render(max_chars=max_output_size - len(prefix)).strip()
+    spill_id = writer.spill_id if writer and writer.saved else None
+    return prefix + out, spill_id
+
+
+def _error_prefix(returncode: Optional[int]) -> str:
+    if returncode in (0, None):
+        return ""
+    return f"❌ Помилка (код виходу {returncode}):\n"
+
+
+# Найдовший префікс помилки: до завершення процесу код виходу ще невідомий
+_ERROR_PREFIX_RESERVE = len(_error_prefix(-(2**31)))
+
+
+async def run_command_to_file(
+    args: List[str],
+    *,
+    dest: Path,
+    timeout: int = 30,
+    env: Optional[Dict[str, str]] = None,
+    limit_key: Optional[str] = None,
+) -> Tuple[int, str]:
+    """Запуск команди зі stdout у файл ``dest``; повертає (код виходу, stderr).
+
+    При таймауті група процесів вбивається і піднімається ``asyncio.TimeoutError``.
+    """
+    async with _limited(limit_key):
+        with dest.open("wb") as f:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                env=env,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=f,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+            except BaseException:
+                await _kill_process_group(proc)
+                raise
+    return proc.returncode, (stderr or b"").decode("utf-8", errors="replace").strip()
@@ -0,0 +1,365 @@
+"""Метрики хоста і сервісів напряму з /proc, cgroup v2 та ``os.statvfs``.
+
+Замість ``uptime``/``df``/``free``/``systemctl show`` (сім процесів на кожне
+"⚙️ Системна інфо") — кілька коротких читань псевдофайлів без жодного fork.
+Корені /proc і cgroup задаються в конструкторі, тож колектор можна
+перевірити на дереві файлів-фікстур.
+"""
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Скільки процесів cgroup переглядати, шукаючи час старту сервісу
+_MAX_START_PIDS = 64
+# Частіші вибірки не оновлюють базу для CPU%/IO (замало часу для точної різниці)
+_MIN_SAMPLE_INTERVAL = 0.5
+
+
+@dataclass(frozen=True)
+class MemInfo:
+    total: int
+    available: int
+
+    @property
+    def used(self) -> int:
+        return self.total - self.available
+
+
+@dataclass(frozen=True)
+class DiskUsage:
+    """Заповнення файлової системи так, як його рахує ``df``."""
+
+    path: str
+    device: int
+    total: int
+    used: int
+    free: int  # доступно непривілейованому користувачу
+
+    @property
+    def used_percent(self) -> int:
+        size = self.used + self.free
+        # df округлює відсоток вгору
+        return -(-self.used * 100 // size) if size else 0
+
+
+@dataclass(frozen=True)
+class CgroupUsage:
+    """Лічильники cgroup юніта (cgroup v2)."""
+
+    path: Path
+    memory_current: Optional[int] = None
+    memory_peak: Optional[int] = None
+    cpu_usage_usec: Optional[int] = None
+    pids_current: Optional[int] = None
+    io_read_bytes: Optional[int] = None
+    io_write_bytes: Optional[int] = None
+    main_pid: Optional[int] = None  # найстаріший процес cgroup
+    started_at: Optional[float] = None  # час старту найстарішого процесу (epoch)
+
+
+@dataclass(frozen=True)
+class UnitResources:
+    """Вибірка ресурсів юніта; швидкості — відносно попередньої вибірки."""
+
+    service: str
+    cgroup: CgroupUsage
+    rss: Optional[int] = None  # VmRSS головного процесу
+    threads: Optional[int] = None
+    fds: Optional[int] = None
+    cpu_percent: Optional[float] = None  # 100% = одне ядро
+    io_read_rate: Optional[float] = None  # байт/с
+    io_write_rate: Optional[float] = None
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="ascii", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int((value or "").strip())
+    except ValueError:
+        return None
+
+
+def _keyed(text: Optional[str]) -> Dict[str, str]:
+    """Файли формату ``key value`` (cpu.stat, memory.stat, /proc/meminfo)."""
+    out: Dict[str, str] = {}
+    for line in (text or "").splitlines():
+        parts = line.replace(":", " ", 1).split()
+        if len(parts) >= 2:
+            out[parts[0]] = parts[1]
+    return out
+
+
+def _io_totals(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Сума rbytes/wbytes по всіх пристроях з io.stat."""
+    if text is None:
+        return None, None
+    read = write = 0
+    for line in text.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key == "rbytes":
+                read += _int(value) or 0
+            elif key == "wbytes":
+                write += _int(value) or 0
+    return read, write
+
+
+def unit_name(service: str) -> str:
+    return service if "." in service else f"{service}.service"
+
+
+class HostCollector:
+    """Читач метрик хоста і cgroup юнітів без дочірніх процесів."""
+
+    def __init__(self, proc_root: Path = Path("/proc"), cgroup_root: Path = Path("/sys/fs/cgroup")) -> None:
+        self.proc_root = proc_root
+        self.cgroup_root = cgroup_root
+        self._boot_time: Optional[float] = None
+        self._cpu_prev: Optional[Tuple[int, int]] = None
+        # service -> (pid, час старту) головного процесу, щоб не сканувати cgroup.procs щоразу
+        self._main_pids: Dict[str, Tuple[str, float]] = {}
+        # service -> (monotonic, usage_usec, rbytes, wbytes) і останні обчислені швидкості
+        self._unit_prev: Dict[str, Tuple[float, Optional[int], Optional[int], Optional[int]]] = {}
+        self._unit_rates: Dict[str, Tuple[Optional[float], Optional[float], Optional[float]]] = {}
+        try:
+            self._clk_tck = os.sysconf("SC_CLK_TCK")
+        except (ValueError, OSError, AttributeError):
+            self._clk_tck = 100
+
+    # ── хост ──────────────────────────────────────────────────────────────
+
+    def uptime(self) -> Optional[float]:
+        text = _read(self.proc_root / "uptime")
+        try:
+            return float(text.split()[0]) if text else None
+        except (ValueError, IndexError):
+            return None
+
+    def loadavg(self) -> Optional[Tuple[float, float, float]]:
+        text = _read(self.proc_root / "loadavg")
+        try:
+            one, five, fifteen = (float(x) for x in (text or "").split()[:3])
+        except ValueError:
+            return None
+        return one, five, fifteen
+
+    def meminfo(self) -> Optional[MemInfo]:
+        info = _keyed(_read(self.proc_root / "meminfo"))
+        total = _int(info.get("MemTotal"))
+        if total is None:
+            return None
+        available = _int(info.get("MemAvailable"))
+        if available is None:
+            # Старі ядра без MemAvailable
+            available = sum(_int(info.get(k)) or 0 for k in ("MemFree", "Buffers", "Cached"))
+        return MemInfo(total=total * 1024, available=available * 1024)
+
+    def _stat(self) -> Tuple[Optional[Tuple[int, int]], Optional[float]]:
+        """(busy, total) у тіках з рядка ``cpu`` і btime з /proc/stat."""
+        cpu = None
+        btime = None
+        for line in (_read(self.proc_root / "stat") or "").splitlines():
+            if line.startswith("cpu "):
+                ticks = [int(x) for x in line.split()[1:]]
+                # user nice system idle iowait irq softirq steal (guest вже входить у user)
+                total = sum(ticks[:8])
+                idle = ticks[3] + (ticks[4] if len(ticks) > 4 else 0)
+                cpu = (total - idle, total)
+            elif line.startswith("btime "):
+                btime = float(line.split()[1])
+        return cpu, btime
+
+    def boot_time(self) -> Optional[float]:
+        if self._boot_time is None:
+            self._boot_time = self._stat()[1]
+        return self._boot_time
+
+    def cpu_percent(self) -> Optional[float]:
+        """Завантаження CPU між двома викликами (None при першому виклику)."""
+        cpu, btime = self._stat()
+        if self._boot_time is None:
+            self._boot_time = btime
+        if cpu is None:
+            return None
+        prev = self._cpu_prev
+        if prev is None or cpu[1] < prev[1]:
+            self._cpu_prev = cpu
+            return None
+        if cpu[1] == prev[1]:
+            # Між викликами не минуло жодного тіку — база лишається старою
+            return None
+        self._cpu_prev = cpu
+        return 100.0 * (cpu[0] - prev[0]) / (cpu[1] - prev[1])
+
+    @staticmethod
+    def disk_usage(path: Path) -> Optional[DiskUsage]:
+        try:
+            st = os.statvfs(path)
+            device = os.stat(path).st_dev
+        except OSError:
+            return None
+        return DiskUsage(
+            path=str(path),
+            device=device,
+            total=st.f_blocks * st.f_frsize,
+            used=(st.f_blocks - st.f_bfree) * st.f_frsize,
+            free=st.f_bavail * st.f_frsize,
+        )
+
+    def disks(self, paths: List[Path]) -> List[DiskUsage]:
+        """Заповнення файлових систем шляхів; кожен пристрій — один раз."""
+        seen = set()
+        out: List[DiskUsage] = []
+        for p in paths:
+            usage = self.disk_usage(p)
+            if usage is not None and usage.device not in seen:
+                seen.add(usage.device)
+                out.append(usage)
+        return out
+
+    # ── сервіси (cgroup v2) ──────────────────────────────────────────────
+
+    def unit_cgroup(self, service: str) -> Path:
+        return self.cgroup_root / "system.slice" / unit_name(service)
+
+    def _pid_start(self, pid: str) -> Optional[float]:
+        text = _read(self.proc_root / pid / "stat")
+        if not text:
+            return None
+        # comm може містити пробіли й дужки — поля рахуємо після останньої ")"
+        fields = text[text.rfind(")") + 2:].split()
+        boot = self.boot_time()
+        try:
+            ticks = int(fields[19])
+        except (IndexError, ValueError):
+            return None
+        return None if boot is None else boot + ticks / self._clk_tck
+
+    def memory_limit(self, service: str) -> Optional[int]:
+        """memory.max юніта; None — без ліміту ("max") або cgroup недоступна."""
+        return _int(_read(self.unit_cgroup(service) / "memory.max"))
+
+    def _main_process(self, service: str, pids: List[str]) -> Optional[Tuple[str, float]]:
+        """Найстаріший процес cgroup; попередній результат береться, поки процес живий."""
+        cached = self._main_pids.get(service)
+        if cached is not None and cached[0] in pids:
+            return cached
+        best: Optional[Tuple[str, float]] = None
+        for pid in pids[:_MAX_START_PIDS]:
+            started = self._pid_start(pid)
+            if started is not None and (best is None or started < best[1]):
+                best = (pid, started)
+        if best is None:
+            self._main_pids.pop(service, None)
+        else:
+            self._main_pids[service] = best
+        return best
+
+    def cgroup_usage(self, service: str) -> Optional[CgroupUsage]:
+        path = self.unit_cgroup(service)
+        procs = _read(path / "cgroup.procs")
+        if procs is None:
+            return None
+        main = self._main_process(service, procs.split())
+        io_read, io_write = _io_totals(_read(path / "io.stat"))
+        return CgroupUsage(
+            path=path,
+            memory_current=_int(_read(path / "memory.current")),
+            memory_peak=_int(_read(path / "memory.peak")),
+            cpu_usage_usec=_int(_keyed(_read(path / "cpu.stat")).get("usage_usec")),
+            pids_current=_int(_read(path / "pids.current")),
+            io_read_bytes=io_read,
+            io_write_bytes=io_write,
+            main_pid=int(main[0]) if main else None,
+            started_at=main[1] if main else None,
+        )
+
+    def _process_status(self, pid: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """(VmRSS у байтах, потоки, відкриті дескриптори) процесу."""
+        status = _keyed(_read(self.proc_root / str(pid) / "status"))
+        rss = _int(status.get("VmRSS"))
+        try:
+            fds: Optional[int] = len(os.listdir(self.proc_root / str(pid) / "fd"))
+        except OSError:
+            fds = None  # чужий процес без CAP_SYS_PTRACE
+        return (rss * 1024 if rss is not None else None), _int(status.get("Threads")), fds
+
+    def sample_unit(self, service: str) -> Optional[UnitResources]:
+        """Вибірка ресурсів юніта; CPU% і IO — різниця з попередньою вибіркою цього юніта."""
+        usage = self.cgroup_usage(service)
+        if usage is None:
+            self._unit_prev.pop(service, None)
+            self._unit_rates.pop(service, None)
+            return None
+
+        now = time.monotonic()
+        cur = (now, usage.cpu_usage_usec, usage.io_read_bytes, usage.io_write_bytes)
+        prev = self._unit_prev.get(service)
+        if prev is None:
+            self._unit_prev[service] = cur
+        elif now - prev[0] >= _MIN_SAMPLE_INTERVAL:
+            elapsed = now - prev[0]
+
+            def rate(i: int, scale: float) -> Optional[float]:
+                a, b = prev[i], cur[i]
+                # Лічильник скинуто (перезапуск юніта) — швидкість невідома
+                return None if a is None or b is None or b < a else (b - a) * scale / elapsed
+
+            self._unit_rates[service] = (rate(1, 100 / 1e6), rate(2, 1.0), rate(3, 1.0))
+            self._unit_prev[service] = cur
+        cpu, io_read, io_write = self._unit_rates.get(service, (None, None, None))
+
+        rss = threads = fds = None
+        if usage.main_pid is not None:
+            rss, threads, fds = self._process_status(usage.main_pid)
+        return UnitResources(
+            service=service,
+            cgroup=usage,
+            rss=rss,
+            threads=threads,
+            fds=fds,
+            cpu_percent=cpu,
+            io_read_rate=io_read,
+            io_write_rate=io_write,
+        )
+
+    def sample_units(self, services: List[str]) -> Dict[str, Optional[UnitResources]]:
+        return {s: self.sample_unit(s) for s in dict.fromkeys(services)}
+
+
+def format_bytes(n: float) -> str:
+    """Розмір у стилі ``free -h``: 512Mi, 7.7Gi."""
+    for unit in ("B", "Ki", "Mi", "Gi", "Ti"):
+        if abs(n) < 1024 or unit == "Ti":
+            return f"{n:.0f}{unit}" if unit in ("B", "Ki") or n >= 100 else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}Ti"
+
+
+def format_duration(seconds: float) -> str:
+    """Тривалість у стилі ``uptime -p``: "3 д 4 год 5 хв"."""
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    parts = []
+    if days:
+        parts.append(f"{days} д")
+    if hours:
+        parts.append(f"{hours} год")
+    if minutes or not parts:
+        parts.append(f"{minutes} хв")
+    return " ".join(parts)
+
+
+def format_timestamp(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
@@ -4,6 +4,9 @@ from typing import Dict, Optional
 import os
 
 
+LOG_SOURCES = ("journal", "file")
+
+
 @dataclass(frozen=True)
 class Target:
     key: str
@@ -14,6 +17,12 @@ class Target:
     env_file: Optional[Path] = None
     req_file: Optional[Path] = None
     log_file: Optional[Path] = None
+    # Ціль пише в journald з коректними пріоритетами (фільтрація логів через -p замість --grep)
+    journal_priorities: bool = False
+    # Джерело логів за замовчуванням: "journal" (journalctl) або "file" (log_file)
+    log_source: str = "journal"
+    # Власний інтервал перевірки watchdog (секунди); None — глобальний ADMIN_BOT_ALERT_INTERVAL
+    alert_interval: Optional[int] = None
 
     def resolved_env_file(self) -> Path:
         return self.env_file or (self.path / ".env")
@@ -42,6 +51,11 @@ def load_targets(targets_str: str) -> Dict[str, Target]:
         env_file = os.getenv(prefix + "ENV_FILE")
         req_file = os.getenv(prefix + "REQ_FILE")
         log_file = os.getenv(prefix + "LOG_FILE")
+        journal_priorities = (os.getenv(prefix + "LOG_PRIORITIES", "") or "").lower() in ("true", "1", "yes")
+        log_source = (os.getenv(prefix + "LOG_SOURCE", "journal") or "journal").strip().lower()
+        if log_source not in LOG_SOURCES:
+            raise RuntimeError(f"{prefix}LOG_SOURCE must be one of: {', '.join(LOG_SOURCES)}")
+        alert_interval = os.getenv(prefix + "ALERT_INTERVAL")
 
         targets[key] = Target(
             key=key,
@@ -52,6 +66,9 @@ def load_targets(targets_str: str) -> Dict[str, Target]:
             env_file=Path(env_file) if env_file else None,
             req_file=Path(req_file) if req_file else None,
             log_file=Path(log_file) if log_file else None,
+            journal_priorities=journal_priorities,
+            log_source=log_source,
+            alert_interval=max(1, int(alert_interval)) if alert_interval else None,
         )
 
     if not targets:
@@ -6,9 +6,17 @@ from aiogram import Bot, Dispatcher
 
 from app.context import Context
 from app.core.config import load_config
+from app.core.exec import configure_limits
+from app.core.procfs import HostCollector
 from app.core.targets import load_targets
 from app.routers.middlewares import admin_only
+from app.services.metrics import monitor_metrics, series_names
+from app.services.outbox import Outbox
+from app.storage.alert_state import AlertStateStore
+from app.storage.journal_cursors import JournalCursorStore
+from app.storage.metrics_history import MetricsHistory
 from app.storage.selection import SelectionStore
+from app.storage.spill import SpillStore
 
 from app.routers import (
     start,
@@ -25,6 +33,8 @@ from app.routers import (
     sysinfo,
     audit_log,
     alerts,
+    full_output,
+    overview,
 )
 from app.routers import frontend_build
 
@@ -36,17 +46,51 @@ def _build_context(repo_root: Path) -> Context:
     config = load_config()
     targets_map = load_targets(config.targets_str)
     selection = SelectionStore.load(repo_root / "state.json")
-
-    return Context(config=config, targets=targets_map, selection=selection, repo_root=repo_root)
+    spill_store = SpillStore(
+        root=repo_root / "spill",
+        max_bytes=config.spill_max_mb * 1024 * 1024,
+        max_age=config.spill_max_age_hours * 3600,
+    )
+    spill_store.evict()
+    journal_cursors = JournalCursorStore.load(repo_root / "journal_cursors.json")
+    alert_state = AlertStateStore.load(
+        repo_root / "alerts.db",
+        ttl=config.alert_state_ttl_hours * 3600,
+        max_entries=config.alert_state_max,
+    )
+
+    metrics = None
+    if config.metrics_interval > 0:
+        metrics = MetricsHistory.open(repo_root / "metrics.bin", series_names(targets_map.values()))
+
+    return Context(
+        config=config,
+        targets=targets_map,
+        selection=selection,
+        repo_root=repo_root,
+        spill=spill_store,
+        journal_cursors=journal_cursors,
+        alert_state=alert_state,
+        host=HostCollector(Path(config.proc_root), Path(config.cgroup_root)),
+        metrics=metrics,
+    )
 
 
 async def main_async():
     repo_root = Path(__file__).resolve().parents[1]
     ctx = _build_context(repo_root)
+    configure_limits(
+        global_limit=ctx.config.max_concurrent_commands,
+        per_key_limit=ctx.config.max_concurrent_per_target,
+    )
 
     bot = Bot(token=ctx.config.token)
     dp = Dispatcher()
 
+    # Усі масові відправки (логи, сповіщення) — через чергу з лімітами Telegram
+    ctx.outbox = Outbox(bot)
+    ctx.outbox.start()
+
     # middleware
     dp.message.middleware(admin_only(ctx.config.admin_id))
     dp.callback_query.middleware(admin_only(ctx.config.admin_id))
@@ -59,6 +103,7 @@ async def main_async():
     dp.include_router(targets.router)
     dp.include_router(logs.router)
     dp.include_router(status.router)
+    dp.include_router(overview.router)
     dp.include_router(pip_ops.router)
     dp.include_router(git_ops.router)
     dp.include_router(restart.router)
@@ -70,26 +115,49 @@ async def main_async():
     dp.include_router(sysinfo.router)
     dp.include_router(audit_log.router)
     dp.include_router(alerts.router)
+    dp.include_router(full_output.router)
+
+    # Фонові підписки на журнал цілей
+    if ctx.config.journal_follow:
+        from app.services.journal_follower import JournalFollower
+
+        for t in ctx.targets.values():
+            follower = JournalFollower(t.service, maxlen=ctx.config.journal_buffer_lines)
+            follower.start()
+            ctx.journal_followers[t.service] = follower
+        logger.info("Підписка на журнал: %d сервісів", len(ctx.journal_followers))
 
     # Запуск watchdog якщо вмикано
     watchdog_task = None
     if ctx.config.alerts_enabled:
         from app.services.watchdog import monitor_targets
 
-        watchdog_task = asyncio.create_task(monitor_targets(bot, ctx))
-        logger.info("Моніторинг вмикано: перевірка кожні %dс", ctx.config.alert_interval)
+        watchdog_task = asyncio.create_task(monitor_targets(ctx))
+        logger.info("Моніторинг вмикано: базовий інтервал %dс", ctx.config.alert_interval)
+
+    # Фонова вибірка історії метрик
+    metrics_task = None
+    if ctx.metrics is not None:
+        metrics_task = asyncio.create_task(monitor_metrics(ctx))
 
     try:
         await bot.delete_webhook(drop_pending_updates=True)
         logger.info("Адмін-бот запущено. Цілі: %s", ",".join(ctx.targets.keys()))
         await dp.start_polling(bot, ctx=ctx)
     finally:
-        if watchdog_task:
-            watchdog_task.cancel()
-            try:
-                await watchdog_task
-            except asyncio.CancelledError:
-                pass
+        for task in (watchdog_task, metrics_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        for follower in ctx.journal_followers.values():
+            await follower.stop()
+        ctx.alert_state.flush()
+        if ctx.metrics is not None:
+            ctx.metrics.close()
+        await ctx.outbox.stop()
         await bot.session.close()
 
 
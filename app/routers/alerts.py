@@ -1,11 +1,15 @@
 """Маршрутизатор для обробки швидких дій зі сповіщень."""
 import asyncio
-from aiogram import Router, F
-from aiogram.types import CallbackQuery
+from datetime import datetime
+from typing import Optional
+
+from aiogram import Router, F, types
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 
 from app.context import Context
 from app.core.exec import safe_html, split_text_chunks
-from app.services.watchdog import acknowledge_alert
+from app.services.watchdog import acknowledge_alert, unacknowledge_alert
 from app.services.systemd import sudo_systemctl_restart, systemctl_is_active
 from app.services.journal import journalctl_lines
 from app.services.audit import log_action
@@ -14,13 +18,22 @@ from app.services.audit import log_action
 router = Router()
 
 
+def _without_button(markup: Optional[InlineKeyboardMarkup], data: str) -> Optional[InlineKeyboardMarkup]:
+    """Клавіатура без натиснутої кнопки (інші дії дайджесту лишаються доступними)."""
+    if markup is None:
+        return None
+    rows = [[b for b in row if b.callback_data != data] for row in markup.inline_keyboard]
+    rows = [row for row in rows if row]
+    return InlineKeyboardMarkup(inline_keyboard=rows) if rows else None
+
+
 @router.callback_query(F.data.startswith("ack_alert:"))
 async def acknowledge_alert_callback(cb: CallbackQuery, ctx: Context):
     """Помітити alert як 'в роботі' - більше не спамити."""
     alert_key = cb.data.replace("ack_alert:", "")
     
     # Помічаємо alert
-    acknowledge_alert(alert_key)
+    acknowledge_alert(alert_key, ctx=ctx)
     
     # Audit log
     log_action(
@@ -33,12 +46,69 @@ async def acknowledge_alert_callback(cb: CallbackQuery, ctx: Context):
     )
     
     await cb.message.edit_text(
-        cb.message.text + "\n\n✅ <b>Помічено як 'в роботі'</b>\nПовторні сповіщення про цю проблему відключено.",
+        cb.message.html_text + "\n\n✅ <b>Помічено як 'в роботі'</b>\nПовторні сповіщення про цю проблему відключено.",
         parse_mode="HTML",
+        reply_markup=_without_button(cb.message.reply_markup, cb.data),
     )
     await cb.answer("✅ Алерт помічено")
 
 
+_ALERTS_LIST_LIMIT = 20
+
+
+def _alerts_list(ctx: Context):
+    """Текст і клавіатура зі списком активних сповіщень."""
+    states = ctx.alert_state.active()[:_ALERTS_LIST_LIMIT]
+    if not states:
+        return "🔔 <b>Активні сповіщення</b>\n\nЖодних сповіщень немає.", None
+
+    lines = ["🔔 <b>Активні сповіщення</b>\n"]
+    buttons = []
+    for i, st in enumerate(states, 1):
+        icon = "✅" if st.acknowledged else "🔥"
+        last = datetime.fromtimestamp(st.last_sent).strftime("%d.%m %H:%M")
+        lines.append(
+            f"{i}. {icon} <code>{safe_html(st.target or '-', max_len=64)}</code> · ×{st.sent_count} · {last}\n"
+            f"   {safe_html(st.summary or st.key, max_len=150)}"
+        )
+        if st.acknowledged:
+            buttons.append(
+                [InlineKeyboardButton(text=f"🔔 {i}. Зняти 'в роботі'", callback_data=f"unack_alert:{st.key}"[:64])]
+            )
+    kb = InlineKeyboardMarkup(inline_keyboard=buttons) if buttons else None
+    return "\n".join(lines), kb
+
+
+@router.message(Command("alerts"))
+async def cmd_alerts(message: types.Message, ctx: Context):
+    """Показати активні сповіщення та позначки 'в роботі'."""
+    text, kb = _alerts_list(ctx)
+    await message.answer(text, reply_markup=kb, parse_mode="HTML")
+
+
+@router.callback_query(F.data.startswith("unack_alert:"))
+async def unacknowledge_alert_callback(cb: CallbackQuery, ctx: Context):
+    """Зняти позначку 'в роботі' - сповіщення знову надсилатимуться."""
+    alert_key = cb.data.replace("unack_alert:", "")
+
+    if not unacknowledge_alert(alert_key, ctx=ctx):
+        await cb.answer("⚠️ Алерт не знайдено або вже знято", show_alert=True)
+        return
+
+    log_action(
+        user_id=cb.from_user.id,
+        action="unacknowledge_alert",
+        target=alert_key,
+        status="unacknowledged",
+        repo_root=ctx.repo_root,
+        details="Знято позначку 'в роботі'",
+    )
+
+    text, kb = _alerts_list(ctx)
+    await cb.message.edit_text(text, reply_markup=kb, parse_mode="HTML")
+    await cb.answer("🔔 Сповіщення знову увімкнено")
+
+
 @router.callback_query(F.data.startswith("quick_restart:"))
 async def quick_restart_callback(cb: CallbackQuery, ctx: Context):
     """Швидкий рестарт сервісу з alertу."""
@@ -53,10 +123,10 @@ async def quick_restart_callback(cb: CallbackQuery, ctx: Context):
     await cb.answer("⏳ Рестарт...", show_alert=True)
     
     # Рестарт
-    sudo_systemctl_restart(target.service, ctx=ctx)
+    await sudo_systemctl_restart(target.service, ctx=ctx)
     await asyncio.sleep(3)
     
-    status = systemctl_is_active(target.service, ctx=ctx).strip()
+    status = (await systemctl_is_active(target.service, ctx=ctx)).strip()
     is_success = status == "active"
     
     # Audit log
@@ -93,7 +163,7 @@ async def quick_logs_callback(cb: CallbackQuery, ctx: Context):
     
     await cb.answer("⏳ Завантажую логи...", show_alert=True)
     
-    logs = journalctl_lines(target.service, n=50, ctx=ctx)
+    logs = await journalctl_lines(target.service, n=50, ctx=ctx)
     
     if not logs or logs.startswith("❌"):
         await cb.message.answer(
@@ -102,17 +172,10 @@ async def quick_logs_callback(cb: CallbackQuery, ctx: Context):
         )
         return
     
-    # Розбиваємо на chunks
-    chunks = split_text_chunks(logs)
-    
-    await cb.message.answer(
-        f"📜 <b>Логи ({target.key}) - останні 50 рядків</b>\n\n"
-        f"<blockquote expandable>{safe_html(chunks[0], max_len=ctx.config.max_output_size)}</blockquote>",
-        parse_mode="HTML",
-    )
-    
-    for ch in chunks[1:]:
-        await cb.message.answer(
-            f"<blockquote expandable>{safe_html(ch, max_len=ctx.config.max_output_size)}</blockquote>",
-            parse_mode="HTML",
-        )
+    # Розбиваємо на chunks і надсилаємо через чергу з лімітами
+    chunks = [
+        f"<blockquote expandable>{safe_html(ch, max_len=ctx.config.max_output_size)}</blockquote>"
+        for ch in split_text_chunks(logs)
+    ]
+    chunks[0] = f"📜 <b>Логи ({target.key}) - останні 50 рядків</b>\n\n{chunks[0]}"
+    await ctx.outbox.send_chunks(cb.message.chat.id, chunks, parse_mode="HTML")
@@ -57,18 +57,15 @@ async def audit_view(cb: CallbackQuery, ctx: Context):
             await cb.answer()
             return
 
-        # Розбиваємо на чанки якщо дуже довго
-        chunks = split_text_chunks(logs)
+        await cb.answer()
 
-        await cb.message.answer(
-            f"📝 <b>Журнал аудиту (останні {limit})</b>\n\n"
-            f"<blockquote expandable>{safe_html(chunks[0], max_len=ctx.config.max_output_size)}</blockquote>",
-            parse_mode="HTML",
-        )
-        for ch in chunks[1:]:
-            await cb.message.answer(
-                f"<blockquote expandable>{safe_html(ch, max_len=ctx.config.max_output_size)}</blockquote>",
-                parse_mode="HTML",
-            )
+        # Розбиваємо на чанки якщо дуже довго; надсилаємо через чергу з лімітами
+        chunks = [
+            f"<blockquote expandable>{safe_html(ch, max_len=ctx.config.max_output_size)}</blockquote>"
+            for ch in split_text_chunks(logs)
+        ]
+        chunks[0] = f"📝 <b>Журнал аудиту (останні {limit})</b>\n\n{chunks[0]}"
+        await ctx.outbox.send_chunks(cb.message.chat.id, chunks, parse_mode="HTML")
+        return
 
     await cb.answer()
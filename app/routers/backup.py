@@ -14,7 +14,7 @@ async def backup_db(message: types.Message, ctx: Context):
     target = ctx.get_active_target(message.chat.id)
     msg = await message.answer("⏳ <i>Створюю бекап...</i>", parse_mode="HTML")
 
-    ok, info, filename = backup_postgres(target, ctx=ctx)
+    ok, info, filename = await backup_postgres(target, ctx=ctx)
     if not ok:
         await msg.edit_text(f"❌ {safe_html(info, max_len=ctx.config.max_output_size)}", parse_mode="HTML")
         return
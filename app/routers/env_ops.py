@@ -17,6 +17,12 @@ class EnvState(StatesGroup):
     waiting_for_new_value = State()
 
 
+def _invalidate_env_probes(ctx: Context, target_key: str) -> None:
+    # Перевірки БД/Redis будуються з .env цілі
+    ctx.probes.invalidate("db", target_key)
+    ctx.probes.invalidate("redis", target_key)
+
+
 async def _show_env_menu(message_obj, ctx: Context, *, edit: bool = False):
     target = ctx.get_active_target(message_obj.chat.id)
     env_path = target.resolved_env_file()
@@ -74,6 +80,7 @@ async def set_env_value(message: types.Message, state: FSMContext, ctx: Context)
     env_vars = parse_env_file(env_path)
     env_vars[str(key)] = message.text.strip()
     write_env_file(env_path, env_vars)
+    _invalidate_env_probes(ctx, target.key)
 
     await state.clear()
     await _show_env_menu(message, ctx)
@@ -107,6 +114,7 @@ async def add_new_env_value(message: types.Message, state: FSMContext, ctx: Cont
     env_vars = parse_env_file(env_path)
     env_vars[str(key)] = message.text.strip()
     write_env_file(env_path, env_vars)
+    _invalidate_env_probes(ctx, target.key)
 
     await state.clear()
     await message.answer("✅ Змінну додано!", parse_mode="HTML")
@@ -1,13 +1,12 @@
-import asyncio
-import subprocess
 from pathlib import Path
 
 from aiogram import Router, F, types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 
 from app.context import Context
-from app.core.exec import safe_html
+from app.core.exec import run_command_spilled, safe_html
 from app.services.audit import log_action
+from app.ui.keyboards import full_output_keyboard
 
 router = Router()
 
@@ -71,27 +70,16 @@ async def confirm_build(cb: CallbackQuery, ctx: Context):
         parse_mode="HTML",
     )
 
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            "npm", "run", "build",
-            cwd=str(frontend_path),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-        )
-        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=300)
-        output = stdout.decode(errors="replace")
-        success = proc.returncode == 0
-    except asyncio.TimeoutError:
-        output = "Перевищено час очікування (5 хв)"
-        success = False
-    except Exception as e:
-        output = str(e)
-        success = False
-
-    # Обрізаємо вивід до ліміту
     max_len = ctx.config.max_output_size - 200
-    if len(output) > max_len:
-        output = "..." + output[-max_len:]
+    output, spill_id = await run_command_spilled(
+        ["npm", "run", "build"],
+        cwd=frontend_path,
+        timeout=300,
+        max_output_size=max_len,
+        limit_key=target.service,
+        spill=ctx.spill,
+    )
+    success = not output.startswith(("❌", "⏱"))
 
     log_action(
         user_id=cb.from_user.id,
@@ -107,6 +95,7 @@ async def confirm_build(cb: CallbackQuery, ctx: Context):
         f"{icon} <b>{'Збірка успішна' if success else 'Збірка провалилась'}</b>\n"
         f"<pre>{safe_html(output, max_len=max_len)}</pre>",
         parse_mode="HTML",
+        reply_markup=full_output_keyboard(spill_id),
     )
     await cb.answer()
 
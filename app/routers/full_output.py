@@ -0,0 +1,41 @@
+"""Маршрутизатор для завантаження повного виводу команд зі сховища."""
+from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest, TelegramEntityTooLarge
+from aiogram.types import CallbackQuery, FSInputFile
+
+from app.context import Context
+
+
+router = Router()
+
+# Обмеження Telegram Bot API на розмір файлу
+_UPLOAD_LIMIT = 50 * 1024 * 1024
+
+
+@router.callback_query(F.data.startswith("spill:"))
+async def full_output_download(cb: CallbackQuery, ctx: Context):
+    spill_id = cb.data.split(":", 1)[1]
+    path = ctx.spill.get(spill_id)
+    try:
+        size = path.stat().st_size if path is not None else None
+    except FileNotFoundError:
+        # Файл міг бути витіснений між get і відправкою
+        size = None
+    if size is None:
+        await cb.answer("❌ Повний вивід більше недоступний", show_alert=True)
+        return
+    if size > _UPLOAD_LIMIT:
+        await cb.answer(
+            f"❌ Повний вивід завеликий для Telegram ({size / 1024 / 1024:.1f} МБ gzip)",
+            show_alert=True,
+        )
+        return
+
+    await cb.answer("⏳ Надсилаю файл...")
+    try:
+        await cb.message.answer_document(
+            FSInputFile(str(path), filename=f"output_{spill_id}.log.gz"),
+            caption=f"📄 Повний вивід ({size / 1024:.1f} КБ, gzip)",
+        )
+    except (FileNotFoundError, TelegramBadRequest, TelegramEntityTooLarge) as e:
+        await cb.message.answer(f"❌ Не вдалося надіслати повний вивід: {e}")
@@ -5,6 +5,7 @@ from app.context import Context
 from app.core.exec import safe_html
 from app.services.git import git_pull
 from app.services.audit import log_action
+from app.ui.keyboards import full_output_keyboard
 
 
 router = Router()
@@ -15,7 +16,7 @@ async def git_pull_msg(message: types.Message, ctx: Context):
     target = ctx.get_active_target(message.chat.id)
     msg = await message.answer("⏳ <i>Git Pull...</i>", parse_mode="HTML")
 
-    pull_res, log1, updated = git_pull(target, ctx=ctx)
+    pull_res, log1, updated, spill_id = await git_pull(target, ctx=ctx)
     icon = "✅" if (updated or "Already up to date" in pull_res) else "⚠️"
 
     # Audit log
@@ -33,7 +34,7 @@ async def git_pull_msg(message: types.Message, ctx: Context):
         f"🔖 {safe_html(log1, max_len=ctx.config.max_output_size)}\n"
         f"<blockquote expandable>{safe_html(pull_res, max_len=ctx.config.max_output_size)}</blockquote>"
     )
-    await msg.edit_text(text, parse_mode="HTML")
+    await msg.edit_text(text, parse_mode="HTML", reply_markup=full_output_keyboard(spill_id))
 
     if updated:
         kb = InlineKeyboardMarkup(
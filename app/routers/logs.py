@@ -1,13 +1,15 @@
-import re
-import tempfile
-from pathlib import Path
+from datetime import datetime
+from typing import List, Optional
 
 from aiogram import Router, F, types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, FSInputFile
 
 from app.context import Context
 from app.core.exec import safe_html, split_text_chunks
-from app.services.journal import journalctl_lines
+from app.services.journal import LEVEL_FILTERS, journalctl_filtered, journalctl_lines
+from app.services.log_export import export_journal, export_logfile
+from app.services.log_templates import TemplateMiner, summarize_logs
+from app.services.logfile import logfile_lines
 
 
 router = Router()
@@ -31,26 +33,31 @@ _LABEL_MAP = {
     "12h": "12 год",
 }
 
-# ── патерни фільтрації ──────────────────────────────────────────────────
-_PATTERNS = {
-    "errors":   re.compile(r"ERROR|CRITICAL|Exception|Traceback", re.IGNORECASE),
-    "warnings": re.compile(r"warning", re.IGNORECASE),
-}
+# Обмеження Telegram Bot API на розмір файлу
+_UPLOAD_LIMIT = 50 * 1024 * 1024
+# Скільки шаблонів показувати у зведенні
+_SUMMARY_TOP = 10
 
 
-def _filter_lines(raw: str, level: str) -> str:
-    """Повертає рядки журналу, що відповідають рівню level."""
-    pattern = _PATTERNS.get(level)
-    if pattern is None:
-        return raw
-    filtered = [ln for ln in raw.splitlines() if pattern.search(ln)]
-    return "\n".join(filtered)
+def _human_size(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / 1024 / 1024:.1f} МБ"
+    return f"{n / 1024:.1f} КБ"
 
 
-@router.message(F.text == "📜 Логи")
-async def logs_menu(message: types.Message):
-    kb = InlineKeyboardMarkup(
+_SOURCE_LABEL = {"journal": "journalctl", "file": "файл"}
+
+
+def _logs_title(source: str) -> str:
+    return f"📜 <b>Логи ({_SOURCE_LABEL[source]})</b>"
+
+
+def _logs_keyboard(source: str) -> InlineKeyboardMarkup:
+    other = "file" if source == "journal" else "journal"
+    return InlineKeyboardMarkup(
         inline_keyboard=[
+            # ── джерело логів цілі ──
+            [InlineKeyboardButton(text=f"🔁 Перемкнути на: {_SOURCE_LABEL[other]}", callback_data="logs:src")],
             # ── всі логи — переглянути ──
             [
                 InlineKeyboardButton(text="📋 Всі (5 хв)",  callback_data="logs:view:all:5m"),
@@ -87,20 +94,79 @@ async def logs_menu(message: types.Message):
                 InlineKeyboardButton(text="📥 Попередження (10 хв)", callback_data="logs:dl:warnings:10m"),
                 InlineKeyboardButton(text="📥 Попередження (20 хв)", callback_data="logs:dl:warnings:20m"),
             ],
+            # ── зведення помилок: шаблони з кількістю замість тисяч рядків ──
+            [
+                InlineKeyboardButton(text="📊 Зведення (1 год)",  callback_data="logs:sum:errors:1h"),
+                InlineKeyboardButton(text="📊 Зведення (5 год)",  callback_data="logs:sum:errors:5h"),
+                InlineKeyboardButton(text="📊 Зведення (12 год)", callback_data="logs:sum:errors:12h"),
+            ],
             # ── скачати всі логи за годину ──
             [
                 InlineKeyboardButton(text="📥 Скачати (1 год)",  callback_data="logs:dl:all:1h"),
                 InlineKeyboardButton(text="📥 Скачати (5 год)",  callback_data="logs:dl:all:5h"),
                 InlineKeyboardButton(text="📥 Скачати (12 год)", callback_data="logs:dl:all:12h"),
             ],
+            # ── скачати всі логи як NDJSON (усі поля journald) ──
+            [
+                InlineKeyboardButton(text="🧾 NDJSON (1 год)",  callback_data="logs:dlj:all:1h"),
+                InlineKeyboardButton(text="🧾 NDJSON (5 год)",  callback_data="logs:dlj:all:5h"),
+                InlineKeyboardButton(text="🧾 NDJSON (12 год)", callback_data="logs:dlj:all:12h"),
+            ],
         ]
     )
-    await message.answer("📜 <b>Логи (journalctl)</b>", reply_markup=kb, parse_mode="HTML")
+
+
+def _format_time(ts: Optional[float]) -> str:
+    return datetime.fromtimestamp(ts).strftime("%d.%m %H:%M:%S") if ts else "?"
+
+
+def _format_summary(miner: TemplateMiner) -> List[str]:
+    """Блоки зведення; кожен блок — цілий HTML-фрагмент, який не можна розривати."""
+    if not miner.total:
+        return ["(немає подій)"]
+    lines = [f"Подій: <code>{miner.total}</code> · шаблонів: <code>{miner.cluster_count}</code>"]
+    if miner.evicted:
+        lines.append(f"Рідкісних подій поза зведенням: <code>{miner.evicted}</code>")
+    for i, tpl in enumerate(miner.top(_SUMMARY_TOP), 1):
+        lines.append(
+            f"\n<b>{i}.</b> ×<code>{tpl.count}</code> · {_format_time(tpl.first_seen)} – {_format_time(tpl.last_seen)}\n"
+            f"<code>{safe_html(tpl.text, max_len=300)}</code>\n"
+            f"<blockquote expandable>{safe_html(tpl.sample, max_len=300)}</blockquote>"
+        )
+    return lines
+
+
+def _pack_blocks(blocks: List[str], *, max_chunk: int = 3800) -> List[str]:
+    chunks: List[str] = []
+    cur = ""
+    for block in blocks:
+        if cur and len(cur) + len(block) + 1 > max_chunk:
+            chunks.append(cur)
+            cur = ""
+        cur = f"{cur}\n{block}" if cur else block
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+@router.message(F.text == "📜 Логи")
+async def logs_menu(message: types.Message, ctx: Context):
+    source = ctx.get_log_source(ctx.get_active_target(message.chat.id))
+    await message.answer(_logs_title(source), reply_markup=_logs_keyboard(source), parse_mode="HTML")
+
+
+@router.callback_query(F.data == "logs:src")
+async def logs_toggle_source(cb: CallbackQuery, ctx: Context):
+    target = ctx.get_active_target(cb.message.chat.id)
+    source = ctx.toggle_log_source(target)
+    await cb.message.edit_text(_logs_title(source), reply_markup=_logs_keyboard(source), parse_mode="HTML")
+    await cb.answer(f"Джерело логів {target.key}: {_SOURCE_LABEL[source]}")
 
 
 @router.callback_query(F.data.startswith("logs:"))
 async def logs_view(cb: CallbackQuery, ctx: Context):
     target = ctx.get_active_target(cb.message.chat.id)
+    source = ctx.get_log_source(target)
     parts = cb.data.split(":")
 
     # очікуємо формат logs:<action>:<level>:<timeframe>
@@ -113,39 +179,75 @@ async def logs_view(cb: CallbackQuery, ctx: Context):
     since = _SINCE_MAP.get(timeframe)
     label = _LABEL_MAP.get(timeframe, timeframe)
 
-    if since is None or action not in {"view", "dl"}:
+    if since is None or action not in {"view", "dl", "dlj", "sum"}:
         await cb.answer()
         return
 
-    raw = journalctl_lines(target.service, since=since, ctx=ctx)
-
-    if level in _PATTERNS:
-        out = _filter_lines(raw, level) or "(немає збігів)"
-    else:
-        out = raw
-
     icon = "🚨" if level == "errors" else "⚠️" if level == "warnings" else "📋"
     lvl_name = "помилки" if level == "errors" else "попередження" if level == "warnings" else "всі"
 
-    if action == "dl":
+    if action in {"dl", "dlj"}:
+        fmt = "ndjson" if action == "dlj" else "text"
+        if source == "file" and fmt == "ndjson":
+            await cb.answer("NDJSON доступний лише для journalctl", show_alert=True)
+            return
         await cb.answer("⏳ Генерую файл…", show_alert=True)
 
-        if not out or out.startswith("❌"):
+        level_arg = level if level in LEVEL_FILTERS else None
+        if source == "file":
+            export, err = await export_logfile(target, since=since, level=level_arg)
+        else:
+            export, err = await export_journal(target, ctx=ctx, since=since, level=level_arg, fmt=fmt)
+        if export is None:
+            await cb.message.answer(f"❌ Логи недоступні: {safe_html(err, max_len=500)}", parse_mode="HTML")
+            return
+        if export.lines == 0:
+            export.path.unlink(missing_ok=True)
             await cb.message.answer("❌ Логи недоступні або порожні")
             return
+        if export.compressed_bytes > _UPLOAD_LIMIT:
+            export.path.unlink(missing_ok=True)
+            await cb.message.answer(
+                f"❌ Архів завеликий для Telegram ({_human_size(export.compressed_bytes)}). Оберіть менший період."
+            )
+            return
 
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".txt", prefix=f"logs_{level}_{target.key}_", delete=False, encoding="utf-8"
-        ) as tmp:
-            tmp.write(out + "\n")
-            tmp_path = Path(tmp.name)
+        caption = (
+            f"{icon} Логи ({lvl_name}) — останні {label} ({target.key})\n"
+            f"🧾 {fmt} · {export.lines} рядків · {_human_size(export.raw_bytes)} → "
+            f"{_human_size(export.compressed_bytes)} ({export.codec})"
+        )
+        try:
+            await cb.message.answer_document(FSInputFile(str(export.path)), caption=caption)
+        finally:
+            export.path.unlink(missing_ok=True)
+        return
 
-        caption = f"{icon} Логи ({lvl_name}) — останні {label} ({target.key})"
-        await cb.message.answer_document(FSInputFile(str(tmp_path)), caption=caption)
-        tmp_path.unlink(missing_ok=True)
+    if action == "sum":
+        await cb.answer("⏳ Аналізую логи…")
+        miner, err = await summarize_logs(
+            target, ctx=ctx, since=since, level=level if level in LEVEL_FILTERS else None, source=source
+        )
+        if miner is None:
+            await cb.message.answer(f"❌ Логи недоступні: {safe_html(err, max_len=500)}", parse_mode="HTML")
+            return
+        title = f"📊 <b>Зведення ({lvl_name}) за {label}</b> ({safe_html(target.key, max_len=64)})"
+        chunks = _pack_blocks(_format_summary(miner))
+        chunks[0] = f"{title}\n\n{chunks[0]}"
+        await ctx.outbox.send_chunks(cb.message.chat.id, chunks, parse_mode="HTML")
         return
 
     # action == "view"
+    if source == "file":
+        out = await logfile_lines(target, ctx=ctx, since=since, level=level if level in LEVEL_FILTERS else None)
+        if level in LEVEL_FILTERS and not out:
+            out = "(немає збігів)"
+    elif level in LEVEL_FILTERS:
+        # Фільтрація на боці journald — по всьому вікну, а не по обрізаному виводу
+        out = await journalctl_filtered(target, level, since=since, ctx=ctx) or "(немає збігів)"
+    else:
+        out = await journalctl_lines(target.service, since=since, ctx=ctx)
+
     title = f"{icon} Логи ({lvl_name}) за останні {label} ({target.key})"
 
     if not out or out.startswith("❌"):
@@ -153,16 +255,11 @@ async def logs_view(cb: CallbackQuery, ctx: Context):
         await cb.answer()
         return
 
+    await cb.answer()
+
     chunks = split_text_chunks(out)
     max_len = ctx.config.max_output_size
-    await cb.message.answer(
-        f"{title}\n<blockquote expandable>{safe_html(chunks[0], max_len=max_len)}</blockquote>",
-        parse_mode="HTML",
-    )
-    for ch in chunks[1:]:
-        await cb.message.answer(
-            f"<blockquote expandable>{safe_html(ch, max_len=max_len)}</blockquote>",
-            parse_mode="HTML",
-        )
-
-    await cb.answer()
+    blocks = [f"<blockquote expandable>{safe_html(ch, max_len=max_len)}</blockquote>" for ch in chunks]
+    blocks[0] = f"{title}\n{blocks[0]}"
+    # Через чергу: ліміти Telegram і flood control не обривають перегляд
+    await ctx.outbox.send_chunks(cb.message.chat.id, blocks, parse_mode="HTML")
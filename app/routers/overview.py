@@ -0,0 +1,41 @@
+from aiogram import Router, F, types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+
+from app.context import Context
+from app.services.overview import collect_overview, render_overview
+
+
+router = Router()
+
+
+def _overview_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="🔄 Оновити", callback_data="overview:refresh")]]
+    )
+
+
+@router.message(F.text == "🗺 Огляд")
+async def overview(message: types.Message, ctx: Context):
+    msg = await message.answer("⏳ <i>Перевіряю всі цілі...</i>", parse_mode="HTML")
+    snapshot = await collect_overview(ctx)
+    await msg.edit_text(
+        render_overview(snapshot, max_len=ctx.config.max_output_size),
+        parse_mode="HTML",
+        reply_markup=_overview_keyboard(),
+    )
+
+
+@router.callback_query(F.data == "overview:refresh")
+async def overview_refresh(cb: CallbackQuery, ctx: Context):
+    await cb.answer()
+    snapshot = await collect_overview(ctx)
+    try:
+        await cb.message.edit_text(
+            render_overview(snapshot, max_len=ctx.config.max_output_size),
+            parse_mode="HTML",
+            reply_markup=_overview_keyboard(),
+        )
+    except TelegramBadRequest:
+        # "message is not modified" — знімок ще не застарів
+        pass
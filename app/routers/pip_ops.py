@@ -7,6 +7,7 @@ from app.context import Context
 from app.core.exec import safe_html
 from app.core.files import read_file, write_file
 from app.services.pip import pip_freeze, pip_install, pip_outdated
+from app.ui.keyboards import full_output_keyboard
 
 
 router = Router()
@@ -75,10 +76,11 @@ async def pip_edit_save(message: types.Message, state: FSMContext, ctx: Context)
 async def pip_install_cb(cb: CallbackQuery, ctx: Context):
     target = ctx.get_active_target(cb.message.chat.id)
     msg = await cb.message.answer("⏳ <i>Встановлення pip...</i>", parse_mode="HTML")
-    out = pip_install(target, ctx=ctx)
+    out, spill_id = await pip_install(target, ctx=ctx)
     await msg.edit_text(
         f"📦 <b>pip install</b> ({target.key})\n<blockquote expandable>{safe_html(out, max_len=ctx.config.max_output_size)}</blockquote>",
         parse_mode="HTML",
+        reply_markup=full_output_keyboard(spill_id),
     )
 
     kb = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="🔄 Перезапустити сервіс", callback_data="confirm_restart")]])
@@ -90,10 +92,11 @@ async def pip_install_cb(cb: CallbackQuery, ctx: Context):
 async def pip_freeze_cb(cb: CallbackQuery, ctx: Context):
     target = ctx.get_active_target(cb.message.chat.id)
     msg = await cb.message.answer("⏳", parse_mode="HTML")
-    out = pip_freeze(target, ctx=ctx)
+    out, spill_id = await pip_freeze(target, ctx=ctx)
     await msg.edit_text(
         f"📦 <b>pip freeze</b> ({target.key})\n<blockquote expandable>{safe_html(out, max_len=ctx.config.max_output_size)}</blockquote>",
         parse_mode="HTML",
+        reply_markup=full_output_keyboard(spill_id),
     )
     await cb.answer()
 
@@ -102,12 +105,12 @@ async def pip_freeze_cb(cb: CallbackQuery, ctx: Context):
 async def pip_outdated_cb(cb: CallbackQuery, ctx: Context):
     target = ctx.get_active_target(cb.message.chat.id)
     msg = await cb.message.answer("⏳ <i>Перевіряю...</i>", parse_mode="HTML")
-    out = pip_outdated(target, ctx=ctx)
+    out, spill_id = await pip_outdated(target, ctx=ctx)
 
     text = (
         f"✅ Всі пакети актуальні ({target.key})"
         if "Package" not in out
         else f"🔍 <b>Застарілі пакети</b> ({target.key})\n<blockquote expandable>{safe_html(out, max_len=ctx.config.max_output_size)}</blockquote>"
     )
-    await msg.edit_text(text, parse_mode="HTML")
+    await msg.edit_text(text, parse_mode="HTML", reply_markup=full_output_keyboard(spill_id))
     await cb.answer()
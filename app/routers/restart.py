@@ -35,10 +35,10 @@ async def confirm_restart(cb: CallbackQuery, ctx: Context):
     target = ctx.get_active_target(cb.message.chat.id)
     msg = await cb.message.edit_text(f"🔄 Перезапускаю <code>{target.service}</code>...", parse_mode="HTML")
 
-    sudo_systemctl_restart(target.service, ctx=ctx)
+    await sudo_systemctl_restart(target.service, ctx=ctx)
     await asyncio.sleep(3)
 
-    status = systemctl_is_active(target.service, ctx=ctx)
+    status = await systemctl_is_active(target.service, ctx=ctx)
     is_success = status.strip() == "active"
     
     # Audit log
@@ -1,11 +1,11 @@
 import asyncio
 import logging
-import subprocess
 
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
 
 from app.context import Context
+from app.services.systemd import sudo_systemctl_restart
 
 
 logger = logging.getLogger("admin_bot")
@@ -20,10 +20,10 @@ async def restart_self_handler(cb: CallbackQuery, ctx: Context):
         "Бот тимчасово недоступний. Зачекайте 10-15 секунд і натисніть /start.",
         parse_mode="HTML",
     )
-    asyncio.create_task(_run_self_restart(ctx.config.self_service_name))
+    asyncio.create_task(_run_self_restart(ctx))
 
 
-async def _run_self_restart(service_name: str):
+async def _run_self_restart(ctx: Context):
     await asyncio.sleep(1)
-    logger.warning("Ініційовано самоперезапуск для сервісу: %s", service_name)
-    subprocess.run(["sudo", "systemctl", "restart", service_name])
+    logger.warning("Ініційовано самоперезапуск для сервісу: %s", ctx.config.self_service_name)
+    await sudo_systemctl_restart(ctx.config.self_service_name, ctx=ctx)
@@ -38,7 +38,7 @@ async def self_update_btn(message: types.Message):
 async def confirm_self_update(cb: CallbackQuery, ctx: Context):
     msg = await cb.message.edit_text("⏳ <i>Оновлюю admin_bot з git...</i>", parse_mode="HTML")
 
-    res, log1, updated = await asyncio.to_thread(self_git_update, ctx=ctx)
+    res, log1, updated = await self_git_update(ctx=ctx)
     icon = "✅" if updated else "ℹ️"
 
     text = (
@@ -61,4 +61,4 @@ async def cancel_self_update(cb: CallbackQuery):
 
 async def _delayed_self_restart(ctx: Context):
     await asyncio.sleep(1)
-    await asyncio.to_thread(sudo_systemctl_restart, ctx.config.self_service_name, ctx=ctx)
+    await sudo_systemctl_restart(ctx.config.self_service_name, ctx=ctx)
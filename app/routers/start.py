@@ -55,14 +55,17 @@ async def cmd_help(message: types.Message):
         "• Автоматичні сповіщення про проблеми\n"
         "• ✅ Виправляємо — помітити як 'в роботі'\n"
         "• 🔄 Перезапуск — швидкий рестарт\n"
-        "• 📜 Повні логи — останні 50 рядків\n\n"
+        "• 📜 Повні логи — останні 50 рядків\n"
+        "• /alerts — активні сповіщення, зняти 'в роботі'\n\n"
         "<b>📝 Аудит:</b>\n"
         "• /audit — перегляд історії дій\n"
         "• Записуються: перезапуск, git pull, сповіщення\n\n"
         "<b>🎯 Інше:</b>\n"
         "• 🎯 Бот — обрати ціль (generator/inventory)\n"
+        "• 🗺 Огляд — стан, БД, Redis і коміт усіх цілей одразу\n"
         "• 🚀 GIT PULL — оновити код + перезапуск\n"
         "• 🤖 Самооновлення — оновити admin_bot\n"
-        "• ⚙️ /sysinfo — CPU, RAM, попередження про диск",
+        "• ⚙️ /sysinfo — CPU, RAM, попередження про диск\n"
+        "• 📋 /resources — CPU, пам'ять, fd і IO всіх цілей",
         parse_mode="HTML",
     )
@@ -4,13 +4,24 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQu
 from app.context import Context
 from app.core.exec import safe_html
 from app.services.db import get_db_status
+from app.services.metrics import history_block, target_history
 from app.services.redis import get_redis_status
-from app.services.systemd import systemctl_status
+from app.services.systemd import UnitSnapshot, systemctl_show_units, systemctl_status
 
 
 router = Router()
 
 
+def _format_snapshot(snap: UnitSnapshot) -> str:
+    mem = f"{snap.memory_current / 1024 / 1024:.1f} MB" if snap.memory_current is not None else "N/A"
+    restarts = str(snap.n_restarts) if snap.n_restarts is not None else "N/A"
+    return (
+        f"⚙️ Стан: <code>{safe_html(snap.state_label, max_len=200)}</code>\n"
+        f"🆔 PID: <code>{snap.main_pid or '—'}</code> · 🔁 Рестартів: <code>{restarts}</code> · 💾 <code>{mem}</code>\n"
+        f"🔄 Запущено: <code>{safe_html(snap.active_enter_timestamp or '—', max_len=200)}</code>"
+    )
+
+
 @router.message(F.text == "📊 Статус")
 async def status_menu(message, ctx: Context):
     kb = InlineKeyboardMarkup(
@@ -29,18 +40,20 @@ async def status_view(cb: CallbackQuery, ctx: Context):
     _, what = cb.data.split(":", 1)
 
     if what == "service":
-        raw = systemctl_status(target.service, ctx=ctx)
-        is_active = "active (running)" in raw
-        icon = "🟢" if is_active else "🔴"
+        snap = (await systemctl_show_units([target.service], ctx=ctx))[target.service]
+        raw = await systemctl_status(target.service, ctx=ctx)
+        icon = "🟢" if snap.is_active else "🔴"
         await cb.message.answer(
             f"{icon} <b>Сервіс</b> (<code>{target.service}</code>)\n"
             f"Ціль: <code>{target.key}</code>\n"
+            f"{_format_snapshot(snap)}"
+            f"{history_block('Історія', target_history(ctx, target))}\n"
             f"<blockquote expandable>{safe_html(raw[:3000], max_len=ctx.config.max_output_size)}</blockquote>",
             parse_mode="HTML",
         )
     elif what == "db":
-        await cb.message.answer(get_db_status(target, ctx=ctx), parse_mode="HTML")
+        await cb.message.answer(await get_db_status(target, ctx=ctx), parse_mode="HTML")
     elif what == "redis":
-        await cb.message.answer(get_redis_status(target, ctx=ctx), parse_mode="HTML")
+        await cb.message.answer(await get_redis_status(target, ctx=ctx), parse_mode="HTML")
 
     await cb.answer()
@@ -1,17 +1,48 @@
 from aiogram import Router, F, types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 
 from app.context import Context
 from app.core.exec import safe_html
-from app.services.system_info import collect_system_info
+from app.services.system_info import collect_system_info, resources_table
 
 
 router = Router()
 
 
+def _resources_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="🔄 Оновити", callback_data="res:refresh")]]
+    )
+
+
 @router.message(F.text == "⚙️ Системна інфо")
 async def system_info(message: types.Message, ctx: Context):
     target = ctx.get_active_target(message.chat.id)
     msg = await message.answer("⏳ <i>Збираю інформацію...</i>", parse_mode="HTML")
 
-    info = collect_system_info(target, ctx=ctx)
-    await msg.edit_text(info, parse_mode="HTML")
+    info = await collect_system_info(target, ctx=ctx)
+    kb = InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="📋 Ресурси всіх цілей", callback_data="res:refresh")]]
+    )
+    await msg.edit_text(info, parse_mode="HTML", reply_markup=kb)
+
+
+@router.message(Command("resources"))
+async def resources_cmd(message: types.Message, ctx: Context):
+    await message.answer(resources_table(ctx), parse_mode="HTML", reply_markup=_resources_keyboard())
+
+
+@router.callback_query(F.data == "res:refresh")
+async def resources_refresh(cb: CallbackQuery, ctx: Context):
+    text = resources_table(ctx)
+    if cb.message.text and cb.message.text.startswith("📋"):
+        try:
+            await cb.message.edit_text(text, parse_mode="HTML", reply_markup=_resources_keyboard())
+        except TelegramBadRequest:
+            # "message is not modified" — значення не змінились
+            pass
+    else:
+        await cb.message.answer(text, parse_mode="HTML", reply_markup=_resources_keyboard())
+    await cb.answer()
@@ -1,16 +1,17 @@
+import asyncio
 import os
 import re
-import subprocess
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple
 
 from app.context import Context
+from app.core.exec import run_command_to_file
 from app.core.targets import Target
 from app.core.envfile import parse_env_file
 
 
-def backup_postgres(target: Target, *, ctx: Context) -> Tuple[bool, str, Optional[Path]]:
+async def backup_postgres(target: Target, *, ctx: Context) -> Tuple[bool, str, Optional[Path]]:
     env = parse_env_file(target.resolved_env_file())
     dsn = env.get("POSTGRES_DSN", "").strip()
     if not dsn:
@@ -28,17 +29,17 @@ def backup_postgres(target: Target, *, ctx: Context) -> Tuple[bool, str, Optiona
     env2["PGPASSWORD"] = password
 
     try:
-        with filename.open("w", encoding="utf-8") as f:
-            res = subprocess.run(cmd, env=env2, stdout=f, stderr=subprocess.PIPE, timeout=180, text=True)
-        if res.returncode != 0:
+        returncode, err = await run_command_to_file(
+            cmd, dest=filename, env=env2, timeout=180, limit_key=target.service
+        )
+        if returncode != 0:
             filename.unlink(missing_ok=True)
-            err = (res.stderr or "").strip()
             if len(err) > ctx.config.max_output_size:
                 err = err[: ctx.config.max_output_size] + "\n\n... (обрізано)"
-            return False, f"Помилка pg_dump (код виходу {res.returncode}):\n{err}", None
+            return False, f"Помилка pg_dump (код виходу {returncode}):\n{err}", None
 
         return True, "OK", filename
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         filename.unlink(missing_ok=True)
         return False, "Таймаут (180с)", None
     except Exception as e:
@@ -1,12 +1,32 @@
+import asyncio
 import re
+import ssl
+import struct
+import time
+from contextlib import suppress
+from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
 
 from app.context import Context
-from app.core.exec import run_command, safe_html
+from app.core.exec import safe_html
 from app.core.targets import Target
 from app.core.envfile import parse_env_file
 
 
+_DB_STATUS_TTL = 10.0
+_PG_TIMEOUT = 5.0
+
+# Протокол PostgreSQL v3: SSLRequest і StartupMessage
+_SSL_REQUEST = struct.pack("!ii", 8, 80877103)
+_PROTOCOL_VERSION = 196608
+# SQLSTATE "cannot_connect_now": сервер стартує, зупиняється або в recovery
+_CANNOT_CONNECT_NOW = "57P03"
+# pg_isready-подібні стани
+PG_ACCEPTING = "accepting connections"
+PG_REJECTING = "rejecting connections"
+PG_NO_RESPONSE = "no response"
+
+
 def _parse_postgres_from_env(env: Dict[str, str]) -> Optional[Tuple[str, str, str, str]]:
     dsn = env.get("POSTGRES_DSN", "").strip()
     if dsn:
@@ -25,19 +45,138 @@ def _parse_postgres_from_env(env: Dict[str, str]) -> Optional[Tuple[str, str, st
     return None
 
 
-def get_db_status(target: Target, *, ctx: Context) -> str:
+@dataclass(frozen=True)
+class DbProbe:
+    """Результат перевірки PostgreSQL цілі."""
+
+    healthy: bool
+    dsn: str  # host:port/dbname без облікових даних
+    detail: str
+    latency: Optional[float] = None
+
+
+async def probe_db(target: Target, *, ctx: Context) -> Optional[DbProbe]:
+    """Перевірка готовності PostgreSQL; None — ціль не має налаштувань БД."""
+    return await ctx.probes.get(("db", target.key), _DB_STATUS_TTL, lambda: _probe_db(target, ctx=ctx))
+
+
+async def _probe_db(target: Target, *, ctx: Context) -> Optional[DbProbe]:
     env = parse_env_file(target.resolved_env_file())
     parsed = _parse_postgres_from_env(env)
     if not parsed:
-        return "ℹ️ PostgreSQL: немає налаштувань (POSTGRES_DSN або DB_HOST/DB_USER/DB_NAME)"
+        return None
 
     host, port, user, dbname = parsed
-    out = run_command(["pg_isready", "-h", host, "-p", str(port), "-U", user, "-d", dbname], timeout=10, max_output_size=ctx.config.max_output_size)
-    healthy = "accepting connections" in out
-    icon = "🟢" if healthy else "🔴"
+    dsn = f"{host}:{port}/{dbname}"
+    try:
+        port_num = int(port)
+    except ValueError:
+        return DbProbe(healthy=False, dsn=dsn, detail=f"некоректний порт: {port}")
+    ping = await pg_ping(host, port_num, user, dbname)
+    detail = f"{dsn} - {ping.status}" + (" (SSL)" if ping.ssl else "")
+    if ping.message:
+        detail += f"\n{ping.message}"
+    return DbProbe(healthy=ping.healthy, dsn=dsn, detail=detail, latency=ping.latency)
+
+
+@dataclass(frozen=True)
+class PgPing:
+    """Результат рукостискання з PostgreSQL (аналог ``pg_isready``)."""
+
+    status: str
+    latency: Optional[float]  # секунди від connect до першої відповіді на StartupMessage
+    ssl: bool = False
+    message: str = ""
+
+    @property
+    def healthy(self) -> bool:
+        return self.status == PG_ACCEPTING
+
+
+def _startup_message(user: str, dbname: str) -> bytes:
+    params = b"".join(
+        k.encode() + b"\0" + v.encode("utf-8") + b"\0"
+        for k, v in (("user", user), ("database", dbname), ("application_name", "admin_bot"))
+    )
+    body = struct.pack("!i", _PROTOCOL_VERSION) + params + b"\0"
+    return struct.pack("!i", len(body) + 4) + body
+
+
+def _error_fields(body: bytes) -> Dict[str, str]:
+    """Поля ErrorResponse: код (S, C, M …) -> значення."""
+    fields: Dict[str, str] = {}
+    for part in body.split(b"\0"):
+        if part:
+            fields[chr(part[0])] = part[1:].decode("utf-8", errors="replace")
+    return fields
+
+
+def _tls_context() -> ssl.SSLContext:
+    # Перевірка готовності, а не автентичності сервера — як pg_isready з sslmode=prefer
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+async def _pg_handshake(host: str, port: int, user: str, dbname: str) -> Tuple[str, bool, str]:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(_SSL_REQUEST)
+        await writer.drain()
+        answer = await reader.readexactly(1)
+        if answer not in (b"S", b"N"):
+            return PG_NO_RESPONSE, False, "сервер не відповідає як PostgreSQL"
+        use_ssl = answer == b"S"
+        if use_ssl:
+            if not hasattr(writer, "start_tls"):
+                # Python < 3.11: сервер уже відповів на SSLRequest — цього досить
+                return PG_ACCEPTING, True, ""
+            await writer.start_tls(_tls_context())
+
+        writer.write(_startup_message(user, dbname))
+        await writer.drain()
+        kind = await reader.readexactly(1)
+        length = struct.unpack("!i", await reader.readexactly(4))[0]
+        body = await reader.readexactly(max(0, min(length - 4, 4096)))
+        if kind == b"E":
+            fields = _error_fields(body)
+            # Помилки автентифікації/відсутньої БД означають, що сервер приймає з'єднання (як у PQping)
+            status = PG_REJECTING if fields.get("C") == _CANNOT_CONNECT_NOW else PG_ACCEPTING
+            return status, use_ssl, fields.get("M", "")
+        return PG_ACCEPTING, use_ssl, ""
+    finally:
+        writer.close()
+        with suppress(Exception):
+            await writer.wait_closed()
+
+
+async def pg_ping(host: str, port: int, user: str, dbname: str, *, timeout: float = _PG_TIMEOUT) -> PgPing:
+    """Перевірити PostgreSQL напряму по протоколу (SSLRequest + StartupMessage) без pg_isready."""
+    started = time.monotonic()
+    try:
+        status, use_ssl, message = await asyncio.wait_for(_pg_handshake(host, port, user, dbname), timeout=timeout)
+    except asyncio.TimeoutError:
+        return PgPing(status=PG_NO_RESPONSE, latency=None, message=f"немає відповіді за {timeout:.0f}с")
+    except (OSError, asyncio.IncompleteReadError, ssl.SSLError) as e:
+        return PgPing(status=PG_NO_RESPONSE, latency=None, message=str(e) or e.__class__.__name__)
+    return PgPing(status=status, latency=time.monotonic() - started, ssl=use_ssl, message=message)
+
+
+def format_latency(seconds: Optional[float]) -> str:
+    return "—" if seconds is None else f"{seconds * 1000:.1f} мс"
+
+
+async def get_db_status(target: Target, *, ctx: Context) -> str:
+    probe = await probe_db(target, ctx=ctx)
+    if probe is None:
+        return "ℹ️ PostgreSQL: немає налаштувань (POSTGRES_DSN або DB_HOST/DB_USER/DB_NAME)"
+
+    icon = "🟢" if probe.healthy else "🔴"
     return (
         f"{icon} <b>PostgreSQL</b>\n"
         f"Ціль: <code>{target.key}</code>\n"
-        f"DSN: <code>{safe_html(f'{host}:{port}/{dbname}', max_len=ctx.config.max_output_size)}</code>\n\n"
-        f"<blockquote expandable>{safe_html(out, max_len=ctx.config.max_output_size)}</blockquote>"
+        f"DSN: <code>{safe_html(probe.dsn, max_len=ctx.config.max_output_size)}</code>\n"
+        f"⏱ Відповідь: <code>{format_latency(probe.latency)}</code>\n\n"
+        f"<blockquote expandable>{safe_html(probe.detail, max_len=ctx.config.max_output_size)}</blockquote>"
     )
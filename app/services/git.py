@@ -1,17 +1,39 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
 from app.context import Context
-from app.core.exec import run_command
+from app.core.exec import run_command, run_command_spilled
 from app.core.targets import Target
 
 
-def git_pull(target: Target, *, ctx: Context) -> Tuple[str, str, bool]:
-    pull = run_command(["git", "pull"], cwd=target.path, timeout=60, max_output_size=ctx.config.max_output_size)
-    log1 = run_command(
-        ["git", "log", "-1", "--format=%h - %s (%cr) <%an>"],
-        cwd=target.path,
-        timeout=30,
-        max_output_size=ctx.config.max_output_size,
+_LAST_COMMIT_TTL = 60.0
+
+
+async def git_last_commit(target: Target, *, ctx: Context) -> str:
+    return await ctx.probes.get(
+        ("git", target.key, "log1"),
+        _LAST_COMMIT_TTL,
+        lambda: run_command(
+            ["git", "log", "-1", "--format=%h - %s (%cr) <%an>"],
+            cwd=target.path,
+            timeout=30,
+            max_output_size=ctx.config.max_output_size,
+            limit_key=target.service,
+        ),
     )
+
+
+async def git_pull(target: Target, *, ctx: Context) -> Tuple[str, str, bool, Optional[str]]:
+    try:
+        pull, spill_id = await run_command_spilled(
+            ["git", "pull"],
+            cwd=target.path,
+            timeout=60,
+            max_output_size=ctx.config.max_output_size,
+            limit_key=target.service,
+            spill=ctx.spill,
+        )
+    finally:
+        ctx.probes.invalidate("git", target.key)
+    log1 = await git_last_commit(target, ctx=ctx)
     updated = ("Updating" in pull) or ("Fast-forward" in pull)
-    return pull, log1, updated
+    return pull, log1, updated, spill_id
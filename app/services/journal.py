@@ -1,13 +1,280 @@
-from typing import Optional
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
 
 from app.context import Context
-from app.core.exec import run_command
+from app.core.capture import capture_for_chars
+from app.core.exec import run_command, stream_command
+from app.core.targets import Target
+from app.services.log_records import CONTINUATION_PATTERN, LogRecord, RecordAssembler, record_matches
 
 
-def journalctl_lines(service: str, *, ctx: Context, n: int = 100, since: Optional[str] = None) -> str:
+logger = logging.getLogger("admin_bot")
+
+# Поля, що читаються з journald у JSON-режимі (__CURSOR і __REALTIME_TIMESTAMP додаються завжди)
+_JSON_FIELDS = "MESSAGE,PRIORITY"
+
+_SINCE_RE = re.compile(r"^\s*(\d+)\s+(second|minute|hour|day)s?\s+ago\s*$")
+_SINCE_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class LevelFilter:
+    """Фільтр рівня логів: текстовий патерн (для --grep і Python) та пріоритети journald."""
+
+    pattern: "re.Pattern[str]"
+    priority: str  # діапазон для journalctl -p
+    max_priority: int  # те саме для фільтрації в Python
+
+    @property
+    def grep(self) -> str:
+        """Патерн для --grep: збіги рівня плюс рядки-продовження (фрейми traceback)."""
+        return f"{self.pattern.pattern}|{CONTINUATION_PATTERN}"
+
+
+LEVEL_FILTERS = {
+    "errors": LevelFilter(re.compile(r"ERROR|CRITICAL|Exception|Traceback", re.IGNORECASE), "emerg..err", 3),
+    "warnings": LevelFilter(re.compile(r"warning", re.IGNORECASE), "warning..warning", 4),
+}
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    timestamp: float  # unix-час у секундах
+    priority: int
+    message: str
+    cursor: str = ""
+
+
+def parse_journal_json(line: bytes) -> Optional[JournalEntry]:
+    """Розібрати один запис ``journalctl -o json``; None для некоректних рядків."""
+    try:
+        raw = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(raw, dict):
+        return None
+
+    message = raw.get("MESSAGE")
+    if isinstance(message, list):
+        # Небінарно-безпечні повідомлення journald віддає як масив байтів
+        message = bytes(b & 0xFF for b in message if isinstance(b, int)).decode("utf-8", errors="replace")
+    elif not isinstance(message, str):
+        message = ""
+
+    try:
+        timestamp = int(raw.get("__REALTIME_TIMESTAMP", 0)) / 1_000_000
+    except (TypeError, ValueError):
+        timestamp = 0.0
+    try:
+        priority = int(raw.get("PRIORITY", 6))
+    except (TypeError, ValueError):
+        priority = 6
+
+    return JournalEntry(timestamp=timestamp, priority=priority, message=message, cursor=str(raw.get("__CURSOR", "")))
+
+
+async def iter_journal_entries(
+    service: str,
+    *,
+    ctx: Context,
+    after_cursor: Optional[str] = None,
+    n: Optional[int] = None,
+    since: Optional[str] = None,
+    extra_args: Optional[List[str]] = None,
+    timeout: int = 60,
+) -> AsyncIterator[JournalEntry]:
+    """Потоково читати записи журналу сервісу (``journalctl -o json``).
+
+    Записи віддаються по одному, без накопичення всього виводу в пам'яті.
+    Якщо journalctl завершився з помилкою (наприклад, курсор більше не існує),
+    піднімається ``RuntimeError`` з текстом stderr.
+    """
+    args = ["journalctl", "-u", service, "--no-pager", "-o", "json", f"--output-fields={_JSON_FIELDS}"]
+    if after_cursor:
+        args += ["--after-cursor", after_cursor]
+    if since:
+        args += ["--since", since]
+    if n is not None:
+        args += ["-n", str(n)]
+    if extra_args:
+        args += extra_args
+
+    async with stream_command(args, timeout=timeout, limit_key=service) as stream:
+        async for line in stream.lines():
+            entry = parse_journal_json(line)
+            if entry is not None:
+                yield entry
+
+    if stream.timed_out:
+        logger.warning("journalctl для %s перервано за таймаутом (%dс)", service, timeout)
+    elif stream.returncode not in (0, None):
+        raise RuntimeError(stream.stderr or f"journalctl завершився з кодом {stream.returncode}")
+
+
+def since_seconds(since: str) -> Optional[int]:
+    """Перетворити відносний час journalctl ("20 minutes ago") у секунди."""
+    m = _SINCE_RE.match(since)
+    if not m:
+        return None
+    return int(m.group(1)) * _SINCE_UNITS[m.group(2)]
+
+
+class _EntryText:
+    """Текст записів у форматі короткого виводу journalctl з обмеженням довжини."""
+
+    def __init__(self, max_output_size: int) -> None:
+        self._max = max_output_size
+        self._capture = capture_for_chars(max_output_size)
+        self.count = 0
+
+    def add(self, e: JournalEntry) -> None:
+        stamp = datetime.fromtimestamp(e.timestamp).strftime("%b %d %H:%M:%S")
+        sep = "\n" if self.count else ""
+        self._capture.feed(f"{sep}{stamp} {e.message}".encode("utf-8"))
+        self.count += 1
+
+    def add_record(self, rec: LogRecord) -> None:
+        stamp = datetime.fromtimestamp(rec.timestamp or 0).strftime("%b %d %H:%M:%S")
+        sep = "\n" if self.count else ""
+        self._capture.feed(f"{sep}{stamp} {rec.text}".encode("utf-8"))
+        self.count += 1
+
+    def render(self) -> str:
+        return self._capture.render(max_chars=self._max).strip()
+
+
+def format_entries(entries: Iterable[JournalEntry], *, max_output_size: int) -> str:
+    """Відформатувати записи як короткий вивід journalctl з тим самим обмеженням довжини."""
+    text = _EntryText(max_output_size)
+    for e in entries:
+        text.add(e)
+    return text.render()
+
+
+def _from_follower(service: str, *, ctx: Context, n: int, since: Optional[str]) -> Optional[List[JournalEntry]]:
+    follower = ctx.journal_followers.get(service)
+    if follower is None:
+        return None
+    if not since:
+        return follower.last(n)
+    seconds = since_seconds(since)
+    if seconds is None:
+        return None
+    return follower.window(time.time() - seconds)
+
+
+async def journalctl_lines(service: str, *, ctx: Context, n: int = 100, since: Optional[str] = None) -> str:
+    # Свіжі вікна обслуговуються з буфера фонової підписки без запуску процесу
+    buffered = _from_follower(service, ctx=ctx, n=n, since=since)
+    if buffered is not None:
+        return format_entries(buffered, max_output_size=ctx.config.max_output_size)
+
     args = ["journalctl", "-u", service, "--no-pager"]
     if since:
         args += ["--since", since]
     else:
         args += ["-n", str(n)]
-    return run_command(args, timeout=20, max_output_size=ctx.config.max_output_size)
+    return await run_command(args, timeout=20, max_output_size=ctx.config.max_output_size, limit_key=service)
+
+
+def level_pushdown_args(target: Target, level: str) -> List[str]:
+    """Аргументи journalctl, що фільтрують рівень ``level`` на боці journald."""
+    flt = LEVEL_FILTERS[level]
+    if target.journal_priorities:
+        return ["-p", flt.priority]
+    return ["--grep", flt.grep, "--case-sensitive=false"]
+
+
+def _record_matches(flt: LevelFilter, rec: LogRecord, *, by_priority: bool) -> bool:
+    if by_priority:
+        return rec.priority is not None and rec.priority <= flt.max_priority
+    return record_matches(rec, flt.pattern)
+
+
+def assemble_entries(entries: Iterable[JournalEntry]) -> Iterator[LogRecord]:
+    """Згрупувати записи журналу в події (traceback — одна подія)."""
+    asm = RecordAssembler()
+    for e in entries:
+        rec = asm.feed(e.message, timestamp=e.timestamp, priority=e.priority)
+        if rec is not None:
+            yield rec
+    rec = asm.flush()
+    if rec is not None:
+        yield rec
+
+
+async def assemble_stream(entries: AsyncIterator[JournalEntry]) -> AsyncIterator[LogRecord]:
+    """Потокова версія ``assemble_entries``."""
+    asm = RecordAssembler()
+    async for e in entries:
+        rec = asm.feed(e.message, timestamp=e.timestamp, priority=e.priority)
+        if rec is not None:
+            yield rec
+    rec = asm.flush()
+    if rec is not None:
+        yield rec
+
+
+async def iter_level_records(
+    target: Target, level: str, *, ctx: Context, since: str, timeout: int = 60
+) -> AsyncIterator[LogRecord]:
+    """Події рівня ``level`` (errors/warnings) за період ``since``, з цілими traceback.
+
+    Фільтрація виконується на боці journald: ``-p`` для цілей, що пишуть
+    із пріоритетами (``Target.journal_priorities``), інакше ``--grep`` зі
+    збігами рівня та рядками-продовженнями. Записи збираються в події, і
+    лишаються події, що містять збіг. Якщо journalctl не підтримує ``--grep``
+    (зібраний без PCRE2), фільтрація виконується в Python.
+    """
+    flt = LEVEL_FILTERS[level]
+    by_priority = target.journal_priorities
+    pushdown = level_pushdown_args(target, level)
+
+    produced = False
+    try:
+        entries = iter_journal_entries(target.service, ctx=ctx, since=since, extra_args=pushdown, timeout=timeout)
+        async for rec in assemble_stream(entries):
+            produced = True
+            if _record_matches(flt, rec, by_priority=by_priority):
+                yield rec
+        return
+    except RuntimeError as e:
+        if by_priority or produced:
+            raise
+        logger.info("journalctl --grep недоступний для %s (%s), фільтрую в Python", target.service, e)
+
+    entries = iter_journal_entries(target.service, ctx=ctx, since=since, timeout=timeout)
+    async for rec in assemble_stream(entries):
+        if _record_matches(flt, rec, by_priority=False):
+            yield rec
+
+
+async def journalctl_filtered(target: Target, level: str, *, ctx: Context, since: str) -> str:
+    """Події рівня ``level`` (errors/warnings) за весь період ``since``.
+
+    Traceback показується цілком — з фреймами і фінальним рядком винятку.
+    """
+    flt = LEVEL_FILTERS[level]
+    text = _EntryText(ctx.config.max_output_size)
+
+    buffered = _from_follower(target.service, ctx=ctx, n=0, since=since)
+    if buffered is not None:
+        for rec in assemble_entries(buffered):
+            if _record_matches(flt, rec, by_priority=target.journal_priorities):
+                text.add_record(rec)
+        return text.render()
+
+    try:
+        async for rec in iter_level_records(target, level, ctx=ctx, since=since):
+            text.add_record(rec)
+    except RuntimeError as e:
+        return f"❌ {e}"
+    except Exception as e:
+        return f"❌ Виняток: {e}"
+
+    return text.render()
@@ -0,0 +1,135 @@
+"""Фонові підписки на журнал (``journalctl -f``) з кільцевим буфером записів на ціль."""
+import asyncio
+import logging
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, List, Optional, Tuple
+
+from app.core.exec import stream_command
+from app.services.journal import JournalEntry, parse_journal_json
+
+
+logger = logging.getLogger("admin_bot")
+
+# Найбільше вікно, яке обслуговується з буфера (логи за 5/10/20 хв)
+_BACKFILL_SECONDS = 20 * 60
+_BACKOFF_START = 1.0
+_BACKOFF_MAX = 60.0
+# Якщо підписка прожила довше — вважаємо її стабільною і скидаємо backoff
+_STABLE_AFTER = 60.0
+
+# (timestamp, priority, message) — компактніше за об'єкт на кожен запис
+_Buffered = Tuple[float, int, str]
+
+
+class JournalFollower:
+    """Тримає один довгоживучий ``journalctl -f -o json`` для сервісу.
+
+    Спочатку дочитує пропущене (від курсора або за останні 20 хв), потім
+    переходить у режим ``-f``. Буфер вважається повним від ``covered_since``
+    до поточного моменту, лише поки підписка жива (``live``); інакше
+    виклики повертають None, і слід звертатися до journalctl напряму.
+    """
+
+    def __init__(self, service: str, *, maxlen: int) -> None:
+        self.service = service
+        self._entries: Deque[_Buffered] = deque(maxlen=maxlen)
+        self._covered_since: Optional[float] = None
+        self._cursor: Optional[str] = None
+        self._live = False
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def live(self) -> bool:
+        return self._live
+
+    def window(self, since_ts: float) -> Optional[List[JournalEntry]]:
+        """Записи з моменту ``since_ts`` або None, якщо буфер їх не покриває."""
+        if not self._live or self._covered_since is None or since_ts < self._covered_since:
+            return None
+        return [JournalEntry(ts, prio, msg) for ts, prio, msg in self._entries if ts >= since_ts]
+
+    def last(self, n: int) -> Optional[List[JournalEntry]]:
+        """Останні ``n`` записів або None, якщо в буфері їх менше."""
+        if not self._live or len(self._entries) < n:
+            return None
+        start = len(self._entries) - n
+        return [JournalEntry(ts, prio, msg) for ts, prio, msg in islice(self._entries, start, None)]
+
+    def _append(self, entry: JournalEntry) -> None:
+        full = len(self._entries) == self._entries.maxlen
+        self._entries.append((entry.timestamp, entry.priority, entry.message))
+        if entry.cursor:
+            self._cursor = entry.cursor
+        if full:
+            # Найстаріші записи витіснено — буфер повний лише від найстарішого збереженого
+            self._covered_since = self._entries[0][0]
+
+    async def _pump(self, args: List[str], *, timeout: int) -> Optional[int]:
+        async with stream_command(args, timeout=timeout, limited=False) as stream:
+            async for line in stream.lines():
+                entry = parse_journal_json(line)
+                if entry is not None:
+                    self._append(entry)
+        if stream.returncode not in (0, None) and stream.stderr:
+            logger.warning("journalctl (%s): %s", self.service, stream.stderr)
+        return stream.returncode
+
+    async def _follow_once(self) -> None:
+        base = ["journalctl", "-u", self.service, "--no-pager", "-o", "json", "--output-fields=MESSAGE,PRIORITY"]
+
+        # 1) Дочитати пропущене: від курсора або за останнє вікно
+        if self._cursor:
+            position = ["--after-cursor", self._cursor]
+        else:
+            since_ts = time.time() - _BACKFILL_SECONDS
+            self._entries.clear()
+            self._covered_since = since_ts
+            position = ["--since", f"@{int(since_ts)}"]
+        returncode = await self._pump(base + position, timeout=120)
+        if returncode not in (0, None):
+            # Курсор міг зникнути після ротації — наступна спроба почне з вікна
+            self._cursor = None
+            raise RuntimeError(f"journalctl завершився з кодом {returncode}")
+
+        # 2) Слідкувати за новими записами (якщо записів не було — з того ж моменту)
+        if self._cursor:
+            position = ["--after-cursor", self._cursor]
+        follow = base + ["--follow"] + position
+        self._live = True
+        try:
+            await self._pump(follow, timeout=365 * 24 * 3600)
+        finally:
+            self._live = False
+
+    async def _run(self) -> None:
+        backoff = _BACKOFF_START
+        while True:
+            started = time.monotonic()
+            try:
+                await self._follow_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Підписка на журнал %s впала: %s", self.service, e)
+
+            if time.monotonic() - started > _STABLE_AFTER:
+                backoff = _BACKOFF_START
+            logger.warning("Перезапуск підписки на журнал %s через %.0fс", self.service, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _BACKOFF_MAX)
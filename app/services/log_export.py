@@ -0,0 +1,160 @@
+"""Потоковий експорт журналу цілі у стиснений файл (gzip або zstd)."""
+import asyncio
+import gzip
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, List, Optional, Tuple
+
+from app.context import Context
+from app.core.exec import stream_command
+from app.core.targets import Target
+from app.services.journal import LEVEL_FILTERS, iter_level_records, since_seconds
+from app.services.log_records import LogRecord, assemble, record_matches
+from app.services.logfile import iter_window, log_chain
+
+try:  # опціонально: zstd стискає журнали швидше і краще за gzip
+    import zstandard
+except ImportError:  # pragma: no cover - залежить від оточення
+    zstandard = None
+
+
+logger = logging.getLogger("admin_bot")
+
+_EXPORT_TIMEOUT = 600
+
+# Формат -> (аргументи journalctl, розширення файлу)
+_FORMATS = {
+    "text": (["-o", "short-iso"], "log"),
+    "ndjson": (["-o", "json"], "ndjson"),
+}
+
+
+@dataclass(frozen=True)
+class LogExport:
+    path: Path
+    raw_bytes: int
+    compressed_bytes: int
+    lines: int
+    codec: str
+
+
+def _open_compressed(path: Path) -> Tuple[IO[bytes], str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).stream_writer(path.open("wb")), "zstd"
+    return gzip.open(path, "wb", compresslevel=6), "gzip"
+
+
+async def _stream_to(out: IO[bytes], args: List[str], *, service: str) -> Tuple[int, int, Optional[int], str]:
+    """Записати stdout journalctl у ``out``; повертає (байти, рядки, код виходу, stderr)."""
+    raw_bytes = lines = 0
+    async with stream_command(args, timeout=_EXPORT_TIMEOUT, limit_key=service) as stream:
+        async for chunk in stream.chunks():
+            out.write(chunk)
+            raw_bytes += len(chunk)
+            lines += chunk.count(b"\n")
+    if stream.timed_out:
+        logger.warning("Експорт журналу %s перервано за таймаутом (%dс)", service, _EXPORT_TIMEOUT)
+    return raw_bytes, lines, stream.returncode, stream.stderr
+
+
+def _write_record(out: IO[bytes], rec: LogRecord, stamp: str) -> int:
+    data = f"{stamp}{rec.text}\n".encode("utf-8")
+    out.write(data)
+    return len(data)
+
+
+async def _stream_records(
+    out: IO[bytes], target: Target, *, ctx: Context, since: str, level: str
+) -> Tuple[int, int]:
+    """Записати події рівня ``level`` (traceback цілком); повертає (байти, рядки)."""
+    raw_bytes = lines = 0
+    async for rec in iter_level_records(target, level, ctx=ctx, since=since, timeout=_EXPORT_TIMEOUT):
+        stamp = datetime.fromtimestamp(rec.timestamp or 0).isoformat(timespec="seconds")
+        raw_bytes += _write_record(out, rec, f"{stamp} ")
+        lines += len(rec.lines)
+    return raw_bytes, lines
+
+
+def _temp_export(target: Target, level: Optional[str], ext: str) -> Path:
+    fd, name = tempfile.mkstemp(prefix=f"logs_{level or 'all'}_{target.key}_", suffix=f".{ext}")
+    os.close(fd)
+    return Path(name)
+
+
+def _finish(path: Path, raw_bytes: int, lines: int, codec: str) -> LogExport:
+    final = path.with_name(f"{path.name}.{'zst' if codec == 'zstd' else 'gz'}")
+    path.replace(final)
+    return LogExport(final, raw_bytes, final.stat().st_size, lines, codec)
+
+
+async def export_journal(
+    target: Target, *, ctx: Context, since: str, level: Optional[str] = None, fmt: str = "text"
+) -> Tuple[Optional[LogExport], str]:
+    """Потоково стиснути журнал цілі за період ``since`` у тимчасовий файл.
+
+    stdout journalctl пишеться в компресор шматками, без копії в пам'яті і
+    без обрізання. ``level`` (errors/warnings) фільтрується на боці journald,
+    а traceback записується цілою подією.
+    Повертає (експорт, "") або (None, текст помилки); файл видаляє викликач.
+    """
+    fmt_args, ext = _FORMATS[fmt]
+    path = _temp_export(target, level, ext)
+    try:
+        out, codec = _open_compressed(path)
+        with out:
+            if level:
+                raw_bytes, lines = await _stream_records(out, target, ctx=ctx, since=since, level=level)
+            else:
+                args = ["journalctl", "-u", target.service, "--no-pager", "--since", since, *fmt_args]
+                raw_bytes, lines, code, err = await _stream_to(out, args, service=target.service)
+                if code not in (0, None) and raw_bytes == 0:
+                    raise RuntimeError(err or f"journalctl завершився з кодом {code}")
+    except Exception as e:
+        path.unlink(missing_ok=True)
+        return None, str(e)
+
+    return _finish(path, raw_bytes, lines, codec), ""
+
+
+def _write_logfile(path: Path, source: Path, since_ts: float, level: Optional[str]) -> LogExport:
+    raw_bytes = lines = 0
+    out, codec = _open_compressed(path)
+    with out:
+        if level is None:
+            for line in iter_window(source, since_ts):
+                out.write(line)
+                raw_bytes += len(line)
+                lines += 1
+        else:
+            pattern = LEVEL_FILTERS[level].pattern
+            decoded = (line.decode("utf-8", errors="replace").rstrip("\n") for line in iter_window(source, since_ts))
+            for rec in assemble(decoded):
+                if record_matches(rec, pattern):
+                    raw_bytes += _write_record(out, rec, "")
+                    lines += len(rec.lines)
+    return _finish(path, raw_bytes, lines, codec)
+
+
+async def export_logfile(
+    target: Target, *, since: str, level: Optional[str] = None
+) -> Tuple[Optional[LogExport], str]:
+    """Потоково стиснути файловий лог цілі (з ротаціями) за період ``since``."""
+    source = target.resolved_log_file()
+    seconds = since_seconds(since)
+    if seconds is None:
+        return None, f"Непідтримуваний період: {since}"
+    if not log_chain(source):
+        return None, f"Файл логу не знайдено: {source}"
+
+    path = _temp_export(target, level, "log")
+    try:
+        export = await asyncio.to_thread(_write_logfile, path, source, time.time() - seconds, level)
+    except Exception as e:
+        path.unlink(missing_ok=True)
+        return None, str(e)
+    return export, ""
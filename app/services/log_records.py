@@ -0,0 +1,116 @@
+"""Збирання багаторядкових подій логу (traceback тощо) з потоку рядків.
+
+journald зберігає кожен рядок traceback як окремий запис, а файлові логи —
+як окремі рядки, тож фільтр по рядку показує лише ``Traceback (most recent
+call last):`` без фреймів і фінального ``XxxError: ...``. ``RecordAssembler``
+за один прохід приєднує рядки-продовження до попередньої події.
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+
+_TRACEBACK_HEAD = "Traceback (most recent call last):"
+_CHAIN_RE = re.compile(
+    r"^(During handling of the above exception, another exception occurred:"
+    r"|The above exception was the direct cause of the following exception:)"
+)
+# Фінальний рядок traceback: "KeyError: 'x'", "asyncio.exceptions.CancelledError"
+_EXCEPTION_RE = re.compile(r"^[A-Za-z_][\w.]*(Error|Exception|Exit|Interrupt|Warning)\b")
+
+# Патерн рядків-продовжень для --grep (PCRE2), щоб journald не відкидав фрейми
+CONTINUATION_PATTERN = (
+    r"^\s+\S|^Traceback \(most recent call last\)|^During handling of the above exception"
+    r"|^The above exception was the direct cause|^[A-Za-z_][\w.]*(Error|Exception|Exit|Interrupt|Warning)\b"
+)
+
+# Рядки одного traceback у journald мають практично однаковий час запису
+_CONTINUATION_GAP = 1.0
+
+
+@dataclass
+class LogRecord:
+    """Одна логічна подія: перший рядок і його продовження."""
+
+    lines: List[str]
+    timestamp: Optional[float] = None
+    priority: Optional[int] = None
+    in_traceback: bool = False
+    last_timestamp: Optional[float] = None
+
+    @property
+    def head(self) -> str:
+        return self.lines[0]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def exception(self) -> Optional[str]:
+        """Фінальний рядок винятку (``KeyError: 'x'``), якщо подія — traceback."""
+        if not self.in_traceback:
+            return None
+        for line in reversed(self.lines):
+            if _EXCEPTION_RE.match(line):
+                return line
+        return None
+
+
+class RecordAssembler:
+    """Потоковий збирач подій: ``feed`` повертає попередню подію, коли почалась нова."""
+
+    def __init__(self) -> None:
+        self._current: Optional[LogRecord] = None
+
+    def _continues(self, line: str, timestamp: Optional[float]) -> bool:
+        rec = self._current
+        if rec is None:
+            return False
+        if timestamp is not None and rec.last_timestamp is not None and timestamp - rec.last_timestamp > _CONTINUATION_GAP:
+            return False
+        if not line.strip() or line[0].isspace():
+            return True
+        if line.startswith(_TRACEBACK_HEAD) or _CHAIN_RE.match(line):
+            return True
+        return rec.in_traceback and _EXCEPTION_RE.match(line) is not None
+
+    def feed(self, message: str, *, timestamp: Optional[float] = None, priority: Optional[int] = None) -> Optional[LogRecord]:
+        """Додати повідомлення (можливо багаторядкове); повертає завершену подію або None."""
+        lines = message.split("\n")
+        done: Optional[LogRecord] = None
+        if not self._continues(lines[0], timestamp):
+            done = self._current
+            self._current = LogRecord(lines=[], timestamp=timestamp, priority=priority)
+
+        rec = self._current
+        for line in lines:
+            rec.lines.append(line)
+            if line.startswith(_TRACEBACK_HEAD):
+                rec.in_traceback = True
+        if priority is not None:
+            rec.priority = priority if rec.priority is None else min(rec.priority, priority)
+        if timestamp is not None:
+            rec.last_timestamp = timestamp
+        return done
+
+    def flush(self) -> Optional[LogRecord]:
+        """Завершити поточну подію (кінець потоку)."""
+        done, self._current = self._current, None
+        return done
+
+
+def assemble(lines: Iterable[str]) -> Iterator[LogRecord]:
+    """Згрупувати рядки тексту без міток часу в події."""
+    asm = RecordAssembler()
+    for line in lines:
+        rec = asm.feed(line)
+        if rec is not None:
+            yield rec
+    rec = asm.flush()
+    if rec is not None:
+        yield rec
+
+
+def record_matches(rec: LogRecord, pattern: "re.Pattern[str]") -> bool:
+    return any(pattern.search(line) for line in rec.lines)
@@ -0,0 +1,238 @@
+"""Кластеризація подій логу в шаблони (Drain-подібне онлайн-дерево).
+
+Під час збою ціль пише тисячі майже однакових рядків, що відрізняються лише
+ID, числами і часом. ``TemplateMiner`` за один прохід маскує змінні частини,
+спускається деревом (довжина → перші токени) до невеликої групи кластерів і
+зливає подію з найсхожішим шаблоном. Кількість кластерів обмежена, тому
+пам'ять не залежить від кількості рядків.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.context import Context
+from app.core.targets import Target
+from app.services.journal import (
+    LEVEL_FILTERS,
+    assemble_stream,
+    iter_journal_entries,
+    iter_level_records,
+    since_seconds,
+)
+from app.services.log_records import LogRecord, assemble, record_matches
+from app.services.logfile import iter_window, line_timestamp, log_chain
+
+
+WILDCARD = "<*>"
+
+# Кандидати на змінну частину — лише "слова" з цифрою; класифікуються окремо,
+# щоб не ганяти кілька регулярних виразів по всьому рядку
+_VOLATILE_RE = re.compile(r"[0-9A-Za-z_.:+-]*\d[0-9A-Za-z_.:+-]*")
+_KINDS = [
+    (re.compile(r"\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?"), "<IP>"),
+    (re.compile(r"[-+]?\d+(?:[.,:/-]\d+)*"), "<NUM>"),
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE), "<UUID>"),
+    (re.compile(r"0x[0-9a-f]+|[0-9a-f]{12,}", re.IGNORECASE), "<HEX>"),
+]
+_MASK_TOKENS = {repl for _, repl in _KINDS} | {WILDCARD}
+
+# Довгі рядки (дампи, JSON) обрізаються перед розбором
+_MAX_TEXT = 500
+_SAMPLE_LEN = 300
+_SUMMARY_TIMEOUT = 300
+
+# Фрейм traceback: '  File "/app/bot.py", line 42, in handler'
+_FRAME_RE = re.compile(r'^\s*File "([^"]+)", line \d+, in (\S+)')
+_FINGERPRINT_LEN = 12
+
+
+def _mask(m: "re.Match[str]") -> str:
+    token = m.group()
+    for pattern, repl in _KINDS:
+        if pattern.fullmatch(token):
+            return repl
+    return WILDCARD
+
+
+def mask_volatile(text: str) -> str:
+    """Замінити змінні частини (числа, UUID, IP, hex, ID з цифрами) на плейсхолдери."""
+    return _VOLATILE_RE.sub(_mask, text[:_MAX_TEXT])
+
+
+@dataclass
+class LogTemplate:
+    tokens: List[str]
+    count: int
+    first_seen: Optional[float]
+    last_seen: Optional[float]
+    sample: str
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.tokens)
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+    clusters: List[LogTemplate] = field(default_factory=list)
+
+
+class TemplateMiner:
+    """Онлайн-кластеризація рядків у шаблони з обмеженою кількістю кластерів."""
+
+    def __init__(
+        self, *, depth: int = 4, similarity: float = 0.5, max_children: int = 64, max_clusters: int = 500
+    ) -> None:
+        self._depth = max(depth - 2, 1)  # рівнів з токенами під рівнем довжини
+        self._similarity = similarity
+        self._max_children = max_children
+        self._max_clusters = max_clusters
+        self._root: Dict[int, _Node] = {}
+        self._leaves: Dict[int, _Node] = {}  # id(шаблону) -> лист дерева
+        self._templates: List[LogTemplate] = []
+        self.total = 0
+        self.evicted = 0  # подій у витіснених рідкісних шаблонах
+
+    def _leaf(self, tokens: List[str]) -> _Node:
+        node = self._root.setdefault(len(tokens), _Node())
+        for token in tokens[: self._depth]:
+            key = WILDCARD if token in _MASK_TOKENS else token
+            child = node.children.get(key)
+            if child is None:
+                if len(node.children) >= self._max_children:
+                    key = WILDCARD
+                    child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = _Node()
+            node = child
+        return node
+
+    @staticmethod
+    def _score(template: List[str], tokens: List[str]) -> float:
+        same = sum(1 for a, b in zip(template, tokens) if a == b and a != WILDCARD)
+        return same / len(tokens) if tokens else 1.0
+
+    def add(self, text: str, *, timestamp: Optional[float] = None, sample: Optional[str] = None) -> LogTemplate:
+        """Додати подію; повертає шаблон, до якого її віднесено."""
+        self.total += 1
+        tokens = mask_volatile(text).split() or [""]
+        leaf = self._leaf(tokens)
+
+        best: Optional[LogTemplate] = None
+        best_score = -1.0
+        for cluster in leaf.clusters:
+            score = self._score(cluster.tokens, tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is not None and best_score >= self._similarity:
+            best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+            best.count += 1
+            if timestamp is not None:
+                if best.first_seen is None or timestamp < best.first_seen:
+                    best.first_seen = timestamp
+                if best.last_seen is None or timestamp > best.last_seen:
+                    best.last_seen = timestamp
+            return best
+
+        cluster = LogTemplate(
+            tokens=tokens,
+            count=1,
+            first_seen=timestamp,
+            last_seen=timestamp,
+            sample=(sample if sample is not None else text)[:_SAMPLE_LEN],
+        )
+        leaf.clusters.append(cluster)
+        self._leaves[id(cluster)] = leaf
+        self._templates.append(cluster)
+        if len(self._templates) >= 2 * self._max_clusters:
+            self._evict()
+        return cluster
+
+    def _evict(self) -> None:
+        """Залишити ``max_clusters`` найчастіших шаблонів (амортизовано O(log n) на подію)."""
+        self._templates.sort(key=lambda c: (c.count, c.last_seen or 0), reverse=True)
+        for cluster in self._templates[self._max_clusters:]:
+            self._leaves.pop(id(cluster)).clusters.remove(cluster)
+            self.evicted += cluster.count
+        del self._templates[self._max_clusters:]
+
+    @property
+    def cluster_count(self) -> int:
+        return len(self._templates)
+
+    def top(self, n: int) -> List[LogTemplate]:
+        return sorted(self._templates, key=lambda c: c.count, reverse=True)[:n]
+
+
+def record_template_text(rec: LogRecord) -> str:
+    """Текст події для кластеризації: перший рядок і, для traceback, рядок винятку."""
+    exc = rec.exception
+    return f"{rec.head} {exc}" if exc and exc != rec.head else rec.head
+
+
+def fingerprint(rec: LogRecord) -> str:
+    """Стабільний відбиток події (однаковий між перезапусками і варіаціями тексту).
+
+    Для traceback — тип винятку і останній фрейм (файл і функція, без номера
+    рядка), для решти — перший рядок із замаскованими змінними частинами.
+    """
+    exc = rec.exception
+    if exc:
+        frame = ""
+        for line in reversed(rec.lines):
+            m = _FRAME_RE.match(line)
+            if m:
+                frame = f"{os.path.basename(m.group(1))}:{m.group(2)}"
+                break
+        basis = f"exc|{exc.split(':', 1)[0].strip()}|{frame}"
+    else:
+        basis = "msg|" + " ".join(mask_volatile(rec.head).split())
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()[:_FINGERPRINT_LEN]
+
+
+def _mine_file(path: Path, since_ts: float, level: Optional[str], miner: TemplateMiner) -> None:
+    pattern = LEVEL_FILTERS[level].pattern if level else None
+    decoded = (line.decode("utf-8", errors="replace").rstrip("\n") for line in iter_window(path, since_ts))
+    for rec in assemble(decoded):
+        if pattern is None or record_matches(rec, pattern):
+            miner.add(record_template_text(rec), timestamp=line_timestamp(rec.head.encode("utf-8")), sample=rec.text)
+
+
+async def summarize_logs(
+    target: Target, *, ctx: Context, since: str, level: Optional[str] = None, source: str = "journal"
+) -> Tuple[Optional[TemplateMiner], str]:
+    """Один потоковий прохід по вікну логів з кластеризацією подій у шаблони.
+
+    Повертає (miner, "") або (None, текст помилки).
+    """
+    miner = TemplateMiner()
+    if source == "file":
+        seconds = since_seconds(since)
+        path = target.resolved_log_file()
+        if seconds is None or not log_chain(path):
+            return None, f"Файл логу не знайдено: {path}"
+        try:
+            await asyncio.to_thread(_mine_file, path, time.time() - seconds, level, miner)
+        except OSError as e:
+            return None, str(e)
+        return miner, ""
+
+    try:
+        if level:
+            records = iter_level_records(target, level, ctx=ctx, since=since, timeout=_SUMMARY_TIMEOUT)
+        else:
+            records = assemble_stream(
+                iter_journal_entries(target.service, ctx=ctx, since=since, timeout=_SUMMARY_TIMEOUT)
+            )
+        async for rec in records:
+            miner.add(record_template_text(rec), timestamp=rec.timestamp, sample=rec.text)
+    except RuntimeError as e:
+        return None, str(e)
+    return miner, ""
@@ -0,0 +1,217 @@
+"""Читання файлового логу цілі (``Target.resolved_log_file()``) з кінця.
+
+Файл читається блоками від EOF назад, тому час відповіді залежить від
+розміру запитаного вікна, а не від розміру файлу. Ротовані сусіди
+(``bot.log.1``, ``bot.log.2.gz`` …) підхоплюються, коли вікно старше за
+поточний файл; .gz неможливо читати з кінця — їх розпаковуємо потоково.
+"""
+import asyncio
+import gzip
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from app.context import Context
+from app.core.targets import Target
+from app.services.journal import LEVEL_FILTERS, since_seconds
+from app.services.log_records import assemble, record_matches
+
+
+_BLOCK_SIZE = 64 * 1024
+_MAX_ROTATED = 5
+# Верхня межа рядків для перегляду вікна за часом
+_MAX_WINDOW_LINES = 5000
+
+# Мітка часу на початку рядка: "2024-05-01 12:00:00,123", "[2024-05-01T12:00:00]" тощо
+_TS_RE = re.compile(rb"^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})")
+
+
+def line_timestamp(line: bytes) -> Optional[float]:
+    """Мітка часу рядка (локальний час) або None для рядків-продовжень."""
+    m = _TS_RE.match(line)
+    if not m:
+        return None
+    try:
+        return time.mktime(time.strptime(f"{m.group(1).decode()} {m.group(2).decode()}", "%Y-%m-%d %H:%M:%S"))
+    except ValueError:
+        return None
+
+
+def log_chain(path: Path) -> List[Path]:
+    """Файл логу та його ротації — від найновішого до найстарішого."""
+    chain = [path] if path.exists() else []
+    for i in range(1, _MAX_ROTATED + 1):
+        plain = path.with_name(f"{path.name}.{i}")
+        packed = path.with_name(f"{path.name}.{i}.gz")
+        if plain.exists():
+            chain.append(plain)
+        elif packed.exists():
+            chain.append(packed)
+        else:
+            break
+    return chain
+
+
+def _reverse_lines_plain(path: Path) -> Iterator[Tuple[int, bytes]]:
+    """Рядки файлу з кінця як (зміщення початку рядка, рядок без \\n)."""
+    with path.open("rb") as f:
+        pos = f.seek(0, 2)
+        rest = b""
+        while pos > 0:
+            size = min(_BLOCK_SIZE, pos)
+            pos -= size
+            f.seek(pos)
+            data = f.read(size) + rest
+            lines = data.split(b"\n")
+            rest = lines[0]
+            end = pos + len(data)
+            for line in reversed(lines[1:]):
+                start = end - len(line)
+                if line:
+                    yield start, line
+                end = start - 1
+        if rest:
+            yield 0, rest
+
+
+def _reverse_lines_gz(path: Path, limit: int) -> Iterator[Tuple[int, bytes]]:
+    """Останні ``limit`` рядків .gz з кінця (зміщення невідоме: -1)."""
+    with gzip.open(path, "rb") as f:
+        tail = deque((line.rstrip(b"\n") for line in f), maxlen=limit)
+    for line in reversed(tail):
+        if line:
+            yield -1, line
+
+
+def _reverse_lines(path: Path, limit: int) -> Iterator[Tuple[int, bytes]]:
+    if path.suffix == ".gz":
+        return _reverse_lines_gz(path, limit)
+    return _reverse_lines_plain(path)
+
+
+def read_tail(path: Path, *, n: int, since_ts: Optional[float] = None) -> List[str]:
+    """Останні ``n`` рядків логу (не старіші за ``since_ts``) у прямому порядку.
+
+    Рядки без мітки часу (traceback, багаторядкові повідомлення) належать
+    попередньому запису з міткою і відкидаються разом з ним.
+    """
+    out: List[bytes] = []
+    pending: List[bytes] = []
+    for p in log_chain(path):
+        for _, line in _reverse_lines(p, n * 4):
+            if since_ts is not None:
+                ts = line_timestamp(line)
+                if ts is None:
+                    pending.append(line)
+                    continue
+                if ts < since_ts:
+                    return _decode(out)
+                out.extend(pending)
+                pending.clear()
+            out.append(line)
+            if len(out) >= n:
+                return _decode(out)
+    out.extend(pending)
+    return _decode(out)
+
+
+def _decode(lines: List[bytes]) -> List[str]:
+    return [line.decode("utf-8", errors="replace") for line in reversed(lines)]
+
+
+def _window_start(path: Path, since_ts: float) -> Tuple[int, bool]:
+    """Зміщення першого рядка вікна у звичайному файлі; True — вікно почалося в ньому."""
+    start = None
+    for offset, line in _reverse_lines_plain(path):
+        ts = line_timestamp(line)
+        if ts is None:
+            continue
+        if ts < since_ts:
+            return (start if start is not None else path.stat().st_size), True
+        start = offset
+    return 0, False
+
+
+def _gz_covers(path: Path, since_ts: float) -> bool:
+    """Чи починається .gz не пізніше за ``since_ts`` (тоді старші ротації не потрібні)."""
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            ts = line_timestamp(line)
+            if ts is not None:
+                return ts < since_ts
+    return False
+
+
+def _forward_gz(path: Path, since_ts: float) -> Iterator[bytes]:
+    inside = False
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            ts = line_timestamp(line)
+            if ts is not None:
+                inside = ts >= since_ts
+            if inside:
+                yield line if line.endswith(b"\n") else line + b"\n"
+
+
+def _forward_plain(path: Path, offset: int) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            yield line if line.endswith(b"\n") else line + b"\n"
+
+
+def iter_window(path: Path, since_ts: float) -> Iterator[bytes]:
+    """Усі рядки логу не старіші за ``since_ts`` у прямому порядку, з ротаціями.
+
+    Межа вікна шукається з кінця кожного файлу, далі рядки читаються вперед —
+    пам'ять не залежить від розміру вікна.
+    """
+    segments: List[Iterator[bytes]] = []
+    for p in log_chain(path):
+        if p.suffix == ".gz":
+            segments.append(_forward_gz(p, since_ts))
+            if _gz_covers(p, since_ts):
+                break
+            continue
+        offset, complete = _window_start(p, since_ts)
+        segments.append(_forward_plain(p, offset))
+        if complete:
+            break
+    for segment in reversed(segments):
+        yield from segment
+
+
+def _render(lines: List[str], max_output_size: int) -> str:
+    text = "\n".join(lines)
+    if len(text) > max_output_size:
+        cut = len(text) - max_output_size
+        text = f"... (пропущено {cut} символів) ...\n\n{text[-max_output_size:]}"
+    return text
+
+
+async def logfile_lines(
+    target: Target, *, ctx: Context, n: int = 100, since: Optional[str] = None, level: Optional[str] = None
+) -> str:
+    """Хвіст файлового логу цілі у форматі, аналогічному ``journalctl_lines``."""
+    path = target.resolved_log_file()
+    if not log_chain(path):
+        return f"❌ Файл логу не знайдено: {path}"
+
+    since_ts = None
+    if since is not None:
+        seconds = since_seconds(since)
+        if seconds is not None:
+            since_ts = time.time() - seconds
+            n = _MAX_WINDOW_LINES
+
+    try:
+        lines = await asyncio.to_thread(read_tail, path, n=n, since_ts=since_ts)
+    except OSError as e:
+        return f"❌ Виняток: {e}"
+    if level in LEVEL_FILTERS:
+        # Traceback — одна подія з фреймами і рядком винятку
+        pattern = LEVEL_FILTERS[level].pattern
+        lines = [rec.text for rec in assemble(lines) if record_matches(rec, pattern)]
+    return _render(lines, ctx.config.max_output_size)
@@ -0,0 +1,159 @@
+"""Фонова вибірка метрик хоста і цілей в історію та спарклайни для перегляду.
+
+Кожні ``ADMIN_BOT_METRICS_INTERVAL`` секунд ``HostCollector`` читає /proc і
+cgroup (без дочірніх процесів), а ``MetricsHistory`` усереднює вибірки в
+кошики по 1 хв / 10 хв / 1 год. "⚙️ Системна інфо" і статус сервісу
+показують тренд за годину і добу.
+"""
+import asyncio
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+from app.context import Context
+from app.core.targets import Target
+
+
+logger = logging.getLogger("admin_bot")
+
+_SPARK = "▁▂▃▄▅▆▇█"
+# Як часто скидати сторінки історії на диск (секунди)
+_FLUSH_INTERVAL = 60
+# Ширина спарклайнів: година (по 3 хв) і доба (по 1 год)
+_HOUR_WIDTH = 20
+_DAY_WIDTH = 24
+
+HOST_SERIES = ("host.load1", "host.mem_pct", "host.disk_pct")
+
+
+def target_series(target: Target) -> Tuple[str, str]:
+    return f"t.{target.key}.mem", f"t.{target.key}.cpu"
+
+
+def series_names(targets: Iterable[Target]) -> List[str]:
+    names = list(HOST_SERIES)
+    for t in targets:
+        names.extend(target_series(t))
+    return names
+
+
+def sample_metrics(ctx: Context, now: float) -> None:
+    """Одна вибірка всіх серій у ``ctx.metrics``."""
+    history, host = ctx.metrics, ctx.host
+    if history is None:
+        return
+    load = host.loadavg()
+    mem = host.meminfo()
+    disk = host.disk_usage(Path("/"))
+    history.record("host.load1", load[0] if load else None, now)
+    history.record("host.mem_pct", 100.0 * mem.used / mem.total if mem and mem.total else None, now)
+    history.record("host.disk_pct", float(disk.used_percent) if disk else None, now)
+
+    samples = host.sample_units([t.service for t in ctx.targets.values()])
+    for t in ctx.targets.values():
+        sample = samples.get(t.service)
+        mem_name, cpu_name = target_series(t)
+        if sample is None:
+            continue
+        memory = sample.cgroup.memory_current
+        history.record(mem_name, memory / 1024 / 1024 if memory is not None else None, now)
+        history.record(cpu_name, sample.cpu_percent, now)
+
+
+async def monitor_metrics(ctx: Context) -> None:
+    interval = ctx.config.metrics_interval
+    last_flush = time.monotonic()
+    logger.info("Історія метрик: вибірка кожні %dс", interval)
+    while True:
+        try:
+            sample_metrics(ctx, time.time())
+            if time.monotonic() - last_flush >= _FLUSH_INTERVAL and ctx.metrics is not None:
+                ctx.metrics.flush()
+                last_flush = time.monotonic()
+        except Exception as e:
+            logger.error("Помилка вибірки метрик: %s", e)
+        await asyncio.sleep(interval)
+
+
+def _downsample(values: Sequence[float], width: int) -> List[float]:
+    """Середні значення ``width`` рівних груп точок (NaN — немає даних)."""
+    out: List[float] = []
+    n = len(values)
+    for i in range(width):
+        group = [v for v in values[i * n // width: (i + 1) * n // width] if not math.isnan(v)]
+        out.append(sum(group) / len(group) if group else math.nan)
+    return out
+
+
+def sparkline(values: Sequence[float], width: int) -> str:
+    """Спарклайн з ``width`` символів; шкала — від мінімуму до максимуму вікна."""
+    points = _downsample(values, width) if len(values) > width else list(values)
+    known = [v for v in points if not math.isnan(v)]
+    if not known:
+        return " " * len(points)
+    lo, hi = min(known), max(known)
+    top = len(_SPARK) - 1
+    chars = []
+    for v in points:
+        if math.isnan(v):
+            chars.append(" ")
+        elif hi - lo < 1e-9:
+            chars.append(_SPARK[top // 2])
+        else:
+            chars.append(_SPARK[round((v - lo) / (hi - lo) * top)])
+    return "".join(chars)
+
+
+def _range(values: Sequence[float], fmt: Callable[[float], str]) -> str:
+    known = [v for v in values if not math.isnan(v)]
+    if not known:
+        return "немає даних"
+    lo, hi = fmt(min(known)), fmt(max(known))
+    return lo if lo == hi else f"{lo}–{hi}"
+
+
+def _history_lines(ctx: Context, rows: List[Tuple[str, str, Callable[[float], str]]]) -> List[str]:
+    history = ctx.metrics
+    if history is None:
+        return []
+    now = time.time()
+    lines: List[str] = []
+    for label, name, fmt in rows:
+        hour = history.points(name, 60, now)
+        day = history.points(name, 3600, now)[-24:]
+        if all(math.isnan(v) for v in hour + day):
+            continue
+        lines.append(
+            f"{label} <code>{sparkline(hour, _HOUR_WIDTH)}</code> {_range(hour, fmt)}\n"
+            f"{' ' * 4}<code>{sparkline(day, _DAY_WIDTH)}</code> {_range(day, fmt)} (доба)"
+        )
+    return lines
+
+
+def host_history(ctx: Context) -> List[str]:
+    return _history_lines(
+        ctx,
+        [
+            ("📈", "host.load1", lambda v: f"{v:.2f}"),
+            ("💾", "host.mem_pct", lambda v: f"{v:.0f}%"),
+            ("💿", "host.disk_pct", lambda v: f"{v:.0f}%"),
+        ],
+    )
+
+
+def target_history(ctx: Context, target: Target) -> List[str]:
+    mem_name, cpu_name = target_series(target)
+    return _history_lines(
+        ctx,
+        [
+            ("💾", mem_name, lambda v: f"{v:.0f}MB"),
+            ("🧮", cpu_name, lambda v: f"{v:.0f}%"),
+        ],
+    )
+
+
+def history_block(title: str, lines: List[str]) -> str:
+    return f"\n\n📊 <b>{title}</b> (година / доба)\n" + "\n".join(lines) if lines else ""
+
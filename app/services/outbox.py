@@ -0,0 +1,265 @@
+"""Черга вихідних повідомлень Telegram з обмеженням швидкості.
+
+Великі перегляди логів і серії сповіщень надсилають десятки повідомлень
+поспіль і впираються в ліміти Telegram (≈1 повідомлення/с на чат, ≈30/с
+загалом) — aiogram піднімає ``TelegramRetryAfter`` і обробник обривається.
+``Outbox`` надсилає все через один диспетчер:
+
+* token bucket на кожен чат і глобальний;
+* ``retry_after`` від Telegram ставить чат на паузу, повідомлення не губиться;
+* пріоритетні смуги: сповіщення (``ALERT``) раніше за звичайні відповіді і
+  масові шматки логів (``BULK``);
+* послідовні ``BULK``-шматки в той самий чат склеюються в одне повідомлення.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter
+from aiogram.types import Message
+
+
+logger = logging.getLogger("admin_bot")
+
+# Пріоритетні смуги (менше — раніше)
+ALERT = 0
+NORMAL = 1
+BULK = 2
+_LANES = (ALERT, NORMAL, BULK)
+
+# Максимальна довжина тексту повідомлення Telegram
+_MESSAGE_LIMIT = 4096
+_NETWORK_RETRIES = 3
+
+
+class TokenBucket:
+    """Token bucket: ``rate`` токенів за секунду, не більше ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Скільки чекати до наступного токена (0 — можна надсилати)."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self._tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+@dataclass
+class _Job:
+    chat_id: int
+    priority: int
+    future: "asyncio.Future[Any]"
+    text: str = ""
+    parse_mode: Optional[str] = None
+    reply_markup: Any = None
+    # Довільний виклик Bot API (документи тощо) замість send_message
+    call: Optional[Callable[[], Awaitable[Any]]] = None
+    # Ф'ючерси склеєних у це повідомлення шматків
+    merged: List["asyncio.Future[Any]"] = field(default_factory=list)
+
+    def can_merge(self, other: "_Job") -> bool:
+        return (
+            self.priority == BULK
+            and other.priority == BULK
+            and self.call is None
+            and other.call is None
+            and self.chat_id == other.chat_id
+            and self.parse_mode == other.parse_mode
+            and self.reply_markup is None
+            and other.reply_markup is None
+            and len(self.text) + len(other.text) + 1 <= _MESSAGE_LIMIT
+        )
+
+
+class Outbox:
+    """Центральна черга надсилання повідомлень бота."""
+
+    def __init__(self, bot: Bot, *, global_rate: float = 25.0, chat_rate: float = 1.0, chat_burst: int = 3) -> None:
+        self._bot = bot
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._chats: Dict[int, TokenBucket] = {}
+        self._lanes: Dict[int, Deque[_Job]] = {lane: deque() for lane in _LANES}
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    # ── API для роутерів і watchdog ──────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for lane in self._lanes.values():
+            for job in lane:
+                if not job.future.done():
+                    job.future.cancel()
+            lane.clear()
+
+    def submit(
+        self,
+        chat_id: int,
+        text: str,
+        *,
+        parse_mode: Optional[str] = None,
+        reply_markup: Any = None,
+        priority: int = NORMAL,
+    ) -> "asyncio.Future[Optional[Message]]":
+        """Поставити повідомлення в чергу; ф'ючерс завершиться після надсилання."""
+        job = _Job(
+            chat_id=chat_id,
+            priority=priority,
+            future=asyncio.get_running_loop().create_future(),
+            text=text,
+            parse_mode=parse_mode,
+            reply_markup=reply_markup,
+        )
+        self._enqueue(job)
+        return job.future
+
+    async def send(
+        self,
+        chat_id: int,
+        text: str,
+        *,
+        parse_mode: Optional[str] = None,
+        reply_markup: Any = None,
+        priority: int = NORMAL,
+    ) -> Optional[Message]:
+        """Надіслати повідомлення через чергу й дочекатися результату."""
+        return await self.submit(chat_id, text, parse_mode=parse_mode, reply_markup=reply_markup, priority=priority)
+
+    async def send_chunks(
+        self, chat_id: int, chunks: Iterable[str], *, parse_mode: Optional[str] = None, priority: int = BULK
+    ) -> None:
+        """Надіслати серію шматків (логи тощо); сусідні шматки можуть склеїтись."""
+        futures = [self.submit(chat_id, ch, parse_mode=parse_mode, priority=priority) for ch in chunks]
+        if futures:
+            await asyncio.gather(*futures)
+
+    async def call(self, chat_id: int, call: Callable[[], Awaitable[Any]], *, priority: int = NORMAL) -> Any:
+        """Виконати довільний виклик Bot API (наприклад, документ) з тими ж лімітами."""
+        job = _Job(chat_id=chat_id, priority=priority, future=asyncio.get_running_loop().create_future(), call=call)
+        self._enqueue(job)
+        return await job.future
+
+    # ── диспетчер ─────────────────────────────────────────────────────────
+
+    def _enqueue(self, job: _Job) -> None:
+        lane = self._lanes[job.priority]
+        if lane and lane[-1].can_merge(job):
+            last = lane[-1]
+            last.text = f"{last.text}\n{job.text}"
+            last.merged.append(job.future)
+        else:
+            lane.append(job)
+        self._wakeup.set()
+
+    def _chat(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self._chat_rate, self._chat_burst)
+        return bucket
+
+    def _next_job(self) -> "tuple[Optional[_Job], float]":
+        """Перше готове завдання за пріоритетом або час очікування до найближчого."""
+        now = time.monotonic()
+        wait = self._global.wait_time(now)
+        if wait > 0:
+            return None, wait
+        wait = float("inf")
+        for priority in _LANES:
+            lane = self._lanes[priority]
+            for job in lane:
+                chat_wait = self._chat(job.chat_id).wait_time(now)
+                if chat_wait <= 0:
+                    lane.remove(job)
+                    return job, 0.0
+                wait = min(wait, chat_wait)
+        return None, wait
+
+    async def _run(self) -> None:
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                timeout = None if wait == float("inf") else wait
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = time.monotonic()
+            self._global.take(now)
+            self._chat(job.chat_id).take(now)
+            await self._deliver(job)
+
+    async def _deliver(self, job: _Job, attempt: int = 0) -> None:
+        try:
+            if job.call is not None:
+                result = await job.call()
+            else:
+                result = await self._bot.send_message(
+                    job.chat_id, job.text, parse_mode=job.parse_mode, reply_markup=job.reply_markup
+                )
+        except TelegramRetryAfter as e:
+            # Flood control: чат на паузі, повідомлення повертається на початок своєї смуги
+            logger.warning("Telegram flood control для чату %s: пауза %sс", job.chat_id, e.retry_after)
+            self._chat(job.chat_id).pause(e.retry_after)
+            self._lanes[job.priority].appendleft(job)
+            return
+        except TelegramNetworkError as e:
+            if attempt + 1 < _NETWORK_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+                await self._deliver(job, attempt + 1)
+                return
+            self._fail(job, e)
+            return
+        except Exception as e:
+            logger.error("Не вдалося надіслати повідомлення в чат %s: %s", job.chat_id, e)
+            self._fail(job, e)
+            return
+
+        for fut in [job.future, *job.merged]:
+            if not fut.done():
+                fut.set_result(result)
+
+    @staticmethod
+    def _fail(job: _Job, exc: BaseException) -> None:
+        for fut in [job.future, *job.merged]:
+            if not fut.done():
+                fut.set_exception(exc)
@@ -0,0 +1,168 @@
+"""Огляд усіх цілей одним повідомленням.
+
+Стан сервісів (один ``systemctl show`` на всіх), PostgreSQL, Redis, останній
+коміт і пам'ять збираються паралельно, тож час побудови обмежений
+найповільнішою перевіркою, а не їх сумою. Готовий знімок кешується на
+кілька секунд: повторні натискання й "🔄 Оновити" нічого не запускають.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from app.context import Context
+from app.core.exec import safe_html
+from app.core.targets import Target
+from app.services.db import DbProbe, probe_db
+from app.services.git import git_last_commit
+from app.services.redis import RedisProbe, probe_redis
+from app.services.systemd import UnitSnapshot, systemctl_show_units
+
+
+T = TypeVar("T")
+
+_OVERVIEW_TTL = 15.0
+# Дедлайн однієї клітинки: повільна перевірка не тримає весь огляд
+_CELL_TIMEOUT = 12.0
+
+
+@dataclass(frozen=True)
+class Cell:
+    text: str
+    ok: Optional[bool]  # None — не налаштовано / не застосовно
+    elapsed: float
+
+
+@dataclass(frozen=True)
+class TargetRow:
+    target: Target
+    service: Cell
+    memory: Cell
+    db: Cell
+    redis: Cell
+    commit: Cell
+
+
+@dataclass(frozen=True)
+class Overview:
+    rows: List[TargetRow]
+    taken_at: float
+    elapsed: float
+
+
+# (текст, стан, виміряна затримка перевірки або None — тоді час виклику)
+_CellValue = Tuple[str, Optional[bool], Optional[float]]
+
+
+async def _timed(factory: Callable[[], Awaitable[T]], convert: Callable[[T], _CellValue]) -> Cell:
+    started = time.monotonic()
+    latency = None
+    try:
+        value = await asyncio.wait_for(factory(), timeout=_CELL_TIMEOUT)
+        text, ok, latency = convert(value)
+    except asyncio.TimeoutError:
+        text, ok = "timeout", False
+    except Exception:
+        text, ok = "помилка", False
+    return Cell(text=text, ok=ok, elapsed=latency if latency is not None else time.monotonic() - started)
+
+
+def _db_cell(probe: Optional[DbProbe]) -> _CellValue:
+    if probe is None:
+        return "—", None, None
+    return ("ok" if probe.healthy else "down"), probe.healthy, probe.latency
+
+
+def _redis_cell(probe: Optional[RedisProbe]) -> _CellValue:
+    if probe is None:
+        return "—", None, None
+    if not probe.url:
+        return "no url", False, None
+    return ("ok" if probe.healthy else "down"), probe.healthy, probe.latency
+
+
+def _commit_cell(out: str) -> _CellValue:
+    if not out or out.startswith(("❌", "⏱")):
+        return "—", False, None
+    return out.splitlines()[0], True, None
+
+
+async def collect_overview(ctx: Context) -> Overview:
+    return await ctx.probes.get(("overview",), _OVERVIEW_TTL, lambda: _collect_overview(ctx))
+
+
+async def _collect_overview(ctx: Context) -> Overview:
+    started = time.monotonic()
+    targets = list(ctx.targets.values())
+
+    async def _show() -> Tuple[Dict[str, UnitSnapshot], float]:
+        # Один systemctl show на всі цілі — стан і пам'ять для всього стовпця
+        show_started = time.monotonic()
+        try:
+            snaps = await asyncio.wait_for(
+                systemctl_show_units([t.service for t in targets], ctx=ctx), timeout=_CELL_TIMEOUT
+            )
+        except Exception:
+            snaps = {}
+        return snaps, time.monotonic() - show_started
+
+    async def _probes(target: Target) -> Tuple[Cell, Cell, Cell]:
+        db, redis, commit = await asyncio.gather(
+            _timed(lambda: probe_db(target, ctx=ctx), _db_cell),
+            _timed(lambda: probe_redis(target, ctx=ctx), _redis_cell),
+            _timed(lambda: git_last_commit(target, ctx=ctx), _commit_cell),
+        )
+        return db, redis, commit
+
+    (snapshots, show_elapsed), *probes = await asyncio.gather(_show(), *(_probes(t) for t in targets))
+
+    rows: List[TargetRow] = []
+    for target, (db, redis, commit) in zip(targets, probes):
+        snap = snapshots.get(target.service)
+        if snap is None:
+            service = Cell("?", False, show_elapsed)
+            memory = Cell("—", None, show_elapsed)
+        else:
+            service = Cell(snap.active_state, snap.is_active, show_elapsed)
+            mem = snap.memory_current
+            memory = Cell(f"{mem / 1024 / 1024:.0f}M" if mem is not None else "—", None, show_elapsed)
+        rows.append(TargetRow(target=target, service=service, memory=memory, db=db, redis=redis, commit=commit))
+    return Overview(rows=rows, taken_at=time.time(), elapsed=time.monotonic() - started)
+
+
+def _ms(seconds: float) -> str:
+    if seconds < 0.01:
+        return f"{seconds * 1000:.1f}мс"
+    return f"{seconds * 1000:.0f}мс" if seconds < 1 else f"{seconds:.1f}с"
+
+
+def _status(cell: Cell) -> str:
+    mark = {True: "✓", False: "✗", None: " "}[cell.ok]
+    return f"{mark}{cell.text}"
+
+
+def render_overview(overview: Overview, *, max_len: int) -> str:
+    width = max([len("ціль")] + [len(r.target.key) for r in overview.rows])
+    lines = [f"{'ціль':<{width}} {'сервіс':<15} {'PG':<13} {'Redis':<13} {'RAM':>6}"]
+    for r in overview.rows:
+        lines.append(
+            f"{r.target.key:<{width}} "
+            f"{_status(r.service):<9}{_ms(r.service.elapsed):>6} "
+            f"{_status(r.db):<7}{_ms(r.db.elapsed):>6} "
+            f"{_status(r.redis):<7}{_ms(r.redis.elapsed):>6} "
+            f"{r.memory.text:>6}"
+        )
+    commits = [
+        f"📝 <code>{r.target.key}</code>: {safe_html(r.commit.text, max_len=120)} <i>({_ms(r.commit.elapsed)})</i>"
+        for r in overview.rows
+    ]
+    down = sum(1 for r in overview.rows if r.service.ok is False or r.db.ok is False or r.redis.ok is False)
+    icon = "🔴" if down else "🟢"
+    age = time.time() - overview.taken_at
+    return (
+        f"🗺 <b>Огляд</b> {icon} · цілей: {len(overview.rows)}"
+        f"{f' · з проблемами: {down}' if down else ''}\n"
+        f"<pre>{safe_html(chr(10).join(lines), max_len=max_len)}</pre>\n"
+        + "\n".join(commits)
+        + f"\n\n⏱ Зібрано за {_ms(overview.elapsed)}, {age:.0f}с тому"
+    )
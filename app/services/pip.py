@@ -1,7 +1,8 @@
 from pathlib import Path
+from typing import Optional, Tuple
 
 from app.context import Context
-from app.core.exec import run_command
+from app.core.exec import run_command_spilled
 from app.core.targets import Target
 
 
@@ -11,17 +12,35 @@ def python_for_target(target: Target) -> Path:
     return Path(__import__("sys").executable)
 
 
-def pip_install(target: Target, *, ctx: Context) -> str:
+async def pip_install(target: Target, *, ctx: Context) -> Tuple[str, Optional[str]]:
     py = python_for_target(target)
     req = target.resolved_req_file()
-    return run_command([str(py), "-m", "pip", "install", "-r", str(req)], timeout=300, max_output_size=ctx.config.max_output_size)
+    return await run_command_spilled(
+        [str(py), "-m", "pip", "install", "-r", str(req)],
+        timeout=300,
+        max_output_size=ctx.config.max_output_size,
+        limit_key=target.service,
+        spill=ctx.spill,
+    )
 
 
-def pip_freeze(target: Target, *, ctx: Context) -> str:
+async def pip_freeze(target: Target, *, ctx: Context) -> Tuple[str, Optional[str]]:
     py = python_for_target(target)
-    return run_command([str(py), "-m", "pip", "freeze"], timeout=60, max_output_size=ctx.config.max_output_size)
+    return await run_command_spilled(
+        [str(py), "-m", "pip", "freeze"],
+        timeout=60,
+        max_output_size=ctx.config.max_output_size,
+        limit_key=target.service,
+        spill=ctx.spill,
+    )
 
 
-def pip_outdated(target: Target, *, ctx: Context) -> str:
+async def pip_outdated(target: Target, *, ctx: Context) -> Tuple[str, Optional[str]]:
     py = python_for_target(target)
-    return run_command([str(py), "-m", "pip", "list", "--outdated"], timeout=90, max_output_size=ctx.config.max_output_size)
+    return await run_command_spilled(
+        [str(py), "-m", "pip", "list", "--outdated"],
+        timeout=90,
+        max_output_size=ctx.config.max_output_size,
+        limit_key=target.service,
+        spill=ctx.spill,
+    )
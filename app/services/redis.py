@@ -1,9 +1,21 @@
-from typing import Dict, Optional
+import asyncio
+import ssl
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
 
 from app.context import Context
-from app.core.exec import run_command, safe_html
+from app.core.exec import safe_html
 from app.core.targets import Target
 from app.core.envfile import parse_env_file
+from app.services.db import format_latency
+
+
+_REDIS_STATUS_TTL = 10.0
+_REDIS_TIMEOUT = 5.0
+_REDIS_DEFAULT_PORT = 6379
 
 
 def _truthy(val: Optional[str]) -> bool:
@@ -38,21 +50,140 @@ def _is_redis_enabled(env: Dict[str, str]) -> bool:
     return False
 
 
-def get_redis_status(target: Target, *, ctx: Context) -> str:
+@dataclass(frozen=True)
+class RedisPing:
+    """Результат PING по протоколу RESP."""
+
+    healthy: bool
+    latency: Optional[float]  # секунди від connect до PONG (разом з AUTH/SELECT)
+    reply: str
+
+
+def _resp_command(*args: str) -> bytes:
+    out = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg.encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Tuple[bool, str]:
+    """Одна відповідь RESP: (успіх, текст). Масиви не очікуються — лише перший рядок."""
+    line = (await reader.readuntil(b"\r\n"))[:-2]
+    if not line:
+        raise ConnectionError("порожня відповідь")
+    prefix, rest = line[:1], line[1:].decode("utf-8", errors="replace")
+    if prefix == b"-":
+        return False, rest
+    if prefix == b"$":
+        size = int(rest)
+        if size < 0:
+            return True, ""
+        data = await reader.readexactly(size + 2)
+        return True, data[:-2].decode("utf-8", errors="replace")
+    if prefix in (b"+", b":"):
+        return True, rest
+    raise ConnectionError("сервер не відповідає як Redis")
+
+
+def _parse_redis_url(url: str) -> Tuple[str, int, Optional[str], Optional[str], int, bool]:
+    """(host, port, username, password, db, tls) з redis:// або rediss:// URL."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("redis", "rediss"):
+        raise ValueError(f"непідтримувана схема: {parts.scheme or '—'}")
+    db_str = parts.path.lstrip("/") or (parse_qs(parts.query).get("db") or ["0"])[0]
+    return (
+        parts.hostname or "localhost",
+        parts.port or _REDIS_DEFAULT_PORT,
+        unquote(parts.username) if parts.username else None,
+        unquote(parts.password) if parts.password else None,
+        int(db_str or 0),
+        parts.scheme == "rediss",
+    )
+
+
+async def _redis_exchange(url: str) -> Tuple[bool, str]:
+    host, port, username, password, db, tls = _parse_redis_url(url)
+    ssl_ctx = ssl.create_default_context() if tls else None
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl_ctx)
+    try:
+        # AUTH, SELECT і PING одним пакетом — один мережевий round trip
+        commands: List[bytes] = []
+        if password:
+            commands.append(_resp_command("AUTH", username, password) if username else _resp_command("AUTH", password))
+        if db:
+            commands.append(_resp_command("SELECT", str(db)))
+        commands.append(_resp_command("PING"))
+        writer.write(b"".join(commands))
+        await writer.drain()
+
+        ok, reply = True, ""
+        for _ in commands:
+            ok, reply = await _read_reply(reader)
+            if not ok:
+                return False, reply
+        return reply == "PONG", reply
+    finally:
+        writer.close()
+        with suppress(Exception):
+            await writer.wait_closed()
+
+
+async def redis_ping(url: str, *, timeout: float = _REDIS_TIMEOUT) -> RedisPing:
+    """PING по протоколу RESP з AUTH/SELECT з URL — без redis-cli."""
+    started = time.monotonic()
+    try:
+        healthy, reply = await asyncio.wait_for(_redis_exchange(url), timeout=timeout)
+    except asyncio.TimeoutError:
+        return RedisPing(healthy=False, latency=None, reply=f"немає відповіді за {timeout:.0f}с")
+    except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ssl.SSLError) as e:
+        return RedisPing(healthy=False, latency=None, reply=str(e) or e.__class__.__name__)
+    return RedisPing(healthy=healthy, latency=time.monotonic() - started, reply=reply)
+
+
+@dataclass(frozen=True)
+class RedisProbe:
+    """Результат перевірки Redis цілі; ``url`` порожній — Redis увімкнено без адреси."""
+
+    healthy: bool
+    url: str
+    detail: str
+    latency: Optional[float] = None
+
+
+_NO_REDIS_URL = "⚠️ Redis увімкнено, але немає REDIS_URL або REDIS_HOST/REDIS_PORT/REDIS_DB"
+
+
+async def probe_redis(target: Target, *, ctx: Context) -> Optional[RedisProbe]:
+    """Перевірка Redis (PING); None — Redis у цілі вимкнено."""
+    return await ctx.probes.get(("redis", target.key), _REDIS_STATUS_TTL, lambda: _probe_redis(target, ctx=ctx))
+
+
+async def _probe_redis(target: Target, *, ctx: Context) -> Optional[RedisProbe]:
     env = parse_env_file(target.resolved_env_file())
     if not _is_redis_enabled(env):
-        return "ℹ️ Redis вимкнено"
+        return None
 
     url = _build_redis_url(env)
     if not url:
-        return "⚠️ Redis увімкнено, але немає REDIS_URL або REDIS_HOST/REDIS_PORT/REDIS_DB"
+        return RedisProbe(healthy=False, url="", detail=_NO_REDIS_URL)
+
+    ping = await redis_ping(url)
+    return RedisProbe(healthy=ping.healthy, url=url, detail=ping.reply, latency=ping.latency)
+
+
+async def get_redis_status(target: Target, *, ctx: Context) -> str:
+    probe = await probe_redis(target, ctx=ctx)
+    if probe is None:
+        return "ℹ️ Redis вимкнено"
+    if not probe.url:
+        return probe.detail
 
-    out = run_command(["redis-cli", "-u", url, "PING"], timeout=5, max_output_size=ctx.config.max_output_size)
-    healthy = "PONG" in out
-    icon = "🟢" if healthy else "🔴"
+    icon = "🟢" if probe.healthy else "🔴"
     return (
         f"{icon} <b>Redis</b>\n"
         f"Ціль: <code>{target.key}</code>\n"
-        f"URL: <code>{safe_html(url, max_len=ctx.config.max_output_size)}</code>\n\n"
-        f"<blockquote expandable>{safe_html(out, max_len=ctx.config.max_output_size)}</blockquote>"
+        f"URL: <code>{safe_html(probe.url, max_len=ctx.config.max_output_size)}</code>\n"
+        f"⏱ Відповідь: <code>{format_latency(probe.latency)}</code>\n\n"
+        f"<blockquote expandable>{safe_html(probe.detail, max_len=ctx.config.max_output_size)}</blockquote>"
     )
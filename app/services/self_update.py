@@ -23,7 +23,7 @@ def _mask_url(url: str) -> str:
         return "<hidden>"
 
 
-def self_git_update(*, ctx: Context) -> Tuple[str, str, bool]:
+async def self_git_update(*, ctx: Context) -> Tuple[str, str, bool]:
     repo_root = ctx.repo_root
     git_url = (ctx.config.self_git_url or "").strip()
     branch = (ctx.config.self_git_branch or "main").strip() or "main"
@@ -31,43 +31,47 @@ def self_git_update(*, ctx: Context) -> Tuple[str, str, bool]:
     if not git_url:
         return "❌ ADMIN_BOT_GIT_URL не встановлено в .env", "", False
 
-    before = run_command(
-        ["git", "rev-parse", "--short", "HEAD"],
-        cwd=repo_root,
-        timeout=15,
-        max_output_size=ctx.config.max_output_size,
+    before = (
+        await run_command(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repo_root,
+            timeout=15,
+            max_output_size=ctx.config.max_output_size,
+        )
     ).strip()
 
     # Безпечний вивід: не розкривати облікові дані якщо URL їх містить.
     masked_url = _mask_url(git_url)
 
-    set_url = run_command(
+    set_url = await run_command(
         ["git", "remote", "set-url", "origin", git_url],
         cwd=repo_root,
         timeout=15,
         max_output_size=ctx.config.max_output_size,
     )
-    fetch = run_command(
+    fetch = await run_command(
         ["git", "fetch", "origin", "--prune"],
         cwd=repo_root,
         timeout=60,
         max_output_size=ctx.config.max_output_size,
     )
-    reset = run_command(
+    reset = await run_command(
         ["git", "reset", "--hard", f"origin/{branch}"],
         cwd=repo_root,
         timeout=60,
         max_output_size=ctx.config.max_output_size,
     )
 
-    after = run_command(
-        ["git", "rev-parse", "--short", "HEAD"],
-        cwd=repo_root,
-        timeout=15,
-        max_output_size=ctx.config.max_output_size,
+    after = (
+        await run_command(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repo_root,
+            timeout=15,
+            max_output_size=ctx.config.max_output_size,
+        )
     ).strip()
 
-    log1 = run_command(
+    log1 = await run_command(
         ["git", "log", "-1", "--format=%h - %s (%cr) <%an>"],
         cwd=repo_root,
         timeout=30,
@@ -1,80 +1,122 @@
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
 from app.context import Context
-from app.core.exec import run_command, safe_html
+from app.core.exec import safe_html
+from app.core.procfs import DiskUsage, format_bytes, format_duration, format_timestamp
 from app.core.targets import Target
+from app.services.metrics import history_block, host_history, target_history
+
 
+# Пороги попереджень про диск
+_DISK_WARN_PERCENT = 80
+_DISK_CRIT_PERCENT = 90
+_DISK_CRIT_FREE = 2 * 1024**3
 
-def collect_system_info(target: Target, *, ctx: Context) -> str:
-    uptime = run_command(["uptime", "-p"], timeout=10, max_output_size=ctx.config.max_output_size)
-
-    df_out = run_command(["df", "-h", "/"], timeout=10, max_output_size=ctx.config.max_output_size)
-    disk = "N/A"
-    disk_warning = ""
-    lines = [ln for ln in df_out.splitlines() if ln.strip()]
-    if len(lines) >= 2:
-        cols = lines[-1].split()
-        if len(cols) >= 5:
-            disk = cols[4]
-            # Перевірка критичного рівня заповнення
-            try:
-                disk_percent = int(disk.rstrip("%"))
-                if disk_percent >= 90:
-                    disk_warning = " 🔴 КРИТИЧНО"
-                elif disk_percent >= 80:
-                    disk_warning = " 🟡 УВАГА"
-            except ValueError:
-                pass
 
+def _disk_line(disk: DiskUsage, label: str) -> str:
+    warning = ""
+    if disk.used_percent >= _DISK_CRIT_PERCENT:
+        warning = " 🔴 КРИТИЧНО"
+    elif disk.used_percent >= _DISK_WARN_PERCENT:
+        warning = " 🟡 УВАГА"
     # Перевірка вільного місця в GB
-    df_gb = run_command(["df", "-BG", "/"], timeout=10, max_output_size=ctx.config.max_output_size)
-    free_gb_str = ""
-    lines_gb = [ln for ln in df_gb.splitlines() if ln.strip()]
-    if len(lines_gb) >= 2:
-        cols = lines_gb[-1].split()
-        if len(cols) >= 4:
-            free_gb = cols[3].rstrip("G")
-            try:
-                if int(free_gb) < 2:
-                    disk_warning = " 🔴 КРИТИЧНО (< 2ГБ)"
-                free_gb_str = f" ({free_gb}ГБ вільно)"
-            except ValueError:
-                pass
-
-    free_out = run_command(["free", "-h"], timeout=10, max_output_size=ctx.config.max_output_size)
-    mem = "N/A"
-    for ln in free_out.splitlines():
-        if ln.startswith("Mem:"):
-            cols = ln.split()
-            if len(cols) >= 3:
-                mem = f"{cols[2]}/{cols[1]}"
-
-    loadavg = run_command(["cat", "/proc/loadavg"], timeout=5, max_output_size=ctx.config.max_output_size)
-    loadavg_short = " ".join(loadavg.split()[:3]) if loadavg and not loadavg.startswith("❌") else "N/A"
-
-    service_uptime = run_command(
-        ["systemctl", "show", target.service, "--property=ActiveEnterTimestamp", "--value"],
-        timeout=10,
-        max_output_size=ctx.config.max_output_size,
-    )
-    service_memory = run_command(
-        ["systemctl", "show", target.service, "--property=MemoryCurrent", "--value"],
-        timeout=10,
-        max_output_size=ctx.config.max_output_size,
-    )
+    if disk.free < _DISK_CRIT_FREE:
+        warning = " 🔴 КРИТИЧНО (< 2ГБ)"
+    free_gb = disk.free // 1024**3
+    return f"💿 {label}: <code>{disk.used_percent}% ({free_gb}ГБ вільно)</code>{warning}"
+
+
+async def collect_system_info(target: Target, *, ctx: Context) -> str:
+    """Системна інформація з /proc, statvfs і cgroup юніта — без дочірніх процесів."""
+    host = ctx.host
+    mem = host.meminfo()
+    load = host.loadavg()
+    uptime = host.uptime()
+    cpu = host.cpu_percent()
+
+    ram = f"{format_bytes(mem.used)}/{format_bytes(mem.total)}" if mem else "N/A"
+
+    lines: List[str] = [
+        "⚙️ <b>Системна інформація</b>",
+        f"🎯 Ціль: <code>{target.key}</code>",
+        f"💾 RAM: <code>{ram}</code>",
+    ]
+    disks = host.disks([Path("/"), target.path])
+    if not disks:
+        lines.append("💿 Диск: <code>N/A</code>")
+    for i, disk in enumerate(disks):
+        label = "Диск" if i == 0 else safe_html(disk.path, max_len=200)
+        lines.append(_disk_line(disk, label))
+    lines.append(f"⏰ Час роботи: <code>{format_duration(uptime) if uptime is not None else 'N/A'}</code>")
+    load_str = " ".join(f"{x:.2f}" for x in load) if load else "N/A"
+    cpu_str = f" · CPU {cpu:.0f}%" if cpu is not None else ""
+    lines.append(f"📈 Навантаження: <code>{load_str}{cpu_str}</code>")
+
+    sample = host.sample_unit(target.service)
+    usage = sample.cgroup if sample is not None else None
+    if usage is not None and usage.started_at is not None:
+        started = f"{format_timestamp(usage.started_at)} ({format_duration(time.time() - usage.started_at)} тому)"
+    else:
+        started = "N/A"
+    if usage is not None and usage.memory_current is not None:
+        service_memory = f"{usage.memory_current / 1024 / 1024:.1f} MB"
+    else:
+        service_memory = "N/A"
+
+    lines += [
+        "",
+        f"📦 <b>Сервіс: {safe_html(target.service, max_len=ctx.config.max_output_size)}</b>",
+        f"🔄 Запущено: <code>{started}</code>",
+        f"💾 Пам'ять: <code>{service_memory}</code>",
+    ]
+    if sample is not None and sample.cpu_percent is not None:
+        lines.append(f"🧮 CPU: <code>{sample.cpu_percent:.1f}%</code>")
+    text = "\n".join(lines)
+    text += history_block("Хост", host_history(ctx))
+    text += history_block(f"Сервіс {safe_html(target.key, max_len=200)}", target_history(ctx, target))
+    return text
+
+
+def _cell(value: Optional[float], fmt: Callable[[float], str]) -> str:
+    return "—" if value is None else fmt(value)
+
+
+def _size(n: float) -> str:
+    return format_bytes(n).replace("i", "")
 
-    try:
-        mem_mb = int(service_memory) / 1024 / 1024
-        service_memory_str = f"{mem_mb:.1f} MB"
-    except Exception:
-        service_memory_str = "N/A"
 
+def resources_table(ctx: Context) -> str:
+    """Компактна таблиця ресурсів усіх цілей з cgroup v2 (без дочірніх процесів)."""
+    samples = ctx.host.sample_units([t.service for t in ctx.targets.values()])
+    width = max(len(k) for k in ctx.targets)
+    header = f"{'ціль':<{width}} {'CPU':>6} {'RAM':>6} {'пік':>6} {'RSS':>6} {'задач':>5} {'fd':>5} {'IO ч/з':>11}"
+    rows = [header]
+    pending = False
+    for target in ctx.targets.values():
+        sample = samples.get(target.service)
+        if sample is None:
+            rows.append(f"{target.key:<{width}} {'немає cgroup':>6}")
+            continue
+        cg = sample.cgroup
+        if sample.cpu_percent is None:
+            pending = True
+        io = "—"
+        if sample.io_read_rate is not None and sample.io_write_rate is not None:
+            io = f"{_size(sample.io_read_rate)}/{_size(sample.io_write_rate)}"
+        rows.append(
+            f"{target.key:<{width}} "
+            f"{_cell(sample.cpu_percent, lambda v: f'{v:.1f}%'):>6} "
+            f"{_cell(cg.memory_current, _size):>6} "
+            f"{_cell(cg.memory_peak, _size):>6} "
+            f"{_cell(sample.rss, _size):>6} "
+            f"{_cell(cg.pids_current, lambda v: str(int(v))):>5} "
+            f"{_cell(sample.fds, lambda v: str(int(v))):>5} "
+            f"{io:>11}"
+        )
+    note = "\n<i>CPU% і IO (за секунду) — з наступного оновлення</i>" if pending else ""
     return (
-        "⚙️ <b>Системна інформація</b>\n"
-        f"🎯 Ціль: <code>{target.key}</code>\n"
-        f"💾 RAM: <code>{safe_html(mem, max_len=ctx.config.max_output_size)}</code>\n"
-        f"💿 Диск: <code>{safe_html(disk, max_len=ctx.config.max_output_size)}{safe_html(free_gb_str, max_len=ctx.config.max_output_size)}</code>{disk_warning}\n"
-        f"⏰ Час роботи: <code>{safe_html(uptime, max_len=ctx.config.max_output_size)}</code>\n"
-        f"📈 Навантаження: <code>{safe_html(loadavg_short, max_len=ctx.config.max_output_size)}</code>\n\n"
-        f"📦 <b>Сервіс: {safe_html(target.service, max_len=ctx.config.max_output_size)}</b>\n"
-        f"🔄 Запущено: <code>{safe_html(service_uptime, max_len=ctx.config.max_output_size)}</code>\n"
-        f"💾 Пам'ять: <code>{safe_html(service_memory_str, max_len=ctx.config.max_output_size)}</code>"
+        "📋 <b>Ресурси цілей</b>\n"
+        f"<pre>{safe_html(chr(10).join(rows), max_len=ctx.config.max_output_size)}</pre>{note}"
     )
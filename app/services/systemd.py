@@ -1,16 +1,140 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
 
 from app.context import Context
 from app.core.exec import run_command
 
 
-def systemctl_status(service: str, *, ctx: Context) -> str:
-    return run_command(["systemctl", "status", service], timeout=15, max_output_size=ctx.config.max_output_size)
+# TTL кешу read-only перевірок (секунди)
+_STATUS_TTL = 5.0
+_IS_ACTIVE_TTL = 5.0
+_SHOW_TTL = 5.0
 
+_SHOW_PROPERTIES = (
+    "ActiveState",
+    "SubState",
+    "NRestarts",
+    "MainPID",
+    "MemoryCurrent",
+    "ActiveEnterTimestamp",
+    "ExecMainStatus",
+    "Result",
+)
 
-def systemctl_is_active(service: str, *, ctx: Context) -> str:
-    return run_command(["systemctl", "is-active", service], timeout=10, max_output_size=ctx.config.max_output_size)
+# systemd повертає UINT64_MAX, коли лічильник недоступний
+_UINT64_MAX = 2**64 - 1
 
 
-def sudo_systemctl_restart(service: str, *, ctx: Context) -> str:
-    return run_command(["sudo", "systemctl", "restart", service], timeout=30, max_output_size=ctx.config.max_output_size)
+@dataclass(frozen=True)
+class UnitSnapshot:
+    """Стан systemd-юніту з одного виклику ``systemctl show``."""
+
+    service: str
+    active_state: str = "unknown"
+    sub_state: str = ""
+    n_restarts: Optional[int] = None
+    main_pid: Optional[int] = None
+    memory_current: Optional[int] = None
+    active_enter_timestamp: str = ""
+    exec_main_status: Optional[int] = None  # код виходу останнього головного процесу
+    result: str = ""  # success, exit-code, signal, core-dump ...
+
+    @property
+    def is_active(self) -> bool:
+        return self.active_state == "active"
+
+    @property
+    def state_label(self) -> str:
+        return f"{self.active_state} ({self.sub_state})" if self.sub_state else self.active_state
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        n = int(value or "")
+    except ValueError:
+        return None
+    return None if n == _UINT64_MAX else n
+
+
+def _parse_show_output(out: str, services: Sequence[str]) -> Dict[str, UnitSnapshot]:
+    """Розібрати вивід ``systemctl show`` (блоки через порожній рядок, у порядку аргументів)."""
+    blocks: List[Dict[str, str]] = []
+    cur: Dict[str, str] = {}
+    for line in out.splitlines():
+        if not line.strip():
+            if cur:
+                blocks.append(cur)
+                cur = {}
+            continue
+        if "=" in line:
+            k, v = line.split("=", 1)
+            cur[k.strip()] = v.strip()
+    if cur:
+        blocks.append(cur)
+
+    if len(blocks) != len(services):
+        return {s: UnitSnapshot(service=s) for s in services}
+
+    snapshots: Dict[str, UnitSnapshot] = {}
+    for service, props in zip(services, blocks):
+        main_pid = _parse_int(props.get("MainPID"))
+        snapshots[service] = UnitSnapshot(
+            service=service,
+            active_state=props.get("ActiveState") or "unknown",
+            sub_state=props.get("SubState", ""),
+            n_restarts=_parse_int(props.get("NRestarts")),
+            main_pid=main_pid or None,
+            memory_current=_parse_int(props.get("MemoryCurrent")),
+            active_enter_timestamp=props.get("ActiveEnterTimestamp", ""),
+            exec_main_status=_parse_int(props.get("ExecMainStatus")),
+            result=props.get("Result", ""),
+        )
+    return snapshots
+
+
+async def systemctl_show_units(services: Sequence[str], *, ctx: Context) -> Dict[str, UnitSnapshot]:
+    """Стан кількох юнітів одним процесом ``systemctl show``."""
+    services = list(dict.fromkeys(services))
+    if not services:
+        return {}
+
+    async def _show() -> Dict[str, UnitSnapshot]:
+        out = await run_command(
+            ["systemctl", "show", "-p", ",".join(_SHOW_PROPERTIES), *services],
+            timeout=15,
+            max_output_size=max(ctx.config.max_output_size, 512 * len(services)),
+        )
+        if out.startswith(("❌", "⏱")):
+            return {s: UnitSnapshot(service=s) for s in services}
+        return _parse_show_output(out, services)
+
+    return await ctx.probes.get(("systemd-show", *services), _SHOW_TTL, _show)
+
+
+async def systemctl_status(service: str, *, ctx: Context) -> str:
+    return await ctx.probes.get(
+        ("systemd", service, "status"),
+        _STATUS_TTL,
+        lambda: run_command(["systemctl", "status", service], timeout=15, max_output_size=ctx.config.max_output_size, limit_key=service),
+    )
+
+
+async def systemctl_is_active(service: str, *, ctx: Context) -> str:
+    return await ctx.probes.get(
+        ("systemd", service, "is-active"),
+        _IS_ACTIVE_TTL,
+        lambda: run_command(["systemctl", "is-active", service], timeout=10, max_output_size=ctx.config.max_output_size, limit_key=service),
+    )
+
+
+def invalidate_service(service: str, *, ctx: Context) -> None:
+    """Скинути кешовані перевірки сервісу після дії, що змінює його стан."""
+    ctx.probes.invalidate("systemd", service)
+    ctx.probes.invalidate("systemd-show")
+
+
+async def sudo_systemctl_restart(service: str, *, ctx: Context) -> str:
+    try:
+        return await run_command(["sudo", "systemctl", "restart", service], timeout=30, max_output_size=ctx.config.max_output_size, limit_key=service)
+    finally:
+        invalidate_service(service, ctx=ctx)
@@ -0,0 +1,89 @@
+"""Лінійний тренд у ковзному вікні з оновленням за O(1) на вибірку.
+
+Watchdog подає сюди пам'ять сервісів і вільне місце на дисках на кожному
+тіку. Нахил рахується методом найменших квадратів з накопичених сум
+(Σt, Σy, Σt², Σty), які оновлюються при додаванні і вибуванні точки,
+тож прогноз "пам'ять/диск закінчиться через ~N год" не перераховує вікно.
+"""
+import math
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+
+class SlidingTrend:
+    """Регресія y(t) за точками не старшими за ``window`` секунд."""
+
+    def __init__(self, window: float, *, max_points: int = 2000) -> None:
+        self.window = window
+        self.max_points = max_points
+        self._points: Deque[Tuple[float, float]] = deque()
+        # Час відраховується від origin, щоб суми квадратів не втрачали точність
+        self._origin = 0.0
+        self._st = self._sy = self._stt = self._sty = 0.0
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    @property
+    def span(self) -> float:
+        return self._points[-1][0] - self._points[0][0] if self._points else 0.0
+
+    def _account(self, t: float, y: float, sign: float) -> None:
+        x = t - self._origin
+        self._st += sign * x
+        self._sy += sign * y
+        self._stt += sign * x * x
+        self._sty += sign * x * y
+
+    def _rebase(self) -> None:
+        """Перенести origin на першу точку і перерахувати суми (амортизовано O(1))."""
+        self._origin = self._points[0][0]
+        self._st = self._sy = self._stt = self._sty = 0.0
+        for t, y in self._points:
+            self._account(t, y, 1.0)
+
+    def reset(self) -> None:
+        self._points.clear()
+        self._st = self._sy = self._stt = self._sty = 0.0
+
+    def add(self, t: float, y: float) -> None:
+        if not self._points:
+            self._origin = t
+        self._points.append((t, y))
+        self._account(t, y, 1.0)
+        while self._points and (t - self._points[0][0] > self.window or len(self._points) > self.max_points):
+            old_t, old_y = self._points.popleft()
+            self._account(old_t, old_y, -1.0)
+        if self._points and self._points[0][0] - self._origin > 4 * self.window:
+            self._rebase()
+
+    def slope(self) -> Optional[float]:
+        """Зміна y за секунду або None, якщо точок замало."""
+        n = len(self._points)
+        if n < 2:
+            return None
+        denom = n * self._stt - self._st * self._st
+        if denom <= 0:
+            return None
+        return (n * self._sty - self._st * self._sy) / denom
+
+    def level(self, t: float) -> Optional[float]:
+        """Значення тренду в момент ``t`` (згладжене, на відміну від останньої вибірки)."""
+        slope = self.slope()
+        if slope is None:
+            return None
+        n = len(self._points)
+        intercept = (self._sy - slope * self._st) / n
+        return intercept + slope * (t - self._origin)
+
+    def eta(self, limit: float, t: float) -> Optional[float]:
+        """Через скільки секунд тренд досягне ``limit`` (None — не досягне)."""
+        slope = self.slope()
+        level = self.level(t)
+        if slope is None or level is None or slope == 0:
+            return None
+        remaining = (limit - level) / slope
+        if remaining < 0 or math.isinf(remaining):
+            # Тренд віддаляється від межі (або вже за нею — про це скаже інша перевірка)
+            return None
+        return remaining
@@ -1,159 +1,757 @@
 """Сервіс моніторингу (watchdog) для спостереження за цілями та надсилання сповіщень."""
 import asyncio
+import heapq
+import itertools
 import logging
+import random
 import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, Set
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
 
-from aiogram import Bot
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from app.context import Context
-from app.services.journal import journalctl_lines
-from app.services.systemd import systemctl_is_active
+from app.core.exec import safe_html
+from app.core.targets import Target
+from app.services.db import probe_db
+from app.services.journal import iter_journal_entries
+from app.services.log_records import LogRecord, RecordAssembler, record_matches
+from app.services.log_templates import fingerprint
+from app.services.outbox import ALERT
+from app.services.redis import probe_redis
+from app.services.systemd import UnitSnapshot, systemctl_show_units
+from app.services.trends import SlidingTrend
 
 
 logger = logging.getLogger("admin_bot")
 
-# Трекінг відправлених повідомлень для уникнення спаму
-_last_alerts: Dict[str, datetime] = {}
-_ALERT_COOLDOWN = timedelta(minutes=15)  # Не спамити однаковими alertами
+# Не спамити однаковими alertами (стан — у ctx.alert_state, переживає перезапуск)
+_ALERT_COOLDOWN = timedelta(minutes=15)
 
-# Помічені як "в роботі" алерти (не спамити доки не виправлять)
-_acknowledged_alerts: Set[str] = set()
+# Патерн критичних рядків журналу
+_CRITICAL_RE = re.compile(r"CRITICAL|FATAL", re.IGNORECASE)
+# Скільки рядків читати при першому запуску (поки немає збереженого курсора)
+_INITIAL_SCAN_LINES = 50
+# Межа відставання від курсора: після довгої паузи читаються лише найновіші записи
+_MAX_SCAN_LINES = 5000
+# Скільки останніх критичних подій тримати для попереднього перегляду
+_CRITICAL_KEEP = 3
 
+# Планувальник: результати перевірки цілі
+_OK, _DEGRADED, _FAILED = "ok", "degraded", "failed"
+# Повторна перевірка деградованої цілі (секунди)
+_DEGRADED_RECHECK = 30
+# Верхня межа backoff для цілей, чиї перевірки падають (секунди)
+_MAX_BACKOFF = 3600
+# Випадковий зсув інтервалу, щоб перевірки не вирівнювались (±10%)
+_JITTER = 0.1
+# Цілі, що настали в межах цього вікна, перевіряються однією групою
+_BATCH_WINDOW = 1.0
+# Запас до ліміту довжини повідомлення Telegram для тексту дайджесту
+_DIGEST_LIMIT = 3800
+# Скільки чекати доставки накопиченого дайджесту при зупинці (секунди)
+_SHUTDOWN_FLUSH_TIMEOUT = 10
+# Прогноз: мінімум точок і частка вікна, яку вони мають покривати, щоб довіряти нахилу
+_TREND_MIN_POINTS = 6
+_TREND_MIN_SPAN = 0.25
+# Прогноз змінюється повільно — нагадування не частіше
+_TREND_COOLDOWN = timedelta(hours=6)
 
-def _should_send_alert(alert_key: str) -> bool:
+
+def _should_send_alert(ctx: Context, alert_key: str, cooldown: timedelta = _ALERT_COOLDOWN) -> bool:
     """Перевірити чи можна відправити alert (не acknowledged і cooldown пройшов)."""
-    # Якщо помічено як "в роботі" - не спамимо
-    if alert_key in _acknowledged_alerts:
-        return False
-    
-    if alert_key not in _last_alerts:
-        return True
-    return datetime.now() - _last_alerts[alert_key] > _ALERT_COOLDOWN
+    return ctx.alert_state.should_send(alert_key, cooldown.total_seconds())
 
 
-def _mark_alert_sent(alert_key: str) -> None:
+def _mark_alert_sent(ctx: Context, alert_key: str, *, target: str, summary: str) -> None:
     """Помітити alert як відправлений."""
-    _last_alerts[alert_key] = datetime.now()
+    ctx.alert_state.mark_sent(alert_key, target=target, summary=summary)
 
 
-def acknowledge_alert(alert_key: str) -> None:
+def acknowledge_alert(alert_key: str, *, ctx: Context) -> None:
     """Помітити alert як 'в роботі' - більше не спамити доки не знято."""
-    _acknowledged_alerts.add(alert_key)
+    ctx.alert_state.acknowledge(alert_key)
+    ctx.alert_state.flush()
     logger.info("Alert acknowledged: %s", alert_key)
 
 
-def unacknowledge_alert(alert_key: str) -> None:
+def unacknowledge_alert(alert_key: str, *, ctx: Context) -> bool:
     """Зняти позначку 'в роботі' - дозволити alertи знову."""
-    _acknowledged_alerts.discard(alert_key)
+    changed = ctx.alert_state.unacknowledge(alert_key)
+    ctx.alert_state.flush()
     logger.info("Alert unacknowledged: %s", alert_key)
+    return changed
+
+
+@dataclass
+class _Alert:
+    """Сформоване сповіщення: повний текст і компактний рядок для дайджесту."""
+
+    target: Target
+    key: str
+    text: str  # HTML окремого повідомлення
+    digest_line: str  # HTML рядка в дайджесті
+    keyboard: InlineKeyboardMarkup
+    icon: str
+    with_logs: bool = False
+
+
+@dataclass
+class _FlapWindow:
+    """Ковзне вікно перезапусків цілі за лічильниками systemd (NRestarts, ActiveEnterTimestamp)."""
+
+    events: Deque[Tuple[float, int]] = field(default_factory=deque)  # (час, перезапусків)
+    last: Optional[UnitSnapshot] = None
+
+    def observe(self, snap: UnitSnapshot, now: float, window: float) -> int:
+        """Врахувати новий знімок; повертає кількість перезапусків у вікні."""
+        prev, self.last = self.last, snap
+        if prev is not None:
+            restarts = 0
+            cur, old = snap.n_restarts, prev.n_restarts
+            if cur is not None and old is not None and cur >= old:
+                restarts = cur - old
+            # Ручний start скидає NRestarts — тоді враховуємо новий вхід у active
+            entered = snap.active_enter_timestamp
+            if not restarts and entered and entered != prev.active_enter_timestamp:
+                restarts = 1
+            if restarts:
+                self.events.append((now, restarts))
+        while self.events and now - self.events[0][0] > window:
+            self.events.popleft()
+        return sum(n for _, n in self.events)
+
+
+class _AlertSink:
+    """Надсилає кожне сповіщення окремим повідомленням одразу."""
+
+    async def emit(self, ctx: Context, alert: _Alert) -> None:
+        await ctx.outbox.send(
+            ctx.config.admin_id, alert.text, parse_mode="HTML", reply_markup=alert.keyboard, priority=ALERT
+        )
+
+    def deadline(self) -> Optional[float]:
+        return None
+
+    async def flush(self, ctx: Context, *, force: bool = False) -> None:
+        return None
+
+
+class _DigestSink(_AlertSink):
+    """Режим дайджесту: сповіщення за тік (або вікно) — одним повідомленням по цілях."""
+
+    def __init__(self, window: float) -> None:
+        self._window = window
+        self._pending: List[_Alert] = []
+        self._first_at: Optional[float] = None
+
+    async def emit(self, ctx: Context, alert: _Alert) -> None:
+        if not self._pending:
+            self._first_at = asyncio.get_running_loop().time()
+        self._pending.append(alert)
+
+    def deadline(self) -> Optional[float]:
+        if self._first_at is None or self._window <= 0:
+            return None
+        return self._first_at + self._window
+
+    async def flush(self, ctx: Context, *, force: bool = False) -> None:
+        if not self._pending:
+            return
+        deadline = self.deadline()
+        if not force and deadline is not None and asyncio.get_running_loop().time() < deadline:
+            return
+        pending, self._pending, self._first_at = self._pending, [], None
+        for text, kb in _format_digest(pending):
+            await ctx.outbox.send(ctx.config.admin_id, text, parse_mode="HTML", reply_markup=kb, priority=ALERT)
+        logger.warning("Alert digest sent: %d сповіщень", len(pending))
+
+
+def _format_digest(alerts: List[_Alert]) -> List[Tuple[str, InlineKeyboardMarkup]]:
+    """Згрупувати сповіщення по цілях; довгий дайджест ділиться на кілька повідомлень."""
+    by_target: Dict[str, List[_Alert]] = {}
+    for alert in alerts:
+        by_target.setdefault(alert.target.key, []).append(alert)
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    header = (
+        f"🧾 <b>СПОВІЩЕННЯ: дайджест</b>\n"
+        f"⚠️ Проблем: <code>{len(alerts)}</code> · цілей: <code>{len(by_target)}</code>\n"
+        f"⏰ Час: <code>{now}</code>"
+    )
+    messages: List[Tuple[str, InlineKeyboardMarkup]] = []
+    text, rows = header, []
+    for key, items in by_target.items():
+        target = items[0].target
+        block = f"\n\n🎯 <code>{key}</code> (<code>{target.service}</code>)\n" + "\n".join(a.digest_line for a in items)
+        row = [
+            InlineKeyboardButton(text=f"✅ {a.icon} {key}", callback_data=f"ack_alert:{a.key}"[:64]) for a in items
+        ]
+        row.append(InlineKeyboardButton(text=f"🔄 {key}", callback_data=f"quick_restart:{key}"))
+        if any(a.with_logs for a in items):
+            row.append(InlineKeyboardButton(text=f"📜 {key}", callback_data=f"quick_logs:{key}"))
+        if rows and len(text) + len(block) > _DIGEST_LIMIT:
+            messages.append((text, InlineKeyboardMarkup(inline_keyboard=rows)))
+            text, rows = header, []
+        text += block
+        rows.append(row)
+    messages.append((text, InlineKeyboardMarkup(inline_keyboard=rows)))
+    return messages
+
+
+async def _check_flapping(
+    ctx: Context, target: Target, snap: UnitSnapshot, sink: _AlertSink, flap: _FlapWindow
+) -> bool:
+    """Виявити цикл перезапусків: сервіс "active" більшість часу, але постійно падає."""
+    window = ctx.config.flap_window
+    restarts = flap.observe(snap, time.monotonic(), window)
+    if restarts < ctx.config.flap_threshold:
+        return False
+
+    alert_key = f"flapping_{target.key}"
+    if _should_send_alert(ctx, alert_key):
+        rate = restarts * 3600 / window
+        exit_code = "—" if snap.exec_main_status is None else str(snap.exec_main_status)
+        result = f" ({snap.result})" if snap.result and snap.result != "success" else ""
+        kb = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(text="✅ Виправляємо...", callback_data=f"ack_alert:{alert_key}"),
+                    InlineKeyboardButton(text="📜 Повні логи", callback_data=f"quick_logs:{target.key}"),
+                ],
+            ]
+        )
+        await sink.emit(
+            ctx,
+            _Alert(
+                target=target,
+                key=alert_key,
+                text=(
+                    f"🔁 <b>СПОВІЩЕННЯ: Сервіс перезапускається по колу</b>\n\n"
+                    f"🎯 Ціль: <code>{target.key}</code>\n"
+                    f"📦 Сервіс: <code>{target.service}</code>\n"
+                    f"🔄 Перезапусків за {window // 60} хв: <code>{restarts}</code> (~{rate:.0f}/год)\n"
+                    f"💥 Останній код виходу: <code>{exit_code}{result}</code>\n"
+                    f"⚠️ Статус: <code>{snap.state_label}</code>"
+                ),
+                digest_line=(
+                    f"🔁 Перезапусків за {window // 60} хв: <code>{restarts}</code>, "
+                    f"код виходу <code>{exit_code}{result}</code>"
+                ),
+                keyboard=kb,
+                icon="🔁",
+                with_logs=True,
+            ),
+        )
+        _mark_alert_sent(ctx, alert_key, target=target.key, summary=f"Перезапусків за {window // 60} хв: {restarts}")
+        logger.warning("Alert sent: %s is flapping (%d restarts)", target.key, restarts)
+    return True
+
+
+def _trend_ready(trend: SlidingTrend) -> bool:
+    return len(trend) >= _TREND_MIN_POINTS and trend.span >= trend.window * _TREND_MIN_SPAN
+
+
+def _format_eta(seconds: float) -> str:
+    return f"~{seconds / 3600:.0f} год" if seconds >= 2 * 3600 else f"~{seconds / 60:.0f} хв"
+
+
+async def _check_memory_trend(ctx: Context, item: "_Schedule", snap: UnitSnapshot, sink: _AlertSink) -> None:
+    """Прогноз OOM: тренд пам'яті сервісу до memory.max (або RAM хоста)."""
+    target = item.target
+    if not ctx.config.trend_alert_hours or snap.memory_current is None or not snap.is_active:
+        return
+    trend = item.memory_trend
+    # Після перезапуску пам'ять скидається — старі точки вже не про цей процес
+    if snap.active_enter_timestamp != item.memory_epoch:
+        trend.reset()
+        item.memory_epoch = snap.active_enter_timestamp
+    now = time.time()
+    trend.add(now, float(snap.memory_current))
+    if not _trend_ready(trend):
+        return
+
+    limit = ctx.host.memory_limit(target.service)
+    limit_label = "memory.max"
+    if limit is None:
+        mem = ctx.host.meminfo()
+        if mem is None:
+            return
+        limit, limit_label = mem.total, "RAM хоста"
+    eta = trend.eta(limit, now)
+    if eta is None or eta > ctx.config.trend_alert_hours * 3600:
+        return
+
+    alert_key = f"trend_mem_{target.key}"
+    if not _should_send_alert(ctx, alert_key, _TREND_COOLDOWN):
+        return
+    growth = (trend.slope() or 0.0) * 3600 / 1024 / 1024
+    kb = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Виправляємо...", callback_data=f"ack_alert:{alert_key}"),
+                InlineKeyboardButton(text="🔄 Перезапуск", callback_data=f"quick_restart:{target.key}"),
+            ],
+        ]
+    )
+    await sink.emit(
+        ctx,
+        _Alert(
+            target=target,
+            key=alert_key,
+            text=(
+                f"📈 <b>ПРОГНОЗ: Пам'ять сервісу закінчується</b>\n\n"
+                f"🎯 Ціль: <code>{target.key}</code>\n"
+                f"📦 Сервіс: <code>{target.service}</code>\n"
+                f"💾 Зараз: <code>{snap.memory_current / 1024 / 1024:.0f} MB</code> з "
+                f"<code>{limit / 1024 / 1024:.0f} MB</code> ({limit_label})\n"
+                f"📈 Зростання: <code>+{growth:.1f} MB/год</code> за <code>{trend.span / 3600:.1f} год</code>\n"
+                f"⏳ OOM через <code>{_format_eta(eta)}</code>"
+            ),
+            digest_line=f"📈 Пам'ять +{growth:.1f} MB/год, OOM через <code>{_format_eta(eta)}</code>",
+            keyboard=kb,
+            icon="📈",
+        ),
+    )
+    _mark_alert_sent(ctx, alert_key, target=target.key, summary=f"Прогноз OOM через {_format_eta(eta)}")
+    logger.warning("Alert sent: %s memory exhausted in %.1fh", target.key, eta / 3600)
+
+
+async def _check_disk_trends(
+    ctx: Context, targets: List[Target], disks: Dict[int, SlidingTrend], sink: _AlertSink
+) -> None:
+    """Прогноз заповнення дисків цілей (кожен пристрій — один раз на групу перевірок)."""
+    if not ctx.config.trend_alert_hours or not targets:
+        return
+    now = time.time()
+    seen = set()
+    for path, target in [*((t.path, t) for t in targets), (Path("/"), targets[0])]:
+        usage = ctx.host.disk_usage(path)
+        if usage is None or usage.device in seen:
+            continue
+        seen.add(usage.device)
+        trend = disks.get(usage.device)
+        if trend is None:
+            trend = disks[usage.device] = SlidingTrend(ctx.config.trend_window_hours * 3600)
+        trend.add(now, float(usage.free))
+        if not _trend_ready(trend):
+            continue
+        eta = trend.eta(0.0, now)
+        if eta is None or eta > ctx.config.trend_alert_hours * 3600:
+            continue
+
+        alert_key = f"trend_disk_{usage.device}"
+        if not _should_send_alert(ctx, alert_key, _TREND_COOLDOWN):
+            continue
+        rate = -(trend.slope() or 0.0) * 3600 / 1024**3
+        free_gb = usage.free / 1024**3
+        kb = InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="✅ Виправляємо...", callback_data=f"ack_alert:{alert_key}")]]
+        )
+        await sink.emit(
+            ctx,
+            _Alert(
+                target=target,
+                key=alert_key,
+                text=(
+                    f"💿 <b>ПРОГНОЗ: Диск заповнюється</b>\n\n"
+                    f"🎯 Ціль: <code>{target.key}</code>\n"
+                    f"📁 Шлях: <code>{safe_html(str(path), max_len=200)}</code>\n"
+                    f"💿 Вільно: <code>{free_gb:.1f} ГБ</code> (зайнято {usage.used_percent}%)\n"
+                    f"📉 Витрата: <code>{rate:.2f} ГБ/год</code> за <code>{trend.span / 3600:.1f} год</code>\n"
+                    f"⏳ Диск заповниться через <code>{_format_eta(eta)}</code>"
+                ),
+                digest_line=(
+                    f"💿 {safe_html(str(path), max_len=100)}: {free_gb:.1f} ГБ вільно, "
+                    f"заповниться через <code>{_format_eta(eta)}</code>"
+                ),
+                keyboard=kb,
+                icon="💿",
+            ),
+        )
+        _mark_alert_sent(ctx, alert_key, target=target.key, summary=f"{path}: диск заповниться через {_format_eta(eta)}")
+        logger.warning("Alert sent: disk %s full in %.1fh", path, eta / 3600)
+
+
+async def _check_dependencies(ctx: Context, target: Target, sink: _AlertSink) -> bool:
+    """PostgreSQL і Redis цілі (перевірки по протоколу, без pg_isready/redis-cli); True — щось недоступне."""
+    db, redis = await asyncio.gather(probe_db(target, ctx=ctx), probe_redis(target, ctx=ctx))
+    failed: List[Tuple[str, str, str, str]] = []
+    if db is not None and not db.healthy:
+        failed.append(("db", "🗄", "PostgreSQL", f"{db.dsn}: {db.detail}"))
+    if redis is not None and not redis.healthy:
+        failed.append(("redis", "🧠", "Redis", redis.detail))
+
+    for kind, icon, name, detail in failed:
+        alert_key = f"{kind}_down_{target.key}"
+        if not _should_send_alert(ctx, alert_key):
+            continue
+        kb = InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="✅ Виправляємо...", callback_data=f"ack_alert:{alert_key}")]]
+        )
+        await sink.emit(
+            ctx,
+            _Alert(
+                target=target,
+                key=alert_key,
+                text=(
+                    f"{icon} <b>СПОВІЩЕННЯ: {name} недоступний</b>\n\n"
+                    f"🎯 Ціль: <code>{target.key}</code>\n"
+                    f"⚠️ <code>{safe_html(detail, max_len=500)}</code>\n"
+                    f"⏰ Час: <code>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</code>"
+                ),
+                digest_line=f"{icon} {name} недоступний: <code>{safe_html(detail, max_len=150)}</code>",
+                keyboard=kb,
+                icon=icon,
+            ),
+        )
+        _mark_alert_sent(ctx, alert_key, target=target.key, summary=f"{name} недоступний")
+        logger.warning("Alert sent: %s %s is unavailable", target.key, name)
+    return bool(failed)
+
+
+def _journal_timeout(ctx: Context) -> int:
+    """Дедлайн читання журналу — дві третини дедлайну перевірки цілі."""
+    return max(5, ctx.config.watchdog_check_timeout * 2 // 3)
+
+
+async def _check_target(ctx: Context, item: "_Schedule", snap: UnitSnapshot, sink: _AlertSink) -> bool:
+    """Перевірка однієї цілі: статус сервісу, цикл перезапусків, тренд пам'яті, БД/Redis і критичні помилки в логах.
+
+    Повертає True, якщо ціль деградована (сервіс не працює, перезапускається
+    по колу або є нові критичні помилки) — тоді планувальник перевіряє її частіше.
+    """
+    target = item.target
+    degraded = not snap.is_active
+    # Перевірка статусу сервісу
+    status = snap.state_label
+    if not snap.is_active:
+        alert_key = f"service_down_{target.key}"
+        if _should_send_alert(ctx, alert_key):
+            kb = InlineKeyboardMarkup(
+                inline_keyboard=[
+                    [
+                        InlineKeyboardButton(
+                            text="✅ Виправляємо...",
+                            callback_data=f"ack_alert:{alert_key}",
+                        ),
+                        InlineKeyboardButton(
+                            text="🔄 Перезапуск",
+                            callback_data=f"quick_restart:{target.key}",
+                        ),
+                    ],
+                ]
+            )
+            await sink.emit(
+                ctx,
+                _Alert(
+                    target=target,
+                    key=alert_key,
+                    text=(
+                        f"🚨 <b>СПОВІЩЕННЯ: Сервіс не працює</b>\n\n"
+                        f"🎯 Ціль: <code>{target.key}</code>\n"
+                        f"📦 Сервіс: <code>{target.service}</code>\n"
+                        f"⚠️ Статус: <code>{status}</code>\n"
+                        f"⏰ Час: <code>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</code>"
+                    ),
+                    digest_line=f"🚨 Сервіс не працює: <code>{status}</code>",
+                    keyboard=kb,
+                    icon="🚨",
+                ),
+            )
+            _mark_alert_sent(ctx, alert_key, target=target.key, summary=f"Сервіс не працює: {status}")
+            logger.warning("Alert sent: %s is %s", target.key, status)
+
+    # Цикл перезапусків (Restart=always) — за лічильниками з того ж systemctl show
+    if await _check_flapping(ctx, target, snap, sink, item.flap):
+        degraded = True
+
+    # Прогноз OOM за MemoryCurrent з того ж знімка
+    await _check_memory_trend(ctx, item, snap, sink)
+
+    if ctx.config.alert_on_dependencies and await _check_dependencies(ctx, target, sink):
+        degraded = True
+
+    # Перевірка критичних помилок у нових записах журналу (з моменту попереднього курсора)
+    if ctx.config.alert_on_critical_errors:
+        cursor = ctx.journal_cursors.get(target.key)
+        last_cursor = cursor
+        # Traceback збирається в одну подію: рахується один раз і показується цілком
+        critical_records: Deque[LogRecord] = deque(maxlen=_CRITICAL_KEEP)
+        critical_count = 0
+        assembler = RecordAssembler()
+
+        def _collect(rec: Optional[LogRecord]) -> None:
+            nonlocal critical_count
+            if rec is not None and record_matches(rec, _CRITICAL_RE):
+                critical_records.append(rec)
+                critical_count += 1
+
+        try:
+            # Власний дедлайн читання коротший за дедлайн перевірки: journalctl
+            # зупиняється сам, і прочитане встигає дійти до сповіщення й курсора
+            async for entry in iter_journal_entries(
+                target.service,
+                ctx=ctx,
+                after_cursor=cursor,
+                n=_MAX_SCAN_LINES if cursor else _INITIAL_SCAN_LINES,
+                timeout=_journal_timeout(ctx),
+            ):
+                last_cursor = entry.cursor or last_cursor
+                _collect(assembler.feed(entry.message, timestamp=entry.timestamp, priority=entry.priority))
+            _collect(assembler.flush())
+        except RuntimeError as e:
+            # Курсор міг зникнути після ротації журналу — почнемо заново
+            logger.warning("Не вдалося прочитати журнал %s від курсора: %s", target.key, e)
+            ctx.journal_cursors.set(target.key, None)
+            raise
+        # Якщо перевірку скасовано (дедлайн цілі чи зупинка бота), курсор не
+        # рухається: прочитані критичні рядки ще не надіслані, тож наступна
+        # перевірка прочитає їх знову (не більше _MAX_SCAN_LINES)
+
+        if critical_records:
+            degraded = True
+            # Відбиток останньої події стабільний між перезапусками і варіаціями ID/чисел
+            alert_key = f"crit_{target.key}_{fingerprint(critical_records[-1])}"
+
+            if _should_send_alert(ctx, alert_key):
+                preview = "\n\n".join(rec.text for rec in critical_records)  # Показуємо останні 3
+                # Truncate alert_key for callback_data (Telegram 64-byte limit)
+                ack_data = f"ack_alert:{alert_key}"[:64]
+                kb = InlineKeyboardMarkup(
+                    inline_keyboard=[
+                        [
+                            InlineKeyboardButton(
+                                text="✅ Виправляємо...",
+                                callback_data=ack_data,
+                            ),
+                            InlineKeyboardButton(
+                                text="🔄 Перезапуск",
+                                callback_data=f"quick_restart:{target.key}",
+                            ),
+                        ],
+                        [
+                            InlineKeyboardButton(
+                                text="📜 Повні логи",
+                                callback_data=f"quick_logs:{target.key}",
+                            ),
+                        ],
+                    ]
+                )
+                await sink.emit(
+                    ctx,
+                    _Alert(
+                        target=target,
+                        key=alert_key,
+                        text=(
+                            f"🔥 <b>СПОВІЩЕННЯ: Критична помилка</b>\n\n"
+                            f"🎯 Ціль: <code>{target.key}</code>\n"
+                            f"📦 Сервіс: <code>{target.service}</code>\n"
+                            f"📄 Нових помилок: <code>{critical_count}</code>\n\n"
+                            f"<blockquote expandable>{safe_html(preview, max_len=1000)}</blockquote>"
+                        ),
+                        digest_line=(
+                            f"🔥 Критичні помилки: <code>{critical_count}</code> — "
+                            f"<code>{safe_html(critical_records[-1].head, max_len=150)}</code>"
+                        ),
+                        keyboard=kb,
+                        icon="🔥",
+                        with_logs=True,
+                    ),
+                )
+                _mark_alert_sent(ctx, alert_key, target=target.key, summary=critical_records[-1].head)
+                logger.warning(
+                    "Alert sent: %s has %d critical errors",
+                    target.key,
+                    critical_count,
+                )
+
+        # Курсор зберігаємо лише після відправки сповіщення, щоб не втратити рядки
+        ctx.journal_cursors.set(target.key, last_cursor)
+
+    return degraded
+
+
+async def _run_check(
+    ctx: Context, item: "_Schedule", snap: UnitSnapshot, sem: asyncio.Semaphore, sink: _AlertSink
+) -> Tuple[float, str]:
+    """Запустити перевірку цілі під семафором і з власним дедлайном.
+
+    Повертає (тривалість, результат), де результат — ``ok``, ``degraded`` або ``failed``.
+    """
+    target = item.target
+    async with sem:
+        started = time.monotonic()
+        outcome = _FAILED
+        try:
+            degraded = await asyncio.wait_for(
+                _check_target(ctx, item, snap, sink), timeout=ctx.config.watchdog_check_timeout
+            )
+            outcome = _DEGRADED if degraded else _OK
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Перевірка %s перевищила %dс і була перервана", target.key, ctx.config.watchdog_check_timeout
+            )
+        except RuntimeError as e:
+            logger.warning("Не вдалося прочитати журнал %s: %s", target.key, e)
+        except Exception as e:
+            logger.error("Помилка перевірки %s: %s", target.key, e, exc_info=True)
+        return time.monotonic() - started, outcome
 
 
-async def monitor_targets(bot: Bot, ctx: Context) -> None:
+@dataclass
+class _Schedule:
+    """Розклад перевірок однієї цілі."""
+
+    target: Target
+    interval: float
+    memory_trend: SlidingTrend
+    failures: int = 0
+    flap: _FlapWindow = field(default_factory=_FlapWindow)
+    # ActiveEnterTimestamp, з якого рахується тренд пам'яті
+    memory_epoch: str = ""
+
+    def next_delay(self, outcome: str) -> float:
+        if outcome == _FAILED:
+            # Експоненційний backoff для цілей, чиї перевірки постійно падають
+            self.failures += 1
+            delay = min(self.interval * 2 ** self.failures, max(self.interval, _MAX_BACKOFF))
+        else:
+            self.failures = 0
+            delay = min(self.interval, _DEGRADED_RECHECK) if outcome == _DEGRADED else self.interval
+        return delay * random.uniform(1 - _JITTER, 1 + _JITTER)
+
+
+async def _run_batch(
+    ctx: Context,
+    batch: List[_Schedule],
+    sem: asyncio.Semaphore,
+    sink: _AlertSink,
+    disks: Dict[int, SlidingTrend],
+) -> List[str]:
+    """Перевірити групу цілей, що настали одночасно; повертає результати по порядку.
+
+    Семафор спільний для всіх груп, тож ``ADMIN_BOT_WATCHDOG_CONCURRENCY``
+    обмежує перевірки глобально, навіть коли групи перекриваються в часі.
+    """
+    started = time.monotonic()
+    targets = [item.target for item in batch]
+
+    # Один процес systemctl show на всю групу
+    try:
+        snapshots = await systemctl_show_units([t.service for t in targets], ctx=ctx)
+    except Exception as e:
+        logger.error("Помилка systemctl show для %s: %s", ",".join(t.key for t in targets), e)
+        return [_FAILED] * len(batch)
+
+    results = await asyncio.gather(
+        *(_run_check(ctx, item, snapshots[item.target.service], sem, sink) for item in batch)
+    )
+    try:
+        await _check_disk_trends(ctx, targets, disks, sink)
+    except Exception as e:
+        logger.error("Помилка прогнозу заповнення дисків: %s", e, exc_info=True)
+    await sink.flush(ctx)
+    ctx.journal_cursors.flush()
+    ctx.alert_state.flush()
+
+    slowest, (slowest_time, _) = max(zip(targets, results), key=lambda item: item[1][0])
+    logger.info(
+        "Перевірка %d цілей за %.2fс, найповільніша %s (%.2fс)",
+        len(targets),
+        time.monotonic() - started,
+        slowest.key,
+        slowest_time,
+    )
+    return [outcome for _, outcome in results]
+
+
+async def monitor_targets(ctx: Context) -> None:
     """Постійний моніторинг всіх цілей і відправка сповіщень.
 
+    Планувальник — min-heap часу наступної перевірки кожної цілі: власний
+    інтервал (``ADMIN_TARGET_<KEY>_ALERT_INTERVAL`` або глобальний), випадковий
+    зсув старту, часті повторні перевірки деградованих цілей і backoff для
+    цілей, чиї перевірки падають.
+
+    Кожна група виконується окремою задачею, тож повільна ціль не затримує
+    цілі, чий час настав пізніше; ціль повертається в купу, коли її група
+    завершилась.
+
+    Сповіщення надсилаються через ``ctx.outbox`` у пріоритетній смузі; у
+    режимі дайджесту (``ADMIN_BOT_ALERT_DIGEST``) сповіщення групи перевірок
+    або вікна ``ADMIN_BOT_ALERT_DIGEST_WINDOW`` об'єднуються в одне повідомлення.
+
     Args:
-        bot: Екземпляр Telegram бота
         ctx: Контекст застосунку
     """
     logger.info("Моніторинг запущено: %d цілей", len(ctx.targets))
 
-    while True:
-        try:
-            await asyncio.sleep(ctx.config.alert_interval)
-
-            for target in ctx.targets.values():
-                # Перевірка статусу сервісу
-                status = systemctl_is_active(target.service, ctx=ctx).strip()
-                if status != "active":
-                    alert_key = f"service_down_{target.key}"
-                    if _should_send_alert(alert_key):
-                        kb = InlineKeyboardMarkup(
-                            inline_keyboard=[
-                                [
-                                    InlineKeyboardButton(
-                                        text="✅ Виправляємо...",
-                                        callback_data=f"ack_alert:{alert_key}",
-                                    ),
-                                    InlineKeyboardButton(
-                                        text="🔄 Перезапуск",
-                                        callback_data=f"quick_restart:{target.key}",
-                                    ),
-                                ],
-                            ]
-                        )
-                        await bot.send_message(
-                            ctx.config.admin_id,
-                            f"🚨 <b>СПОВІЩЕННЯ: Сервіс не працює</b>\n\n"
-                            f"🎯 Ціль: <code>{target.key}</code>\n"
-                            f"📦 Сервіс: <code>{target.service}</code>\n"
-                            f"⚠️ Статус: <code>{status}</code>\n"
-                            f"⏰ Час: <code>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</code>",
-                            parse_mode="HTML",
-                            reply_markup=kb,
-                        )
-                        _mark_alert_sent(alert_key)
-                        logger.warning("Alert sent: %s is %s", target.key, status)
-
-                # Перевірка критичних помилок в логах
-                if ctx.config.alert_on_critical_errors:
-                    recent_logs = journalctl_lines(target.service, n=50, ctx=ctx)
-                    critical_pattern = re.compile(r"CRITICAL|FATAL", re.IGNORECASE)
-                    critical_lines = [
-                        ln for ln in recent_logs.splitlines() if critical_pattern.search(ln)
-                    ]
+    loop = asyncio.get_running_loop()
+    sink = _DigestSink(ctx.config.alert_digest_window) if ctx.config.alert_digest else _AlertSink()
+    heap: List[Tuple[float, int, _Schedule]] = []
+    # Тренди вільного місця по пристроях (st_dev)
+    disks: Dict[int, SlidingTrend] = {}
+    seq = itertools.count()
+    for t in ctx.targets.values():
+        item = _Schedule(
+            target=t,
+            interval=float(t.alert_interval or ctx.config.alert_interval),
+            memory_trend=SlidingTrend(ctx.config.trend_window_hours * 3600),
+        )
+        # Рознести перші перевірки, щоб цілі не збігалися за часом
+        heapq.heappush(heap, (loop.time() + random.uniform(0, item.interval), next(seq), item))
 
-                    if critical_lines:
-                        # Беремо останню помилку
-                        last_critical = critical_lines[-1][:200]  # Обрізаємо для ключа
-                        alert_key = f"crit_{target.key}_{abs(hash(last_critical)) % 10**8}"
-
-                        if _should_send_alert(alert_key):
-                            preview = "\n".join(critical_lines[-3:])  # Показуємо останні 3
-                            # Truncate alert_key for callback_data (Telegram 64-byte limit)
-                            ack_data = f"ack_alert:{alert_key}"[:64]
-                            kb = InlineKeyboardMarkup(
-                                inline_keyboard=[
-                                    [
-                                        InlineKeyboardButton(
-                                            text="✅ Виправляємо...",
-                                            callback_data=ack_data,
-                                        ),
-                                        InlineKeyboardButton(
-                                            text="🔄 Перезапуск",
-                                            callback_data=f"quick_restart:{target.key}",
-                                        ),
-                                    ],
-                                    [
-                                        InlineKeyboardButton(
-                                            text="📜 Повні логи",
-                                            callback_data=f"quick_logs:{target.key}",
-                                        ),
-                                    ],
-                                ]
-                            )
-                            await bot.send_message(
-                                ctx.config.admin_id,
-                                f"🔥 <b>СПОВІЩЕННЯ: Критична помилка</b>\n\n"
-                                f"🎯 Ціль: <code>{target.key}</code>\n"
-                                f"📦 Сервіс: <code>{target.service}</code>\n"
-                                f"📄 Знайдено помилок: <code>{len(critical_lines)}</code>\n\n"
-                                f"<blockquote expandable>{preview[:1000]}</blockquote>",
-                                parse_mode="HTML",
-                                reply_markup=kb,
-                            )
-                            _mark_alert_sent(alert_key)
-                            logger.warning(
-                                "Alert sent: %s has %d critical errors",
-                                target.key,
-                                len(critical_lines),
-                            )
-
-        except asyncio.CancelledError:
-            logger.info("Моніторинг зупинено")
-            raise
+    sem = asyncio.Semaphore(ctx.config.watchdog_concurrency)
+    # Групи, що зараз перевіряються: задача → її цілі (поза купою до завершення)
+    running: Dict["asyncio.Task[List[str]]", List[_Schedule]] = {}
+    try:
+        while heap or running:
+            wake_at = heap[0][0] if heap else None
+            digest_at = sink.deadline()
+            if digest_at is not None:
+                wake_at = digest_at if wake_at is None else min(wake_at, digest_at)
+            delay = None if wake_at is None else max(0.0, wake_at - loop.time())
+            if running:
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(delay or 0.0)
+                done = set()
+
+            # Завершені групи — назад у купу з урахуванням результату
+            now = loop.time()
+            for task in done:
+                batch = running.pop(task)
+                try:
+                    outcomes = task.result()
+                except Exception as e:
+                    logger.error("Помилка моніторингу: %s", e, exc_info=True)
+                    outcomes = [_FAILED] * len(batch)
+                for item, outcome in zip(batch, outcomes):
+                    heapq.heappush(heap, (now + item.next_delay(outcome), next(seq), item))
+
+            # Забрати всі цілі, що настали (з невеликим допуском) — одна група, один systemctl show
+            batch = []
+            while heap and heap[0][0] <= now + _BATCH_WINDOW:
+                batch.append(heapq.heappop(heap)[2])
+            if batch:
+                running[asyncio.create_task(_run_batch(ctx, batch, sem, sink, disks))] = batch
+            elif digest_at is not None and digest_at <= now:
+                # Прокинулись лише заради дайджесту
+                await sink.flush(ctx)
+    except asyncio.CancelledError:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        # Накопичений дайджест уже позначено як надісланий — доставити його до
+        # зупинки outbox, інакше після перезапуску cooldown його приховає
+        try:
+            await asyncio.wait_for(sink.flush(ctx, force=True), timeout=_SHUTDOWN_FLUSH_TIMEOUT)
         except Exception as e:
-            logger.error("Помилка моніторингу: %s", e, exc_info=True)
-            await asyncio.sleep(60)  # Пауза при помилці
+            logger.error("Не вдалося надіслати дайджест при зупинці: %s", e)
+        logger.info("Моніторинг зупинено")
+        raise
@@ -0,0 +1,180 @@
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Set
+
+
+logger = logging.getLogger("admin_bot")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    key TEXT PRIMARY KEY,
+    target TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    first_sent REAL NOT NULL,
+    last_sent REAL NOT NULL,
+    sent_count INTEGER NOT NULL DEFAULT 1,
+    acknowledged INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+@dataclass
+class AlertState:
+    key: str
+    target: str
+    summary: str
+    first_sent: float
+    last_sent: float
+    sent_count: int = 1
+    acknowledged: bool = False
+
+
+@dataclass
+class AlertStateStore:
+    """Стан сповіщень watchdog: cooldown і позначки "в роботі".
+
+    Записи тримаються в LRU-кеші з жорстким лімітом ``max_entries`` і
+    видаляються через ``ttl`` секунд без повторів. Зміни пишуться в SQLite
+    пакетно через ``flush`` (раз на тік моніторингу), тож стан переживає
+    перезапуск і самооновлення бота.
+    """
+
+    path: Path
+    ttl: float
+    max_entries: int
+    _entries: "OrderedDict[str, AlertState]"
+    _dirty: Set[str]
+    _deleted: Set[str]
+
+    @classmethod
+    def load(cls, path: Path, *, ttl: float, max_entries: int) -> "AlertStateStore":
+        store = cls(path=path, ttl=ttl, max_entries=max_entries, _entries=OrderedDict(), _dirty=set(), _deleted=set())
+        try:
+            with store._connect() as conn:
+                rows = conn.execute(
+                    "SELECT key, target, summary, first_sent, last_sent, sent_count, acknowledged "
+                    "FROM alerts WHERE last_sent >= ? ORDER BY last_sent ASC",
+                    (time.time() - ttl,),
+                ).fetchall()
+                conn.execute("DELETE FROM alerts WHERE last_sent < ?", (time.time() - ttl,))
+        except sqlite3.Error as e:
+            logger.error("Не вдалося завантажити стан сповіщень %s: %s", path, e)
+            return store
+
+        for key, target, summary, first_sent, last_sent, sent_count, acknowledged in rows:
+            store._entries[key] = AlertState(key, target, summary, first_sent, last_sent, sent_count, bool(acknowledged))
+        store._trim()
+        return store
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """З'єднання з транзакцією (commit/rollback) і гарантованим закриттям."""
+        conn = sqlite3.connect(str(self.path), timeout=5)
+        try:
+            with conn:
+                conn.execute(_SCHEMA)
+                yield conn
+        finally:
+            conn.close()
+
+    def _expired(self, state: AlertState, now: float) -> bool:
+        return now - state.last_sent > self.ttl
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._dirty.discard(key)
+        self._deleted.add(key)
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_entries:
+            key = next(iter(self._entries))
+            self._drop(key)
+
+    def get(self, key: str) -> Optional[AlertState]:
+        state = self._entries.get(key)
+        if state is None:
+            return None
+        if self._expired(state, time.time()):
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return state
+
+    def should_send(self, key: str, cooldown: float) -> bool:
+        """Чи можна надіслати сповіщення: не "в роботі" і cooldown минув."""
+        state = self.get(key)
+        if state is None:
+            return True
+        if state.acknowledged:
+            return False
+        return time.time() - state.last_sent > cooldown
+
+    def mark_sent(self, key: str, *, target: str = "", summary: str = "") -> None:
+        now = time.time()
+        state = self.get(key)
+        if state is None:
+            state = AlertState(key=key, target=target, summary=summary[:200], first_sent=now, last_sent=now)
+            self._entries[key] = state
+        else:
+            state.last_sent = now
+            state.sent_count += 1
+            if summary:
+                state.summary = summary[:200]
+        self._deleted.discard(key)
+        self._dirty.add(key)
+        self._trim()
+
+    def acknowledge(self, key: str) -> None:
+        state = self.get(key)
+        if state is None:
+            # Позначка "в роботі" без відомого сповіщення (наприклад, після очищення)
+            now = time.time()
+            state = AlertState(key=key, target="", summary="", first_sent=now, last_sent=now, sent_count=0)
+            self._entries[key] = state
+        state.acknowledged = True
+        # Позначка живе ttl від моменту підтвердження
+        state.last_sent = max(state.last_sent, time.time())
+        self._deleted.discard(key)
+        self._dirty.add(key)
+        self._trim()
+
+    def unacknowledge(self, key: str) -> bool:
+        state = self.get(key)
+        if state is None or not state.acknowledged:
+            return False
+        state.acknowledged = False
+        self._dirty.add(key)
+        return True
+
+    def active(self) -> List[AlertState]:
+        """Активні (не прострочені) сповіщення, від найсвіжіших."""
+        now = time.time()
+        for key in [k for k, s in self._entries.items() if self._expired(s, now)]:
+            self._drop(key)
+        return sorted(self._entries.values(), key=lambda s: s.last_sent, reverse=True)
+
+    def flush(self) -> None:
+        if not self._dirty and not self._deleted:
+            return
+        rows = [
+            (s.key, s.target, s.summary, s.first_sent, s.last_sent, s.sent_count, int(s.acknowledged))
+            for s in (self._entries[k] for k in self._dirty if k in self._entries)
+        ]
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO alerts "
+                    "(key, target, summary, first_sent, last_sent, sent_count, acknowledged) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.executemany("DELETE FROM alerts WHERE key = ?", [(k,) for k in self._deleted])
+            self._dirty.clear()
+            self._deleted.clear()
+        except sqlite3.Error as e:
+            logger.error("Помилка запису стану сповіщень %s: %s", self.path, e)
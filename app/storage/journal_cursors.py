@@ -0,0 +1,52 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+
+logger = logging.getLogger("admin_bot")
+
+
+@dataclass
+class JournalCursorStore:
+    """Курсори journald по цілях, щоб watchdog продовжував з місця зупинки."""
+
+    path: Path
+    _data: Dict[str, str]
+    _dirty: bool = field(default=False, repr=False)
+
+    @classmethod
+    def load(cls, path: Path) -> "JournalCursorStore":
+        if path.exists():
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                if isinstance(raw, dict):
+                    return cls(path=path, _data={str(k): str(v) for k, v in raw.items()})
+            except Exception:
+                pass
+        return cls(path=path, _data={})
+
+    def get(self, target_key: str) -> Optional[str]:
+        return self._data.get(target_key)
+
+    def set(self, target_key: str, cursor: Optional[str]) -> None:
+        """Оновити курсор у пам'яті; на диск записується пакетно через ``flush``."""
+        if cursor:
+            if self._data.get(target_key) == cursor:
+                return
+            self._data[target_key] = cursor
+        elif self._data.pop(target_key, None) is None:
+            return
+        self._dirty = True
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self._data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            tmp.replace(self.path)
+            self._dirty = False
+        except Exception as e:
+            logger.error("Помилка запису курсорів журналу %s: %s", self.path, e)
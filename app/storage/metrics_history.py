@@ -0,0 +1,172 @@
+import logging
+import math
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger("admin_bot")
+
+# Рівні історії: (крок у секундах, кількість точок) — година, доба, тиждень
+TIERS: Tuple[Tuple[int, int], ...] = ((60, 60), (600, 144), (3600, 168))
+
+_MAGIC = b"ABMHIST1"
+_HEADER = struct.Struct("<8sI4x")  # magic, кількість серій
+_NAME_LEN = 48
+_TIER_HEADER = struct.Struct("<qI4x")  # номер кошика найновішої точки, індекс запису
+_POINT = 4  # float32
+_SERIES_SIZE = _NAME_LEN + sum(_TIER_HEADER.size + n * _POINT for _, n in TIERS)
+
+
+class _Ring:
+    """Кільцевий буфер float32 з заголовком прямо у відображеному файлі."""
+
+    def __init__(self, mm: mmap.mmap, offset: int, step: int, size: int) -> None:
+        self._mm = mm
+        self._offset = offset
+        self.step = step
+        self.size = size
+        self._values = memoryview(mm)[offset + _TIER_HEADER.size: offset + _TIER_HEADER.size + size * _POINT].cast("f")
+
+    def _state(self) -> Tuple[int, int]:
+        return _TIER_HEADER.unpack_from(self._mm, self._offset)
+
+    def push(self, bucket: int, value: float) -> None:
+        last, head = self._state()
+        if last >= 0:
+            if bucket <= last:
+                return
+            # Пропущені кошики (бот не працював) — порожні точки
+            for _ in range(min(bucket - last - 1, self.size)):
+                self._values[head] = math.nan
+                head = (head + 1) % self.size
+        self._values[head] = value
+        _TIER_HEADER.pack_into(self._mm, self._offset, bucket, (head + 1) % self.size)
+
+    def points(self, bucket: int) -> List[float]:
+        """Усі ``size`` точок до кошика ``bucket`` включно (від старих до нових)."""
+        last, head = self._state()
+        if last < 0:
+            return [math.nan] * self.size
+        ordered = [self._values[(head + i) % self.size] for i in range(self.size)]
+        lag = min(max(bucket - last, 0), self.size)
+        return ordered[lag:] + [math.nan] * lag
+
+    def release(self) -> None:
+        self._values.release()
+
+
+@dataclass
+class _Bucket:
+    bucket: int = -1
+    total: float = 0.0
+    count: int = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+
+class MetricsHistory:
+    """Історія метрик у трьох рівнях деталізації з фіксованим розміром.
+
+    Кожна серія — кільцеві буфери float32 (1 хв × 60, 10 хв × 144, 1 год ×
+    168) прямо в memory-mapped файлі, тож пам'ять не залежить від часу роботи,
+    а ``flush`` лише скидає сторінки на диск і історія переживає перезапуск.
+    Точка кошика — середнє всіх вибірок за його крок.
+    """
+
+    def __init__(self, path: Path, mm: mmap.mmap, names: List[str]) -> None:
+        self.path = path
+        self._mm = mm
+        self._rings: Dict[str, List[_Ring]] = {}
+        self._pending: Dict[str, List[_Bucket]] = {}
+        for i, name in enumerate(names):
+            offset = _HEADER.size + i * _SERIES_SIZE + _NAME_LEN
+            rings = []
+            for step, size in TIERS:
+                rings.append(_Ring(mm, offset, step, size))
+                offset += _TIER_HEADER.size + size * _POINT
+            self._rings[name] = rings
+            self._pending[name] = [_Bucket() for _ in TIERS]
+
+    @classmethod
+    def open(cls, path: Path, names: List[str]) -> "MetricsHistory":
+        """Відкрити файл історії; серії, яких уже немає, відкидаються, нові — порожні."""
+        names = list(dict.fromkeys(names))
+        old = _read_series(path)
+        size = _HEADER.size + len(names) * _SERIES_SIZE
+        empty_tiers = b"".join(_TIER_HEADER.pack(-1, 0) + b"\0" * (n * _POINT) for _, n in TIERS)
+        data = bytearray(_HEADER.pack(_MAGIC, len(names)))
+        for name in names:
+            block = old.get(name)
+            data += block if block is not None else name.encode("utf-8")[:_NAME_LEN].ljust(_NAME_LEN, b"\0") + empty_tiers
+
+        # Новий файл пишеться поруч і підміняє старий атомарно
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        with path.open("r+b") as f:
+            mm = mmap.mmap(f.fileno(), size)
+        return cls(path, mm, names)
+
+    def record(self, name: str, value: Optional[float], now: float) -> None:
+        rings = self._rings.get(name)
+        if rings is None or value is None:
+            return
+        for ring, pending in zip(rings, self._pending[name]):
+            bucket = int(now // ring.step)
+            if pending.bucket != bucket:
+                if pending.count:
+                    ring.push(pending.bucket, pending.mean)
+                pending.bucket, pending.total, pending.count = bucket, 0.0, 0
+            pending.total += value
+            pending.count += 1
+
+    def points(self, name: str, step: int, now: float) -> List[float]:
+        """Точки рівня ``step`` від старих до нових; остання — поточний неповний кошик."""
+        rings = self._rings.get(name)
+        if rings is None:
+            return []
+        for i, ring in enumerate(rings):
+            if ring.step == step:
+                bucket = int(now // step)
+                pending = self._pending[name][i]
+                values = ring.points(bucket - 1)
+                current = pending.mean if pending.bucket == bucket else math.nan
+                return values[1:] + [current]
+        raise KeyError(step)
+
+    def flush(self) -> None:
+        try:
+            self._mm.flush()
+        except (OSError, ValueError) as e:
+            logger.error("Помилка запису історії метрик %s: %s", self.path, e)
+
+    def close(self) -> None:
+        self.flush()
+        for rings in self._rings.values():
+            for ring in rings:
+                ring.release()
+        self._mm.close()
+
+
+def _read_series(path: Path) -> Dict[str, bytes]:
+    """Блоки серій з наявного файлу (порожньо, якщо файлу немає або формат інший)."""
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return {}
+    if len(raw) < _HEADER.size:
+        return {}
+    magic, count = _HEADER.unpack_from(raw)
+    if magic != _MAGIC or len(raw) != _HEADER.size + count * _SERIES_SIZE:
+        logger.warning("Файл історії метрик %s має інший формат — історію почато заново", path)
+        return {}
+    blocks: Dict[str, bytes] = {}
+    for i in range(count):
+        block = raw[_HEADER.size + i * _SERIES_SIZE: _HEADER.size + (i + 1) * _SERIES_SIZE]
+        blocks[block[:_NAME_LEN].rstrip(b"\0").decode("utf-8", errors="replace")] = block
+    return blocks
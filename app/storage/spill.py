@@ -0,0 +1,119 @@
+import gzip
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Optional
+
+
+logger = logging.getLogger("admin_bot")
+
+_SUFFIX = ".log.gz"
+
+
+class SpillWriter:
+    """Потоковий запис повного виводу команди у стиснений файл сховища."""
+
+    def __init__(self, store: "SpillStore", spill_id: str) -> None:
+        self.store = store
+        self.spill_id = spill_id
+        self._tmp = store.root / f".{spill_id}{_SUFFIX}.part"
+        self._fh: Optional[IO[bytes]] = gzip.open(self._tmp, "wb", compresslevel=6)
+
+    def write(self, data: bytes) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.write(data)
+        except OSError as e:
+            logger.error("Помилка запису повного виводу %s: %s", self.spill_id, e)
+            self.discard()
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.close()
+            self._fh = None
+            self._tmp.replace(self.store.path_for(self.spill_id))
+        except OSError as e:
+            logger.error("Помилка збереження повного виводу %s: %s", self.spill_id, e)
+            self.discard()
+            return
+        self.store.evict()
+
+    @property
+    def saved(self) -> bool:
+        return self.store.path_for(self.spill_id).exists()
+
+    def discard(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
+        self._tmp.unlink(missing_ok=True)
+
+
+@dataclass
+class SpillStore:
+    """Сховище повних виводів команд з LRU-витісненням за розміром та віком.
+
+    Кожен вивід — окремий ``<id>.log.gz``; mtime оновлюється при кожному
+    зверненні, тож найстаріший mtime означає найдавніше використаний файл.
+    """
+
+    root: Path
+    max_bytes: int = 200 * 1024 * 1024
+    max_age: float = 72 * 3600
+
+    def __post_init__(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Недописані файли лишаються лише після аварійної зупинки
+        for part in self.root.glob(f".*{_SUFFIX}.part"):
+            part.unlink(missing_ok=True)
+
+    def path_for(self, spill_id: str) -> Path:
+        return self.root / f"{spill_id}{_SUFFIX}"
+
+    def open_writer(self) -> Optional[SpillWriter]:
+        try:
+            return SpillWriter(self, secrets.token_hex(4))
+        except OSError as e:
+            logger.error("Не вдалося відкрити сховище виводів %s: %s", self.root, e)
+            return None
+
+    def get(self, spill_id: str) -> Optional[Path]:
+        """Повернути шлях до збереженого виводу (і позначити його як використаний)."""
+        if not spill_id.isalnum():
+            return None
+        path = self.path_for(spill_id)
+        if not path.exists():
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def evict(self) -> None:
+        try:
+            entries = []
+            for p in self.root.glob(f"*{_SUFFIX}"):
+                st = p.stat()
+                entries.append((st.st_mtime, st.st_size, p))
+        except OSError as e:
+            logger.error("Помилка читання сховища виводів %s: %s", self.root, e)
+            return
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.max_age
+        for mtime, size, path in entries:
+            if total <= self.max_bytes and mtime >= cutoff:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
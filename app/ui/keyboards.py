@@ -1,4 +1,8 @@
+from typing import Optional
+
 from aiogram.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
     ReplyKeyboardMarkup,
     KeyboardButton,
 )
@@ -12,8 +16,21 @@ def main_keyboard(target: Target) -> ReplyKeyboardMarkup:
             [KeyboardButton(text="🎯 Бот"), KeyboardButton(text="📊 Статус"), KeyboardButton(text="📜 Логи")],
             [KeyboardButton(text="📦 PIP"), KeyboardButton(text="🔧 ENV"), KeyboardButton(text="🚀 GIT PULL")],
             [KeyboardButton(text="🔄 RESTART"), KeyboardButton(text="🏗 BUILD"), KeyboardButton(text="💾 Бекап БД")],
-            [KeyboardButton(text="⚙️ Системна інфо"), KeyboardButton(text="🤖 Оновити admin_bot")],
+            [
+                KeyboardButton(text="🗺 Огляд"),
+                KeyboardButton(text="⚙️ Системна інфо"),
+                KeyboardButton(text="🤖 Оновити admin_bot"),
+            ],
         ],
         resize_keyboard=True,
         input_field_placeholder=f"Ціль: {target.key}",
     )
+
+
+def full_output_keyboard(spill_id: Optional[str]) -> Optional[InlineKeyboardMarkup]:
+    """Кнопка завантаження повного виводу, якщо він був обрізаний і збережений."""
+    if not spill_id:
+        return None
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="📥 Повний вивід", callback_data=f"spill:{spill_id}")]]
+    )